@@ -1,111 +1,92 @@
 import streamlit as st
-from datetime import datetime
 from pathlib import Path
 
-try:
-    from fpdf import FPDF
-except ImportError:
-    FPDF = None
-
+from combined import assess, combined_report
+from explain import explain_diabetes, explain_heart
+from heart_lut import load_heart_lut
+from instrumentation import METRICS
+from reports import build_report, cached_report, pdf_available, report_filename, warm_reports
 from utils import (
     ArtifactLoadError,
-    build_diabetes_features,
-    build_heart_features,
-    load_diabetes_model,
-    load_diabetes_scaler,
+    artifact_version,
+    build_heart_feature_matrix,
+    get_batcher,
+    get_diabetes_encoder,
+    load_compiled_diabetes_model,
+    load_compiled_heart_model,
     load_heart_model,
     load_heart_scaler,
-    predict_diabetes,
-    predict_heart,
+    predict_diabetes_cached,
+    predict_heart_cached,
+    start_warmup,
 )
 
 
-def build_pdf_report(disease_name, patient_name, inputs, prediction_label, probability_percent):
-    if FPDF is None:
-        return None
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-    safe_name = patient_name.strip() or "Unknown"
-    pdf = FPDF()
-    pdf.set_margins(left=12, top=12, right=12)
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.add_page()
-    page_width = getattr(pdf, "epw", None) or (pdf.w - pdf.l_margin - pdf.r_margin)
-
-    pdf.set_fill_color(26, 33, 62)
-    pdf.set_text_color(255, 255, 255)
-    pdf.set_font("Helvetica", style="B", size=16)
-    pdf.rect(pdf.l_margin, pdf.t_margin, page_width, 16, style="F")
-    pdf.set_xy(pdf.l_margin + 4, pdf.t_margin + 4)
-    pdf.cell(page_width - 8, 8, "Disease Prediction Report")
-
-    pdf.set_text_color(0, 0, 0)
-    pdf.ln(20)
-    pdf.set_font("Helvetica", size=11)
-    left_col = page_width * 0.6
-    right_col = page_width - left_col
-    pdf.cell(left_col, 7, f"Generated: {timestamp}")
-    pdf.cell(right_col, 7, f"Condition: {disease_name}", ln=1)
-    pdf.set_font("Helvetica", style="B", size=13)
-    pdf.cell(left_col, 8, f"Patient Name: {safe_name}")
-    pdf.set_font("Helvetica", size=11)
-    pdf.cell(right_col, 8, "", ln=1)
-    pdf.ln(2)
-
-    pdf.set_fill_color(240, 245, 250)
-    pdf.set_text_color(26, 33, 62)
-    pdf.set_font("Helvetica", style="B", size=12)
-    pdf.cell(page_width, 8, "Inputs", ln=1, fill=True)
-    pdf.set_text_color(0, 0, 0)
-    pdf.set_font("Helvetica", size=11)
-
-    label_width = 55
-    value_width = page_width - label_width
-
-    def draw_kv_row(label, value):
-        pdf.set_x(pdf.l_margin)
-        pdf.set_font("Helvetica", style="B", size=11)
-        pdf.cell(label_width, 7, str(label))
-        pdf.set_font("Helvetica", size=11)
-        try:
-            pdf.multi_cell(value_width, 7, str(value), new_x="LMARGIN", new_y="NEXT")
-        except TypeError:
-            pdf.multi_cell(value_width, 7, str(value))
-
-    for key, value in inputs.items():
-        draw_kv_row(key, value)
-
-    pdf.ln(2)
-    pdf.set_fill_color(240, 245, 250)
-    pdf.set_text_color(26, 33, 62)
-    pdf.set_font("Helvetica", style="B", size=12)
-    pdf.cell(page_width, 8, "Result", ln=1, fill=True)
-    pdf.set_text_color(0, 0, 0)
-    pdf.set_font("Helvetica", size=11)
-
-    risk_color = (244, 67, 54) if prediction_label == "High Risk" else (76, 175, 80)
-    pdf.set_text_color(*risk_color)
-    pdf.set_font("Helvetica", style="B", size=12)
-    pdf.cell(page_width, 7, f"Prediction: {prediction_label}", ln=1)
-    pdf.set_text_color(0, 0, 0)
-    pdf.set_font("Helvetica", size=11)
-    pdf.cell(page_width, 7, f"Risk Level: {probability_percent:.1f}%", ln=1)
-
-    pdf_output = pdf.output(dest="S")
-    if isinstance(pdf_output, (bytes, bytearray)):
-        return bytes(pdf_output)
-    return str(pdf_output).encode("latin1")
-
-
-def load_artifacts():
+DISEASE_KEYS = {"Diabetes": "diabetes", "Heart Disease": "heart"}
+
+
+def build_pdf_report(disease_name, patient_name, inputs, prediction_label, probability_percent, factors=None):
+    # Rendered from a per-condition template; reports.build_fpdf_report is the FPDF original.
+    # factors: optional (label, text) rows, e.g. explain.Explanation.factors().
+    with METRICS.stage("pdf_report", DISEASE_KEYS.get(disease_name, "")):
+        return build_report(
+            disease_name, patient_name, inputs, prediction_label, probability_percent, factors=factors
+        )
+
+
+def render_pdf_report(record):
+    # Runs when the download is requested; repeat downloads are cache hits.
+    with METRICS.stage("pdf_report", DISEASE_KEYS.get(record["disease_name"], "")):
+        return cached_report(**record)
+
+
+def offer_pdf_report(disease_name, patient_name, inputs, prediction_label, probability_percent, factors=None):
+    # The PDF is rendered only when the button is clicked, from this stored
+    # prediction record, and memoized so repeat downloads are free.
+    if not pdf_available():
+        return
+    record = {
+        "disease_name": disease_name,
+        "patient_name": patient_name,
+        "inputs": dict(inputs),
+        "prediction_label": prediction_label,
+        "probability_percent": probability_percent,
+        "factors": list(factors or ()),
+    }
+    st.download_button(
+        label="Download PDF Report",
+        data=lambda: render_pdf_report(record),
+        file_name=report_filename(disease_name, patient_name),
+        mime="application/pdf",
+        use_container_width=True,
+    )
+
+
+def load_artifacts(disease):
+    # Artifacts are cached process-wide by utils.ARTIFACT_REGISTRY, so reruns
+    # only pay a stat() per file. On a cold start this waits for the
+    # background warm-up's build of the same model rather than repeating it.
     try:
-        diabetes_model = load_diabetes_model()
-        heart_model = load_heart_model()
-        diabetes_scaler = load_diabetes_scaler()
-        heart_scaler = load_heart_scaler()
+        # Both compiled models fold their scaler in, so no separate scaler is passed.
+        with METRICS.stage("load_artifacts", DISEASE_KEYS[disease]):
+            if disease == "Diabetes":
+                model, scaler = load_compiled_diabetes_model(), None
+            else:
+                model, scaler = load_compiled_heart_model(), None
     except ArtifactLoadError as exc:
         st.error(f"Failed to load model artifacts: {exc}")
         st.stop()
-    return diabetes_model, heart_model, diabetes_scaler, heart_scaler
+    return model, scaler
+
+
+def render_key_factors(explanation):
+    # The inputs that moved this patient's risk the most, largest first.
+    st.markdown("### Key Factors")
+    st.caption(
+        f"Starting from the model's baseline risk of {explanation.baseline_probability * 100:.1f}%, "
+        "these inputs moved the result the most:"
+    )
+    st.markdown("\n".join(f"- **{label}**: {text}" for label, text in explanation.factors(0)))
 
 
 def inject_theme():
@@ -328,7 +309,7 @@ def render_header():
     )
 
 
-def render_diabetes_section(diabetes_model, diabetes_scaler, patient_name):
+def render_diabetes_section(patient_name):
     st.markdown("## Diabetes Risk Assessment")
     st.markdown(
         """
@@ -372,23 +353,29 @@ def render_diabetes_section(diabetes_model, diabetes_scaler, patient_name):
     st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
     if st.button("Run Diabetes Analysis", use_container_width=True, key="diab_scan"):
-        with st.spinner("Analyzing biometric data..."):
-            diabetes_features = build_diabetes_features(
-                age=age,
-                hypertension_opt=hypertension_opt,
-                heart_disease_opt=heart_disease_opt,
-                bmi=bmi,
-                hba1c=hba1c,
-                glucose=glucose,
-                gender_opt=gender_opt,
-                smoking_opt=smoking_opt,
-            )
+        with st.spinner("Analyzing biometric data..."), METRICS.request("analysis", "diabetes"):
+            diabetes_model, diabetes_scaler = load_artifacts("Diabetes")
+            # Compiled models carry the scaler's column order as feature_names_in_.
+            encoder_source = diabetes_model if diabetes_scaler is None else diabetes_scaler
+            with METRICS.stage("build_features", "diabetes"):
+                diabetes_features = get_diabetes_encoder(encoder_source).encode(
+                    age=age,
+                    hypertension_opt=hypertension_opt,
+                    heart_disease_opt=heart_disease_opt,
+                    bmi=bmi,
+                    hba1c=hba1c,
+                    glucose=glucose,
+                    gender_opt=gender_opt,
+                    smoking_opt=smoking_opt,
+                )
 
-            prediction, probability = predict_diabetes(
-                diabetes_model,
-                diabetes_scaler,
-                diabetes_features,
-            )
+            with METRICS.stage("predict", "diabetes"):
+                prediction, probability = predict_diabetes_cached(
+                    diabetes_model,
+                    diabetes_scaler,
+                    diabetes_features,
+                    batcher=get_batcher("diabetes", diabetes_model, diabetes_scaler),
+                )
             probability_percent = probability * 100
 
             st.markdown("### Analysis Results")
@@ -417,7 +404,7 @@ def render_diabetes_section(diabetes_model, diabetes_scaler, patient_name):
                     delta_color="inverse",
                 )
 
-            # Generate PDF report
+            # PDF report, rendered only if downloaded
             prediction_label = "High Risk" if prediction == 1 else "Low Risk"
             inputs_dict = {
                 "Age": age,
@@ -429,25 +416,15 @@ def render_diabetes_section(diabetes_model, diabetes_scaler, patient_name):
                 "HbA1c Level": hba1c,
                 "Blood Glucose Level": glucose,
             }
-            pdf_bytes = build_pdf_report(
-                disease_name="Diabetes",
-                patient_name=patient_name,
-                inputs=inputs_dict,
-                prediction_label=prediction_label,
-                probability_percent=probability_percent,
+            with METRICS.stage("explain", "diabetes"):
+                explanation = explain_diabetes(diabetes_model, diabetes_scaler, diabetes_features)
+            render_key_factors(explanation)
+            offer_pdf_report(
+                "Diabetes", patient_name, inputs_dict, prediction_label, probability_percent, explanation.factors(0)
             )
-            if pdf_bytes:
-                safe_filename = (patient_name.strip() or "Unknown").replace(" ", "_")
-                st.download_button(
-                    label="Download PDF Report",
-                    data=pdf_bytes,
-                    file_name=f"Diabetes_Report_{safe_filename}.pdf",
-                    mime="application/pdf",
-                    use_container_width=True,
-                )
 
 
-def render_heart_section(heart_model, heart_scaler, patient_name):
+def render_heart_section(patient_name):
     st.markdown("## Cardiac Health Assessment")
     st.markdown(
         """
@@ -501,26 +478,41 @@ def render_heart_section(heart_model, heart_scaler, patient_name):
     st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
     if st.button("Run Cardiac Analysis", use_container_width=True, key="heart_scan"):
-        with st.spinner("Analyzing cardiovascular data..."):
-            heart_features, bmi_val = build_heart_features(
-                age=age,
-                gender=gender,
-                height_cm=height_cm,
-                weight_kg=weight_kg,
-                systolic_bp=systolic_bp,
-                diastolic_bp=diastolic_bp,
-                cholesterol=cholesterol,
-                glucose=glucose,
-                smoke=smoke,
-                alco=alco,
-                active=active,
-            )
-
-            prediction, probability = predict_heart(
-                heart_model,
-                heart_scaler,
-                heart_features,
-            )
+        with st.spinner("Analyzing cardiovascular data..."), METRICS.request("analysis", "heart"):
+            heart_model, heart_scaler = load_artifacts("Heart Disease")
+            heart_inputs = {
+                "age": age,
+                "gender": gender,
+                "height_cm": height_cm,
+                "weight_kg": weight_kg,
+                "systolic_bp": systolic_bp,
+                "diastolic_bp": diastolic_bp,
+                "cholesterol": cholesterol,
+                "glucose": glucose,
+                "smoke": smoke,
+                "alco": alco,
+                "active": active,
+            }
+            # Precomputed tables (python heart_lut.py build) answer on-grid inputs
+            # without the model; anything else falls back to the live model.
+            with METRICS.stage("lut_lookup", "heart"):
+                lookup_table = load_heart_lut(version=artifact_version("heart"))
+                result = lookup_table.predict(**heart_inputs) if lookup_table is not None else None
+            heart_features = None
+            if result is not None:
+                prediction, probability = result
+                bmi_val = weight_kg / ((height_cm / 100.0) ** 2)
+            else:
+                with METRICS.stage("build_features", "heart"):
+                    heart_features, bmi_values = build_heart_feature_matrix(**heart_inputs)
+                bmi_val = float(bmi_values[0])
+
+                with METRICS.stage("predict", "heart"):
+                    prediction, probability = predict_heart_cached(
+                        heart_model,
+                        heart_scaler,
+                        heart_features,
+                    )
             probability_percent = probability * 100
 
             st.markdown("### Analysis Results")
@@ -550,7 +542,7 @@ def render_heart_section(heart_model, heart_scaler, patient_name):
                 )
                 st.metric("BMI", f"{bmi_val:.1f}")
 
-            # Generate PDF report
+            # PDF report, rendered only if downloaded
             prediction_label = "High Risk" if prediction == 1 else "Low Risk"
             inputs_dict = {
                 "Age": age,
@@ -566,19 +558,132 @@ def render_heart_section(heart_model, heart_scaler, patient_name):
                 "Alcohol Use": "Yes" if alco else "No",
                 "Physically Active": "Yes" if active else "No",
             }
-            pdf_bytes = build_pdf_report(
-                disease_name="Heart Disease",
-                patient_name=patient_name,
-                inputs=inputs_dict,
-                prediction_label=prediction_label,
-                probability_percent=probability_percent,
+            with METRICS.stage("explain", "heart"):
+                if heart_features is None:
+                    heart_features, _ = build_heart_feature_matrix(**heart_inputs)
+                # Coefficient x scaled value needs the unfolded model and its scaler.
+                explanation = explain_heart(load_heart_model(), load_heart_scaler(), heart_features)
+            render_key_factors(explanation)
+            offer_pdf_report(
+                "Heart Disease", patient_name, inputs_dict, prediction_label, probability_percent,
+                explanation.factors(0),
             )
-            if pdf_bytes:
-                safe_filename = (patient_name.strip() or "Unknown").replace(" ", "_")
+
+
+def render_combined_section(patient_name):
+    st.markdown("## Combined Screening")
+    st.markdown(
+        """
+<div class="info-box">
+    <strong>Combined Risk Module</strong><br>
+    Enter your parameters once to evaluate diabetes and cardiac risk together.
+</div>
+""",
+        unsafe_allow_html=True,
+    )
+
+    st.markdown("### Biometric Data")
+    col1, col2 = st.columns(2)
+    with col1:
+        age = st.number_input("Age (years)", 1, 120, 45, help="Range: 1-120", key="combo_age")
+        gender = st.selectbox("Gender", ["Female", "Male"], index=0, key="combo_gender")
+    with col2:
+        height_cm = st.number_input(
+            "Height (cm)", 120, 220, 170, help="Range: 120-220", key="combo_height"
+        )
+        weight_kg = st.number_input(
+            "Weight (kg)", 30.0, 200.0, 70.0, help="Range: 30-200", key="combo_weight"
+        )
+
+    st.markdown("### Vital Statistics")
+    col3, col4 = st.columns(2)
+    with col3:
+        systolic_bp = st.number_input(
+            "Systolic BP (mmHg)", 80, 200, 120, help="Range: 80-200", key="combo_systolic"
+        )
+        cholesterol = st.number_input(
+            "Cholesterol (mg/dL)", 100, 400, 200, help="Range: 100-400", key="combo_chol"
+        )
+        hba1c = st.number_input(
+            "HbA1c Level (%)", 3.0, 15.0, 5.5, help="Range: 3.0-15.0%", key="combo_hba1c"
+        )
+    with col4:
+        diastolic_bp = st.number_input(
+            "Diastolic BP (mmHg)", 50, 120, 80, help="Range: 50-120", key="combo_diastolic"
+        )
+        glucose = st.number_input(
+            "Blood Glucose (mg/dL)", 50, 300, 100, help="Range: 50-300", key="combo_glucose"
+        )
+
+    st.markdown("### Medical History & Lifestyle")
+    col5, col6 = st.columns(2)
+    with col5:
+        smoking_opt = st.selectbox(
+            "Smoking History",
+            ["never", "former", "ever", "current", "not current"],
+            index=0,
+            key="combo_smoking",
+        )
+        hypertension_opt = st.selectbox("Hypertension", ["No", "Yes"], index=0, key="combo_hypertension")
+    with col6:
+        heart_disease_opt = st.selectbox(
+            "Heart Disease History", ["No", "Yes"], index=0, key="combo_heart_disease"
+        )
+        alco = st.checkbox("Alcohol Use", value=False, key="combo_alco")
+        active = st.checkbox("Physically Active", value=True, key="combo_active")
+
+    st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
+
+    if st.button("Run Combined Analysis", use_container_width=True, key="combo_scan"):
+        with st.spinner("Analyzing both risk profiles..."), METRICS.request("analysis", "combined"):
+            diabetes_model, _ = load_artifacts("Diabetes")
+            heart_model, _ = load_artifacts("Heart Disease")
+            record = {
+                "age": age,
+                "gender": gender,
+                "height_cm": height_cm,
+                "weight_kg": weight_kg,
+                "systolic_bp": systolic_bp,
+                "diastolic_bp": diastolic_bp,
+                "cholesterol": cholesterol,
+                "glucose": glucose,
+                "hba1c": hba1c,
+                "smoking_history": smoking_opt,
+                "hypertension": hypertension_opt,
+                "heart_disease": heart_disease_opt,
+                "alco": alco,
+                "active": active,
+            }
+            # One encoding pass for both models; they are scored concurrently.
+            with METRICS.stage("predict", "combined"):
+                result = assess(
+                    record,
+                    diabetes_model,
+                    heart_model,
+                    batcher=get_batcher("diabetes", diabetes_model, None),
+                )
+
+            st.markdown("### Analysis Results")
+            st.caption(f"BMI: {result['bmi']:.1f} kg/m²")
+            columns = st.columns(2)
+            for column, (title, key) in zip(columns, [("DIABETES RISK", "diabetes"), ("CARDIAC RISK", "heart")]):
+                with column:
+                    outcome = result[key]
+                    probability_percent = outcome["probability"] * 100
+                    st.metric(
+                        title,
+                        f"{probability_percent:.1f}%",
+                        delta="HIGH" if outcome["prediction"] == 1 else "LOW",
+                        delta_color="inverse",
+                    )
+                    st.progress(outcome["probability"])
+
+            # One PDF with both reports, rendered only if downloaded
+            if pdf_available():
                 st.download_button(
-                    label="Download PDF Report",
-                    data=pdf_bytes,
-                    file_name=f"Heart_Disease_Report_{safe_filename}.pdf",
+                    label="Download Combined PDF Report",
+                    data=lambda: combined_report(patient_name, record, result),
+                    file_name=report_filename("Combined Screening", patient_name),
                     mime="application/pdf",
                     use_container_width=True,
                 )
@@ -607,6 +712,10 @@ def main():
         layout="centered",
         initial_sidebar_state="collapsed",
     )
+    # Load both models and the PDF fonts in the background while the header
+    # and form render; a scan clicked before it finishes waits for it.
+    start_warmup(extra=(warm_reports,))
+    METRICS.configure_from_env()
 
     inject_theme()
     render_header()
@@ -623,24 +732,24 @@ def main():
         unsafe_allow_html=True,
     )
 
-    diabetes_model, heart_model, diabetes_scaler, heart_scaler = load_artifacts()
-
     st.markdown("### Patient Information")
     patient_name = st.text_input("Enter your name (optional)")
 
     st.markdown("### Select Assessment Type")
     disease = st.selectbox(
         "Choose a condition to assess",
-        ["Diabetes", "Heart Disease"],
+        ["Diabetes", "Heart Disease", "Combined Screening"],
         label_visibility="collapsed",
     )
 
     st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
     if disease == "Diabetes":
-        render_diabetes_section(diabetes_model, diabetes_scaler, patient_name)
+        render_diabetes_section(patient_name)
+    elif disease == "Heart Disease":
+        render_heart_section(patient_name)
     else:
-        render_heart_section(heart_model, heart_scaler, patient_name)
+        render_combined_section(patient_name)
 
     render_footer()
 
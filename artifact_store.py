@@ -0,0 +1,242 @@
+"""Memory-mapped, pickle-free storage for model and scaler artifacts.
+
+Each artifact is a directory next to its pickle (``models/heart_model/`` for
+``models/heart_model.pkl``) holding one ``.npy`` file per parameter array and
+a ``manifest.json`` describing them. Arrays are opened with
+``np.load(mmap_mode="r")``, so every worker process on a host maps the same
+page-cache pages instead of unpickling a private copy, and nothing is
+executed while loading.
+
+Loading returns the pure-NumPy engines from ``inference``: scalers become
+``CompiledScaler``, logistic regressions ``CompiledLinearModel`` and random
+forests ``CompiledForest``. Export the current pickles with::
+
+    python artifact_store.py export
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from inference import CompiledForest, CompiledLinearModel, CompiledScaler
+
+MANIFEST_NAME = "manifest.json"
+FORMAT_VERSION = 1
+
+FOREST_ARRAYS = ("feature", "threshold", "left", "right", "children", "value", "roots")
+
+
+def artifact_dir_for(models_dir: Path, filename: str) -> Path:
+    """Return the array-artifact directory that shadows ``filename``'s pickle."""
+    return Path(models_dir) / Path(filename).stem
+
+
+def _to_engine(artifact: Any) -> Any:
+    """Convert a fitted sklearn estimator to its ``inference`` equivalent."""
+    if isinstance(artifact, (CompiledScaler, CompiledLinearModel, CompiledForest)):
+        return artifact
+    if hasattr(artifact, "estimators_") or hasattr(artifact, "tree_"):
+        return CompiledForest.from_sklearn(artifact)
+    if hasattr(artifact, "coef_"):
+        return CompiledLinearModel.from_sklearn(artifact)
+    if hasattr(artifact, "scale_") and hasattr(artifact, "transform"):
+        return CompiledScaler.from_sklearn(artifact)
+    raise TypeError(f"Unsupported artifact type: {type(artifact).__name__}")
+
+
+def _names(values: Optional[np.ndarray]) -> Optional[List[str]]:
+    return None if values is None else [str(value) for value in values]
+
+
+def _describe(engine: Any):
+    """Return ``(kind, arrays, attributes)`` for an inference engine."""
+    if isinstance(engine, CompiledScaler):
+        arrays = {"mean": engine.mean_, "scale": engine.scale_}
+        attributes = {"feature_names": _names(engine.feature_names_in_)}
+        return "standard_scaler", arrays, attributes
+    if isinstance(engine, CompiledLinearModel):
+        arrays = {"weights": engine.weights, "classes": engine.classes_}
+        attributes = {"intercept": engine.intercept, "feature_names": _names(engine.feature_names_in_)}
+        return "logistic_regression", arrays, attributes
+    arrays = {name: getattr(engine, name) for name in FOREST_ARRAYS}
+    arrays["classes"] = engine.classes_
+    attributes = {
+        "max_depth": engine.max_depth,
+        "n_features": engine.n_features_in_,
+        "prescaled": engine.prescaled,
+        "feature_names": _names(engine.feature_names_in_),
+    }
+    return "random_forest", arrays, attributes
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def save_array(directory: Path, name: str, values: np.ndarray) -> Dict[str, Any]:
+    """Save ``values`` as ``<name>-<sha256 prefix>.npy`` and return its manifest entry.
+
+    The array is written to a temporary file and renamed into place, so no
+    ``.npy`` is ever rewritten in place. A process that memory-mapped an
+    earlier version keeps its own inode; writing into that mapping's file
+    would hand it new weights or, if the file shrank, a SIGBUS.
+    """
+    values = np.ascontiguousarray(values)
+    temporary_path = Path(directory) / f".{name}.{os.getpid()}.tmp.npy"
+    np.save(temporary_path, values, allow_pickle=False)
+    digest = _sha256(temporary_path)
+    array_path = Path(directory) / f"{name}-{digest[:16]}.npy"
+    os.replace(temporary_path, array_path)
+    return {"file": array_path.name, "dtype": values.dtype.str, "shape": list(values.shape), "sha256": digest}
+
+
+def replace_manifest(directory: Path, manifest: Dict[str, Any], files: Optional[Iterable[str]] = None) -> Path:
+    """Atomically swap in ``manifest`` and delete the arrays it no longer references.
+
+    ``files`` lists the referenced ``.npy`` names for manifests without an
+    ``arrays`` mapping. Deleting only unlinks the old files; processes that
+    still map them keep reading the old arrays until they reload.
+    """
+    directory = Path(directory)
+    manifest_path = directory / MANIFEST_NAME
+    temporary_path = directory / f".{MANIFEST_NAME}.{os.getpid()}.tmp"
+    temporary_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(temporary_path, manifest_path)
+    referenced = set(files) if files is not None else {entry["file"] for entry in manifest["arrays"].values()}
+    for array_path in directory.glob("*.npy"):
+        if not array_path.name.startswith(".") and array_path.name not in referenced:
+            array_path.unlink(missing_ok=True)
+    return manifest_path
+
+
+def export_artifact(artifact: Any, directory: Path) -> Path:
+    """Write ``artifact`` as ``.npy`` arrays plus a manifest and return the manifest path.
+
+    Arrays get content-addressed names (see ``save_array``) and the manifest
+    is swapped in last, so re-exporting over a live artifact is safe: readers
+    see either the old manifest and arrays or the new ones, and the manifest's
+    own hash changes whenever any array does.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    kind, arrays, attributes = _describe(_to_engine(artifact))
+    entries = {name: save_array(directory, name, values) for name, values in arrays.items()}
+    manifest = {"format": FORMAT_VERSION, "kind": kind, "arrays": entries, "attributes": attributes}
+    return replace_manifest(directory, manifest)
+
+
+def load_manifest(directory: Path) -> Dict[str, Any]:
+    """Read and validate an artifact manifest.
+
+    Raises ``FileNotFoundError`` if it is missing and ``ValueError`` if it is
+    malformed (including valid JSON of the wrong shape) or from an unknown
+    format version.
+    """
+    manifest_path = Path(directory) / MANIFEST_NAME
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"Malformed manifest: {manifest_path}") from exc
+    if not isinstance(manifest, dict) or manifest.get("format") != FORMAT_VERSION or "arrays" not in manifest:
+        raise ValueError(f"Unsupported manifest format: {manifest_path}")
+    arrays = manifest["arrays"]
+    if not isinstance(arrays, dict) or not isinstance(manifest.get("attributes", {}), dict) or not all(
+        isinstance(entry, dict) and {"file", "dtype", "shape"} <= entry.keys() for entry in arrays.values()
+    ):
+        raise ValueError(f"Malformed manifest: {manifest_path}")
+    return manifest
+
+
+def _load_arrays(directory: Path, manifest: Dict[str, Any], mmap: bool, verify: bool) -> Dict[str, np.ndarray]:
+    arrays = {}
+    for name, entry in manifest["arrays"].items():
+        array_path = directory / entry["file"]
+        if verify and _sha256(array_path) != entry.get("sha256"):
+            raise ValueError(f"Checksum mismatch: {array_path}")
+        values = np.load(array_path, mmap_mode="r" if mmap else None, allow_pickle=False)
+        if values.dtype.str != entry["dtype"] or list(values.shape) != entry["shape"]:
+            raise ValueError(f"Array does not match manifest: {array_path}")
+        arrays[name] = values
+    return arrays
+
+
+def load_array_artifact(directory: Path, *, mmap: bool = True, verify: bool = False) -> Any:
+    """Load an exported artifact directory as an ``inference`` engine.
+
+    Arrays are memory-mapped read-only by default. ``verify`` re-hashes every
+    array against the manifest, which reads the whole file and so defeats
+    lazy paging; use it for artifacts fetched from untrusted storage.
+    """
+    directory = Path(directory)
+    manifest = load_manifest(directory)
+    arrays = _load_arrays(directory, manifest, mmap, verify)
+    attributes = manifest.get("attributes", {})
+    feature_names = attributes.get("feature_names")
+    feature_names = None if feature_names is None else np.asarray(feature_names, dtype=object)
+    kind = manifest.get("kind")
+
+    try:
+        if kind == "standard_scaler":
+            return CompiledScaler(arrays["mean"], arrays["scale"], feature_names)
+        if kind == "logistic_regression":
+            return CompiledLinearModel(
+                arrays["weights"], attributes["intercept"], arrays["classes"], feature_names
+            )
+        if kind == "random_forest":
+            return CompiledForest(
+                **{name: arrays[name] for name in FOREST_ARRAYS},
+                max_depth=attributes["max_depth"],
+                n_features=attributes["n_features"],
+                prescaled=attributes["prescaled"],
+                classes=arrays["classes"],
+                feature_names=feature_names,
+            )
+    except KeyError as exc:
+        raise ValueError(f"Incomplete artifact {directory}: missing {exc}") from exc
+    raise ValueError(f"Unknown artifact kind {kind!r} in {directory}")
+
+
+def export_models_dir(models_dir: Path, filenames: List[str]) -> List[Path]:
+    """Export each existing pickle in ``models_dir`` next to itself; return the manifests."""
+    manifests = []
+    for filename in filenames:
+        pickle_path = Path(models_dir) / filename
+        if not pickle_path.exists():
+            print(f"Skipping missing artifact: {pickle_path}", file=sys.stderr)
+            continue
+        with open(pickle_path, "rb") as handle:
+            artifact = pickle.load(handle)
+        manifests.append(export_artifact(artifact, artifact_dir_for(models_dir, filename)))
+    return manifests
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from utils import MODELS_DIR
+
+    parser = argparse.ArgumentParser(description="Export pickled artifacts to memory-mappable .npy files.")
+    parser.add_argument("command", choices=["export"])
+    parser.add_argument("--models-dir", type=Path, default=MODELS_DIR)
+    parser.add_argument(
+        "filenames",
+        nargs="*",
+        default=["diabetes_model.pkl", "diabetes_scaler.pkl", "heart_model.pkl", "heart_scaler.pkl"],
+    )
+    args = parser.parse_args(argv)
+    for manifest_path in export_models_dir(args.models_dir, args.filenames):
+        print(f"Exported {manifest_path.parent}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,201 @@
+"""Micro-batching dispatcher for single-patient predictions.
+
+Concurrent callers each submit a feature row. A background thread collects
+rows until ``max_batch_size`` rows are queued or ``max_wait`` seconds have
+passed since the first one, runs a single vectorized ``predict_batch`` over
+the stacked matrix and resolves every caller's future with its slice. Under
+load the fixed per-call cost (sklearn validation, per-tree dispatch) is paid
+once per batch instead of once per patient. A lone request waits at most
+``max_wait`` extra.
+
+    batcher = MicroBatcher(lambda rows: model.predict_batch(rows), max_wait=0.002)
+    label, probability = batcher.predict(row)              # from any thread
+    label, probability = await batcher.predict_async(row)  # from an event loop
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+BatchPredictor = Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]]
+
+_STOP = object()
+
+
+class _Pending:
+    __slots__ = ("features", "future")
+
+    def __init__(self, features: np.ndarray, future: Future) -> None:
+        self.features = features
+        self.future = future
+
+
+class MicroBatcher:
+    """Coalesce concurrent ``predict`` calls into batched ``predict_batch`` calls.
+
+    ``predict_batch`` receives an ``(n, n_features)`` float64 matrix and must
+    return ``(labels, probabilities)`` arrays of length ``n``. It is called
+    from the dispatcher thread, and after ``retire`` from submitting threads.
+    """
+
+    def __init__(
+        self,
+        predict_batch: BatchPredictor,
+        *,
+        max_batch_size: int = 64,
+        max_wait: float = 0.002,
+        name: str = "micro-batcher",
+    ) -> None:
+        if max_batch_size < 1 or max_wait < 0:
+            raise ValueError("max_batch_size must be >= 1 and max_wait >= 0")
+        self.predict_batch = predict_batch
+        self.max_batch_size = int(max_batch_size)
+        self.max_wait = float(max_wait)
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._carry: Optional[_Pending] = None
+        self._closed = False
+        self._retired = False
+        self._lock = threading.Lock()
+        # After ``retire`` several caller threads dispatch at once.
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.rows = 0
+        self.largest_batch = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, features: Any) -> Future:
+        """Queue one row (or a small ``(k, n_features)`` block); return a future of ``(labels, probabilities)``."""
+        matrix = np.asarray(features, dtype=np.float64)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        future: Future = Future()
+        with self._lock:
+            if self._retired:
+                pending = _Pending(matrix, future)
+            elif self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            else:
+                self._queue.put(_Pending(matrix, future))
+                return future
+        # Retired: score on the caller's thread instead of queueing.
+        self._dispatch([pending])
+        return future
+
+    def predict(self, features: Any) -> Tuple[int, float]:
+        """Block until the batch holding this row has run; return ``(label, probability)``."""
+        labels, probabilities = self.submit(features).result()
+        return int(labels[0]), float(probabilities[0])
+
+    async def predict_async(self, features: Any) -> Tuple[int, float]:
+        """``predict`` for coroutines: awaits the batch without blocking the event loop."""
+        import asyncio  # only callers already running an event loop pay for it
+
+        labels, probabilities = await asyncio.wrap_future(self.submit(features))
+        return int(labels[0]), float(probabilities[0])
+
+    def _next(self, timeout: Optional[float]) -> Any:
+        if self._carry is not None:
+            pending, self._carry = self._carry, None
+            return pending
+        return self._queue.get(timeout=timeout) if timeout is not None else self._queue.get()
+
+    def _collect(self) -> Tuple[List[_Pending], bool]:
+        """Block for the first row, then gather until the size or time limit."""
+        first = self._next(None)
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        rows = first.features.shape[0]
+        deadline = time.monotonic() + self.max_wait
+        while rows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                pending = self._next(remaining)
+            except queue.Empty:
+                break
+            if pending is _STOP:
+                return batch, True
+            if rows + pending.features.shape[0] > self.max_batch_size:
+                self._carry = pending
+                break
+            batch.append(pending)
+            rows += pending.features.shape[0]
+        return batch, False
+
+    def _dispatch(self, batch: List[_Pending]) -> None:
+        live = [pending for pending in batch if pending.future.set_running_or_notify_cancel()]
+        if not live:
+            return
+        try:
+            matrix = live[0].features if len(live) == 1 else np.vstack([pending.features for pending in live])
+            labels, probabilities = self.predict_batch(matrix)
+        except BaseException as exc:  # hand the failure to every waiting caller
+            for pending in live:
+                pending.future.set_exception(exc)
+            return
+        with self._stats_lock:
+            self.batches += 1
+            self.rows += matrix.shape[0]
+            self.largest_batch = max(self.largest_batch, matrix.shape[0])
+        offset = 0
+        for pending in live:
+            stop = offset + pending.features.shape[0]
+            pending.future.set_result((labels[offset:stop], probabilities[offset:stop]))
+            offset = stop
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect()
+            if batch:
+                self._dispatch(batch)
+        # Drain anything queued before close() so no caller waits forever.
+        while self._carry is not None or not self._queue.empty():
+            pending = self._next(None)
+            if pending is not _STOP:
+                self._dispatch([pending])
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting rows, finish queued work and join the dispatcher thread.
+
+        Also ends a retired batcher's direct scoring.
+        """
+        with self._lock:
+            self._retired = False
+            if not self._closed:
+                self._closed = True
+                self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def retire(self) -> None:
+        """Stop the dispatcher once queued rows are done, but keep answering.
+
+        Unlike ``close``, later ``submit`` calls are scored unbatched on the
+        caller's thread instead of raising, so threads that still hold a
+        replaced batcher (see ``utils.get_batcher``) get their results.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = self._retired = True
+            self._queue.put(_STOP)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return batch counters and the mean rows per batch."""
+        with self._stats_lock:
+            batches, rows, largest_batch = self.batches, self.rows, self.largest_batch
+        return {
+            "batches": batches,
+            "rows": rows,
+            "mean_batch_size": rows / batches if batches else 0.0,
+            "largest_batch": largest_batch,
+            "max_batch_size": self.max_batch_size,
+            "max_wait": self.max_wait,
+        }
@@ -0,0 +1,70 @@
+"""Compare sklearn and compiled-forest inference for the diabetes model.
+
+    python benchmarks/bench_forest.py --batch-sizes 1 100 10000
+
+Prints one JSON line per batch size with the median seconds per call for
+sklearn ``predict_proba`` (on scaled input), the compiled forest on scaled
+input and the compiled forest with folded thresholds on raw input, plus the
+largest probability difference from sklearn.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from inference import CompiledForest
+from utils import get_diabetes_encoder, load_diabetes_model, load_diabetes_scaler
+
+DIABETES_CSV = Path(__file__).resolve().parent.parent / "data" / "diabetes.csv"
+
+
+def _median_seconds(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 10_000])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    model = load_diabetes_model()
+    scaler = load_diabetes_scaler()
+    compiled = CompiledForest.from_sklearn(model)
+    folded = CompiledForest.from_sklearn(model, scaler)
+
+    records = pd.read_csv(DIABETES_CSV, nrows=max(args.batch_sizes))
+    raw = get_diabetes_encoder(scaler).encode_records(records)
+    scaled = (raw - scaler.mean_) / scaler.scale_
+
+    for batch_size in args.batch_sizes:
+        raw_batch, scaled_batch = raw[:batch_size], scaled[:batch_size]
+        repeats = max(3, args.repeats if batch_size < 10_000 else args.repeats // 4)
+        expected = model.predict_proba(scaled_batch)[:, 1]
+        result = {
+            "batch_size": batch_size,
+            "sklearn_s": _median_seconds(lambda: model.predict_proba(scaled_batch), repeats),
+            "compiled_s": _median_seconds(lambda: compiled.positive_proba(scaled_batch), repeats),
+            "compiled_folded_s": _median_seconds(lambda: folded.positive_proba(raw_batch), repeats),
+            "max_abs_diff": float(np.abs(compiled.positive_proba(scaled_batch) - expected).max()),
+            "max_abs_diff_folded": float(np.abs(folded.positive_proba(raw_batch) - expected).max()),
+        }
+        result["speedup"] = result["sklearn_s"] / result["compiled_s"]
+        print(json.dumps(result))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,167 @@
+"""Measure cold import time of the app's entry modules with ``python -X importtime``.
+
+    python benchmarks/bench_imports.py
+    python benchmarks/bench_imports.py --save-baseline     # record this machine's numbers
+    python benchmarks/bench_imports.py --tolerance 0.25    # fail on >25% median regressions
+
+Every module is imported ``--runs`` times in a fresh interpreter. Each module
+prints one JSON line with the median and fastest cumulative import time and
+its heaviest direct dependencies. Importing ``utils``, ``reports``,
+``bulk_reports``, ``service`` or ``app`` must not load pandas, sklearn or
+fpdf; those are deferred to first use. The command exits 1 if any of them is
+loaded, or if a median exceeds the module's ``IMPORT_BUDGETS`` share of what
+importing the deferred packages costs on the same machine. A budget relative
+to that cost holds on any machine, so it is checked even without a baseline.
+When the baseline file exists, it also exits 1 if a median got slower than
+``--tolerance``.
+"""
+
+import argparse
+import importlib.util
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "import_baseline.json"
+DEFAULT_MODULES = ["utils", "reports", "bulk_reports", "service", "app"]
+DEFERRED = ("pandas", "sklearn", "fpdf")
+# What the entry modules would import without deferral.
+DEFERRED_IMPORTS = ("pandas", "sklearn.ensemble", "sklearn.linear_model", "fpdf")
+# Largest median import time per module as a fraction of importing DEFERRED_IMPORTS,
+# about twice the measured ratio (0.05-0.11 for the light modules, 0.27 for app
+# with Streamlit), so noise passes but any new heavy import at module level fails.
+IMPORT_BUDGETS = {"utils": 0.15, "reports": 0.15, "bulk_reports": 0.15, "service": 0.25, "app": 0.5}
+
+
+def parse_importtime(stderr: str) -> Dict[str, Any]:
+    """Parse ``-X importtime`` output into per-package cumulative microseconds.
+
+    Returns ``{"cumulative_us": {name: us}, "children": {name: [(name, us), ...]},
+    "top_level": [(name, us), ...]}`` where ``children`` lists each package's
+    direct imports and ``top_level`` the imports made by the script itself.
+    """
+    top_level: List[tuple] = []
+    cumulative: Dict[str, int] = {}
+    children: Dict[str, List[tuple]] = {}
+    pending: List[tuple] = []  # (depth, name, us), innermost imports are printed first
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        name = name.strip()
+        cumulative[name] = int(us)
+        direct = [(child, child_us) for child_depth, child, child_us in pending if child_depth == depth + 1]
+        children[name] = sorted(direct, key=lambda item: -item[1])
+        pending = [entry for entry in pending if entry[0] <= depth] + [(depth, name, int(us))]
+        if depth == 0:
+            top_level.append((name, int(us)))
+    return {"cumulative_us": cumulative, "children": children, "top_level": top_level}
+
+
+def import_once(module: str) -> Dict[str, Any]:
+    """Import ``module`` (or a comma-separated list) in a fresh interpreter; return its parsed import times."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return parse_importtime(completed.stderr)
+
+
+def deferred_import_ms(runs: int) -> float:
+    """Median milliseconds to import the installed ``DEFERRED_IMPORTS`` in a fresh interpreter."""
+    installed = [name for name in DEFERRED_IMPORTS if importlib.util.find_spec(name.split(".")[0]) is not None]
+    totals = []
+    for _ in range(runs):
+        top_level = import_once(", ".join(installed))["top_level"]
+        totals.append(sum(us for name, us in top_level if name.split(".")[0] in DEFERRED) / 1000.0)
+    return float(np.median(totals))
+
+
+def bench_module(module: str, runs: int) -> Dict[str, Any]:
+    """Return median/min cumulative milliseconds, the top dependencies and any deferred package loaded."""
+    samples = [import_once(module) for _ in range(runs)]
+    totals = np.array([sample["cumulative_us"][module] for sample in samples]) / 1000.0
+    last = samples[-1]
+    return {
+        "module": module,
+        "median_ms": float(np.median(totals)),
+        "min_ms": float(totals.min()),
+        "top_imports_ms": {name: us / 1000.0 for name, us in last["children"][module][:5]},
+        "deferred_loaded": sorted(name for name in DEFERRED if name in last["cumulative_us"]),
+    }
+
+
+def compare(
+    results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float, deferred_ms: Optional[float] = None
+) -> List[str]:
+    """Return a message for every deferred package loaded and every median past its budget or the baseline.
+
+    ``deferred_ms`` is ``deferred_import_ms()``; budgets are skipped without it.
+    """
+    problems = []
+    for result in results:
+        if result["deferred_loaded"]:
+            problems.append(f"{result['module']}: imports {', '.join(result['deferred_loaded'])} at import time")
+        share = IMPORT_BUDGETS.get(result["module"])
+        if deferred_ms is not None and share is not None and result["median_ms"] > share * deferred_ms:
+            problems.append(
+                f"{result['module']}: median {result['median_ms']:.1f} ms > budget {share * deferred_ms:.1f} ms "
+                f"({share:.0%} of the {deferred_ms:.0f} ms deferred imports)"
+            )
+        previous = baseline.get(result["module"])
+        if previous is None:
+            continue
+        limit = previous["median_ms"] * (1.0 + tolerance)
+        if result["median_ms"] > limit:
+            problems.append(
+                f"{result['module']}: median {result['median_ms']:.1f} ms > baseline {previous['median_ms']:.1f} ms "
+                f"+ {tolerance:.0%}"
+            )
+    return problems
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Measure cold import time of the entry modules.")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module (default: 5)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed median slowdown (default: 0.25)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    deferred_ms = deferred_import_ms(args.runs)
+    print(json.dumps({"deferred_imports": list(DEFERRED_IMPORTS), "median_ms": deferred_ms}))
+    results = []
+    for module in args.modules:
+        result = bench_module(module, args.runs)
+        results.append(result)
+        print(json.dumps(result))
+
+    if args.save_baseline:
+        measured = {result["module"]: {"median_ms": result["median_ms"]} for result in results}
+        args.baseline.write_text(json.dumps(measured, indent=2, sort_keys=True))
+        print(f"Saved baseline to {args.baseline}", file=sys.stderr)
+        baseline: Dict[str, Any] = {}
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+    else:
+        print(f"WARNING no baseline at {args.baseline}; only the deferred imports and budgets were checked. "
+              "Record one on this machine with --save-baseline.", file=sys.stderr)
+        baseline = {}
+    problems = compare(results, baseline, args.tolerance, deferred_ms)
+    for problem in problems:
+        print(f"REGRESSION {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,235 @@
+"""Time every stage of the prediction request path for both diseases.
+
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --save-baseline     # record this machine's numbers
+    python benchmarks/bench_pipeline.py --tolerance 0.25    # fail on >25% p50 regressions
+    python benchmarks/bench_pipeline.py --baseline ci.json  # exit 2 if ci.json is missing
+
+Stages, each timed on its own:
+
+* ``artifact_load``: cold model + scaler load through the artifact registry
+* ``form_features``: ``build_diabetes_features`` / ``build_heart_features`` (one row)
+* ``features``: vectorized encoding of raw dataset rows
+* ``scaler_transform``, ``predict``, ``predict_proba``: the sklearn artifacts
+* ``compiled_predict_proba``: the compiled engine the Streamlit app serves
+* ``pdf_report``: ``app.build_pdf_report`` for one patient
+
+Batched stages run at ``--batch-sizes`` (default 1, 100, 10k, 100k rows,
+tiling the dataset when it is shorter). Every stage prints one JSON line with
+p50/p95/p99 milliseconds and rows per second. p50s are compared against the
+baseline file and the command exits 1 if any stage got slower than
+``--tolerance``. Timings only compare on one machine, so no baseline is
+committed: without ``benchmarks/baseline.json`` the run prints a warning, and
+an explicit ``--baseline`` that does not exist fails with exit code 2 before
+anything is timed. A disease whose artifacts are missing is reported as
+skipped.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import utils
+from utils import (
+    ArtifactLoadError,
+    build_diabetes_features,
+    build_heart_features,
+    get_diabetes_encoder,
+    heart_matrix_from_records,
+)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_BATCH_SIZES = [1, 100, 10_000, 100_000]
+
+RECORD_SOURCES = {"diabetes": ("diabetes.csv", ","), "heart": ("heart.csv", ";")}
+DISPLAY_NAMES = {"diabetes": "Diabetes", "heart": "Heart Disease"}
+
+PDF_INPUTS = {
+    "diabetes": {"Age": 45, "Gender": "Male", "BMI": 28.5, "HbA1c Level": 6.2, "Blood Glucose Level": 140},
+    "heart": {"Age": 55, "Gender": "Female", "Systolic BP (mmHg)": 130, "Diastolic BP (mmHg)": 85},
+}
+
+
+def time_calls(func: Callable[[], Any], repeats: int) -> np.ndarray:
+    """Return per-call wall times in seconds for ``repeats`` calls after one warm-up."""
+    func()
+    timings = np.empty(repeats)
+    for position in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings[position] = time.perf_counter() - started
+    return timings
+
+
+def summarize(disease: str, stage: str, batch_size: int, timings: np.ndarray) -> Dict[str, Any]:
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+    return {
+        "disease": disease,
+        "stage": stage,
+        "batch_size": batch_size,
+        "repeats": int(timings.shape[0]),
+        "p50_ms": float(p50 * 1e3),
+        "p95_ms": float(p95 * 1e3),
+        "p99_ms": float(p99 * 1e3),
+        "rows_per_s": float(batch_size / p50) if p50 > 0 else float("inf"),
+    }
+
+
+def repeats_for(batch_size: int, repeats: int) -> int:
+    """Scale repeats down for large batches so every stage finishes in seconds."""
+    return max(3, min(repeats, repeats * 100 // max(batch_size, 1)))
+
+
+def load_records(disease: str, rows: int) -> pd.DataFrame:
+    """Return ``rows`` raw records, tiling the dataset if it is shorter."""
+    filename, sep = RECORD_SOURCES[disease]
+    records = pd.read_csv(DATA_DIR / filename, sep=sep)
+    if len(records) < rows:
+        records = records.iloc[np.resize(np.arange(len(records)), rows)]
+    return records.iloc[:rows].reset_index(drop=True)
+
+
+def _load_artifacts(disease: str):
+    if disease == "diabetes":
+        return utils.load_diabetes_model(), utils.load_diabetes_scaler(), utils.load_compiled_diabetes_model
+    return utils.load_heart_model(), utils.load_heart_scaler(), utils.load_compiled_heart_model
+
+
+def _form_features(disease: str) -> Callable[[], Any]:
+    if disease == "diabetes":
+        return lambda: build_diabetes_features(
+            age=45, hypertension_opt="No", heart_disease_opt="No", bmi=28.5, hba1c=6.2,
+            glucose=140, gender_opt="Male", smoking_opt="never",
+        )
+    return lambda: build_heart_features(
+        age=55, gender="Female", height_cm=165, weight_kg=70, systolic_bp=130, diastolic_bp=85,
+        cholesterol=210, glucose=95, smoke=False, alco=False, active=True,
+    )
+
+
+def _cold_load(disease: str) -> None:
+    utils.ARTIFACT_REGISTRY.clear()
+    utils._COMPILED_MODELS.clear()
+    _load_artifacts(disease)
+
+
+def bench_disease(
+    disease: str, batch_sizes: List[int], repeats: int, pdf: bool = True
+) -> Iterator[Dict[str, Any]]:
+    """Yield one summary per stage and batch size for ``disease``."""
+    try:
+        model, scaler, load_compiled = _load_artifacts(disease)
+        compiled = load_compiled()
+    except ArtifactLoadError as exc:
+        yield {"disease": disease, "skipped": str(exc)}
+        return
+
+    yield summarize(disease, "artifact_load", 1, time_calls(lambda: _cold_load(disease), max(3, repeats // 10)))
+    model, scaler, load_compiled = _load_artifacts(disease)
+    compiled = load_compiled()
+    yield summarize(disease, "form_features", 1, time_calls(_form_features(disease), repeats))
+
+    records = load_records(disease, max(batch_sizes))
+    if disease == "diabetes":
+        encoder = get_diabetes_encoder(scaler)
+        encode = encoder.encode_records
+        columns = list(encoder.feature_names)
+    else:
+        encode = heart_matrix_from_records
+        columns = list(utils.HEART_FEATURE_COLUMNS)
+
+    for batch_size in batch_sizes:
+        batch = records.iloc[:batch_size]
+        calls = repeats_for(batch_size, repeats)
+        features = encode(batch)
+        frame = pd.DataFrame(features, columns=columns)
+        scaled = scaler.transform(frame)
+        yield summarize(disease, "features", batch_size, time_calls(lambda: encode(batch), calls))
+        yield summarize(disease, "scaler_transform", batch_size, time_calls(lambda: scaler.transform(frame), calls))
+        yield summarize(disease, "predict", batch_size, time_calls(lambda: model.predict(scaled), calls))
+        yield summarize(disease, "predict_proba", batch_size, time_calls(lambda: model.predict_proba(scaled), calls))
+        yield summarize(
+            disease, "compiled_predict_proba", batch_size, time_calls(lambda: compiled.predict_proba(features), calls)
+        )
+
+    if pdf:
+        from app import build_pdf_report
+
+        report = lambda: build_pdf_report(
+            disease_name=DISPLAY_NAMES[disease], patient_name="Benchmark Patient",
+            inputs=PDF_INPUTS[disease], prediction_label="High Risk", probability_percent=72.5,
+        )
+        yield summarize(disease, "pdf_report", 1, time_calls(report, max(3, repeats // 2)))
+
+
+def _key(result: Dict[str, Any]) -> str:
+    return f"{result['disease']}/{result['stage']}/{result['batch_size']}"
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return a message for every stage whose p50 exceeds the baseline by more than ``tolerance``."""
+    regressions = []
+    for result in results:
+        previous = baseline.get(_key(result)) if "p50_ms" in result else None
+        if previous is None:
+            continue
+        limit = previous["p50_ms"] * (1.0 + tolerance)
+        if result["p50_ms"] > limit:
+            regressions.append(
+                f"{_key(result)}: p50 {result['p50_ms']:.3f} ms > baseline {previous['p50_ms']:.3f} ms "
+                f"(+{result['p50_ms'] / previous['p50_ms'] - 1:.0%})"
+            )
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark every stage of the prediction path.")
+    parser.add_argument("--diseases", nargs="+", choices=sorted(RECORD_SOURCES), default=sorted(RECORD_SOURCES))
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--repeats", type=int, default=50, help="Calls per single-row stage (default: 50)")
+    parser.add_argument("--no-pdf", action="store_true", help="Skip the PDF stage (avoids importing the app)")
+    parser.add_argument("--baseline", type=Path, default=None,
+                        help=f"Baseline to compare against; must exist if given (default: {DEFAULT_BASELINE.name})")
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p50 slowdown (default: 0.25)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    baseline_path = args.baseline or DEFAULT_BASELINE
+    if args.baseline is not None and not args.save_baseline and not args.baseline.exists():
+        print(f"error: baseline {args.baseline} does not exist; record one with --save-baseline", file=sys.stderr)
+        return 2
+    results = []
+    for disease in args.diseases:
+        for result in bench_disease(disease, args.batch_sizes, args.repeats, pdf=not args.no_pdf):
+            print(json.dumps(result), flush=True)
+            results.append(result)
+
+    measured = {_key(result): result for result in results if "p50_ms" in result}
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(measured, indent=2, sort_keys=True))
+        print(f"Saved baseline to {baseline_path}", file=sys.stderr)
+        return 0
+    if not baseline_path.exists():
+        print(f"WARNING no baseline at {baseline_path}; nothing was checked for regressions. "
+              "Record one on this machine with --save-baseline.", file=sys.stderr)
+        return 0
+    regressions = compare(results, json.loads(baseline_path.read_text()), args.tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
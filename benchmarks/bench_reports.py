@@ -0,0 +1,74 @@
+"""Compare FPDF and template-based PDF report generation.
+
+    python benchmarks/bench_reports.py --reports 2000
+
+Prints one JSON line per condition and engine with the median microseconds
+per report, reports per second and the output size. ``fpdf`` rebuilds the
+document on every call (``reports.build_fpdf_report``); ``template`` fills a
+precompiled layout (``reports.build_report``); ``template_wrapped`` forces the
+general flow path with a value long enough to wrap.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from reports import build_fpdf_report, build_report
+
+INPUTS = {
+    "Diabetes": {
+        "Age": 45, "Gender": "Male", "BMI": 28.5, "Smoking History": "never", "Hypertension": "No",
+        "Heart Disease": "No", "HbA1c Level": 6.2, "Blood Glucose Level": 140,
+    },
+    "Heart Disease": {
+        "Age": 55, "Gender": "Female", "Height (cm)": 165, "Weight (kg)": 70, "BMI": "25.7",
+        "Systolic BP (mmHg)": 130, "Diastolic BP (mmHg)": 85, "Cholesterol (mg/dL)": 220,
+        "Glucose (mg/dL)": 110, "Smoker": "No", "Alcohol Use": "No", "Physically Active": "Yes",
+    },
+}
+
+
+def _per_report_seconds(build, disease_name, inputs, reports, rounds=5):
+    build(disease_name, "Benchmark Patient", inputs, "High Risk", 72.5)
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for position in range(reports):
+            build(disease_name, f"Patient {position}", inputs, "High Risk", 72.5)
+        timings.append((time.perf_counter() - start) / reports)
+    return float(np.median(timings))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reports", type=int, default=1000, help="Reports per timing round (default: 1000)")
+    args = parser.parse_args(argv)
+
+    for disease_name, inputs in INPUTS.items():
+        wrapped = dict(inputs, Gender="a value long enough to wrap onto a second line of the inputs column " * 2)
+        engines = {
+            "fpdf": (build_fpdf_report, inputs),
+            "template": (build_report, inputs),
+            "template_wrapped": (build_report, wrapped),
+        }
+        for engine, (build, engine_inputs) in engines.items():
+            seconds = _per_report_seconds(build, disease_name, engine_inputs, args.reports)
+            pdf_bytes = build(disease_name, "Benchmark Patient", engine_inputs, "High Risk", 72.5)
+            print(json.dumps({
+                "condition": disease_name,
+                "engine": engine,
+                "us_per_report": seconds * 1e6,
+                "reports_per_s": 1.0 / seconds,
+                "bytes": len(pdf_bytes),
+            }))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
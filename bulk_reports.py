@@ -0,0 +1,297 @@
+"""Bulk PDF report export into a streamed ZIP archive.
+
+    python bulk_reports.py heart data/heart.csv heart_reports.zip --workers 4
+    python bulk_reports.py diabetes scores.csv - --name-column name > reports.zip
+
+Reads a patient file in the raw ``data/diabetes.csv`` / ``data/heart.csv``
+schema (or the output of ``score_csv.py``) in chunks, scoring chunks that have
+no ``prediction``/``probability`` columns yet. Reports are rendered in batches
+of ``--batch-size`` on a process pool, with at most two batches per worker in
+flight. Each finished batch is appended to a ZIP written incrementally to a
+file, stdout or an HTTP response, so memory stays bounded by
+``chunksize + workers * 2 * batch_size`` reports however many patients there
+are. Entries use the app's ``Diabetes_Report_<name>.pdf`` /
+``Heart_Disease_Report_<name>.pdf`` names, and repeated names get ``_2``,
+``_3``, ... suffixes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from reports import build_report, report_filename
+from utils import ArtifactLoadError
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DISEASE_NAMES = {"diabetes": "Diabetes", "heart": "Heart Disease"}
+DEFAULT_CHUNKSIZE = 10_000
+DEFAULT_BATCH_SIZE = 500
+
+# (patient name, report inputs, prediction label, probability percent)
+ReportJob = Tuple[str, Dict[str, Any], str, float]
+
+_YES_NO = np.array(["No", "Yes"], dtype=object)
+_CATEGORIES = np.array(["", "Normal", "Above Normal", "Well Above Normal"], dtype=object)
+
+
+def _flags(values: pd.Series) -> np.ndarray:
+    return _YES_NO[values.to_numpy(dtype=np.int64).clip(0, 1)]
+
+
+def report_inputs(disease: str, records: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Turn raw-schema rows into the input tables the app's reports show."""
+    if disease == "diabetes":
+        columns = {
+            "Age": records["age"],
+            "Gender": records["gender"],
+            "BMI": records["bmi"],
+            "Smoking History": records["smoking_history"],
+            "Hypertension": _flags(records["hypertension"]),
+            "Heart Disease": _flags(records["heart_disease"]),
+            "HbA1c Level": records["HbA1c_level"],
+            "Blood Glucose Level": records["blood_glucose_level"],
+        }
+    else:
+        # The raw heart file stores age in days and cholesterol/glucose as 1-3 categories.
+        height = records["height"].to_numpy(dtype=np.float64)
+        weight = records["weight"].to_numpy(dtype=np.float64)
+        columns = {
+            "Age": np.round(records["age"].to_numpy(dtype=np.float64) / 365.25, 1),
+            "Gender": np.where(records["gender"].to_numpy() == 2, "Female", "Male"),
+            "Height (cm)": height,
+            "Weight (kg)": weight,
+            "BMI": [f"{value:.1f}" for value in weight / (height / 100.0) ** 2],
+            "Systolic BP (mmHg)": records["ap_hi"],
+            "Diastolic BP (mmHg)": records["ap_lo"],
+            "Cholesterol": _CATEGORIES[records["cholesterol"].to_numpy(dtype=np.int64).clip(0, 3)],
+            "Glucose": _CATEGORIES[records["gluc"].to_numpy(dtype=np.int64).clip(0, 3)],
+            "Smoker": _flags(records["smoke"]),
+            "Alcohol Use": _flags(records["alco"]),
+            "Physically Active": _flags(records["active"]),
+        }
+    labels = list(columns)
+    values = [np.asarray(column, dtype=object).tolist() for column in columns.values()]
+    return [dict(zip(labels, row)) for row in zip(*values)]
+
+
+def chunk_jobs(
+    disease: str, chunk: pd.DataFrame, name_column: Optional[str], first_row: int, threshold: float = 0.5
+) -> List[ReportJob]:
+    """Score ``chunk`` if needed and return one report job per row."""
+    from score_csv import score_chunk  # pandas is only needed once CSV rows are involved
+
+    if "prediction" not in chunk or "probability" not in chunk:
+        chunk = score_chunk(disease, chunk, threshold)
+    if name_column:
+        names = chunk[name_column].fillna("").astype(str).tolist()
+    else:
+        names = [f"Patient {first_row + offset + 1}" for offset in range(len(chunk))]
+    labels = np.where(chunk["prediction"].to_numpy() == 1, "High Risk", "Low Risk").tolist()
+    percents = (chunk["probability"].to_numpy(dtype=np.float64) * 100).tolist()
+    return list(zip(names, report_inputs(disease, chunk), labels, percents))
+
+
+def render_batch(disease_name: str, jobs: List[ReportJob], timestamp: str) -> List[bytes]:
+    """Render one batch of reports (runs in a pool worker; templates are cached per process)."""
+    return [
+        build_report(disease_name, name, inputs, label, percent, timestamp=timestamp)
+        for name, inputs, label, percent in jobs
+    ]
+
+
+def _batched(jobs: Iterable[ReportJob], size: int) -> Iterator[List[ReportJob]]:
+    batch: List[ReportJob] = []
+    for job in jobs:
+        batch.append(job)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class UniqueNames:
+    """Hands out report file names, suffixing repeats with ``_2``, ``_3``, ..."""
+
+    def __init__(self) -> None:
+        self._seen: Dict[str, int] = {}
+
+    def __call__(self, filename: str) -> str:
+        count = self._seen.get(filename, 0) + 1
+        self._seen[filename] = count
+        if count == 1:
+            return filename
+        stem, dot, extension = filename.rpartition(".")
+        candidate = f"{stem}_{count}{dot}{extension}"
+        # A real patient may already be called "<name>_2"; keep counting past it.
+        while candidate in self._seen:
+            count += 1
+            candidate = f"{stem}_{count}{dot}{extension}"
+        self._seen[filename] = count
+        self._seen[candidate] = 1
+        return candidate
+
+
+def render_reports(
+    disease: str,
+    jobs: Iterable[ReportJob],
+    *,
+    workers: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[Tuple[str, bytes]]:
+    """Yield ``(file name, pdf bytes)`` in job order, rendering batches on a process pool.
+
+    At most two batches per worker are in flight, so memory stays
+    proportional to ``workers * batch_size`` reports.
+    """
+    disease_name = DISEASE_NAMES[disease]
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+    unique = UniqueNames()
+
+    def named(batch: List[ReportJob], rendered: List[bytes]) -> Iterator[Tuple[str, bytes]]:
+        for (name, _, _, _), pdf_bytes in zip(batch, rendered):
+            yield unique(report_filename(disease_name, name)), pdf_bytes
+
+    batches = _batched(jobs, batch_size)
+    if workers <= 1:
+        for batch in batches:
+            yield from named(batch, render_batch(disease_name, batch, timestamp))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque = deque()
+        for batch in batches:
+            pending.append((batch, pool.submit(render_batch, disease_name, batch, timestamp)))
+            if len(pending) >= workers * 2:
+                done, future = pending.popleft()
+                yield from named(done, future.result())
+        while pending:
+            done, future = pending.popleft()
+            yield from named(done, future.result())
+
+
+class _ChunkSink:
+    """Write-only, unseekable file object that collects bytes for ``iter_zip``."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip(entries: Iterable[Tuple[str, bytes]], compression: int = zipfile.ZIP_DEFLATED) -> Iterator[bytes]:
+    """Yield a ZIP archive of ``entries`` piece by piece, e.g. as an HTTP response body.
+
+    The archive is built on an unseekable sink, so ``zipfile`` writes data
+    descriptors instead of seeking back and nothing but the current entry
+    and the central directory is held in memory.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=compression) as archive:
+        for name, data in entries:
+            archive.writestr(name, data)
+            chunk = sink.take()
+            if chunk:
+                yield chunk
+    yield sink.take()
+
+
+def write_zip(
+    entries: Iterable[Tuple[str, bytes]], output: BinaryIO, compression: int = zipfile.ZIP_DEFLATED
+) -> int:
+    """Stream ``entries`` into a ZIP written to ``output``; return the entry count."""
+    count = 0
+
+    def counted() -> Iterator[Tuple[str, bytes]]:
+        nonlocal count
+        for entry in entries:
+            count += 1
+            yield entry
+
+    for chunk in iter_zip(counted(), compression):
+        output.write(chunk)
+    return count
+
+
+def export_reports(
+    disease: str,
+    input_path: str,
+    output: BinaryIO,
+    *,
+    sep: Optional[str] = None,
+    name_column: Optional[str] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    workers: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    compression: int = zipfile.ZIP_DEFLATED,
+) -> int:
+    """Render one report per row of ``input_path`` into a ZIP on ``output``; return the count."""
+    from score_csv import DEFAULT_SEPARATORS, iter_chunks
+
+    sep = sep or DEFAULT_SEPARATORS[disease]
+
+    def jobs() -> Iterator[ReportJob]:
+        first_row = 0
+        for chunk in iter_chunks(input_path, sep, chunksize):
+            yield from chunk_jobs(disease, chunk, name_column, first_row)
+            first_row += len(chunk)
+
+    entries = render_reports(disease, jobs(), workers=workers, batch_size=batch_size)
+    return write_zip(entries, output, compression)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Export one PDF report per patient into a ZIP archive.")
+    parser.add_argument("disease", choices=sorted(DISEASE_NAMES), help="Model and report layout to use")
+    parser.add_argument("input", help="CSV in the raw data/diabetes.csv or data/heart.csv schema, optionally scored")
+    parser.add_argument("output", help="Destination ZIP ('-' for stdout)")
+    parser.add_argument("--sep", help="Field separator (default: ',' for diabetes, ';' for heart)")
+    parser.add_argument("--name-column", help="Column holding patient names (default: 'Patient <row>')")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Rows read per chunk")
+    parser.add_argument("--workers", type=int, default=1, help="Rendering processes (default: 1)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Reports per pool task")
+    parser.add_argument("--store", action="store_true", help="Store PDFs uncompressed (faster, larger)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    options = dict(
+        sep=args.sep, name_column=args.name_column, chunksize=args.chunksize, workers=args.workers,
+        batch_size=args.batch_size, compression=zipfile.ZIP_STORED if args.store else zipfile.ZIP_DEFLATED,
+    )
+    try:
+        if args.output == "-":
+            count = export_reports(args.disease, args.input, sys.stdout.buffer, **options)
+        else:
+            with open(args.output, "wb") as output:
+                count = export_reports(args.disease, args.input, output, **options)
+    except ArtifactLoadError as exc:
+        print(f"Failed to load model artifacts: {exc}", file=sys.stderr)
+        return 1
+    print(f"Wrote {count} {args.disease} reports", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,126 @@
+"""Cleaning pipelines for the raw heart and diabetes datasets.
+
+This is the logic of ``preparation/clean_heart.ipynb`` as composable
+generators over fixed-size chunks, so it runs in bounded memory on files of
+any size. Per chunk:
+
+1. rename ``ap_hi``/``ap_lo``/``cardio`` to ``systolic_bp``/``diastolic_bp``/``target``
+2. keep plausible blood pressure (0 < BP, systolic < 250, diastolic < 200)
+3. keep 120 < height < 220 cm and 30 < weight < 200 kg
+4. drop rows already seen (anywhere in the file), keeping the first
+5. add ``bmi`` and convert ``age`` from days to years (1 decimal)
+6. keep 0 <= age <= 90
+
+The notebook deduplicates before filtering. Filters look at one row at a
+time, so two identical rows either both pass or both fail, and deduplicating
+afterwards gives the same output with fewer hashes to remember. Duplicate
+detection keeps one 64-bit row hash per surviving row, which is the only
+state that grows with the file.
+
+    python cleaning.py data/heart.csv data/cleaned_heart.csv
+
+``clean_diabetes`` ports ``preparation/clean_diab.ipynb``. It fills gaps with
+column medians/modes, so it needs the whole frame and is not streamed.
+"""
+
+import argparse
+from typing import Iterable, Iterator, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+HEART_RENAMES = {"ap_hi": "systolic_bp", "ap_lo": "diastolic_bp", "cardio": "target"}
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def read_heart_chunks(path: str, chunksize: int = DEFAULT_CHUNKSIZE, sep: str = ";") -> Iterator[pd.DataFrame]:
+    """Yield the raw heart CSV in chunks of at most ``chunksize`` rows."""
+    with pd.read_csv(path, sep=sep, chunksize=chunksize) as reader:
+        yield from reader
+
+
+def rename_heart_columns(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    for chunk in chunks:
+        yield chunk.rename(columns=HEART_RENAMES)
+
+
+def filter_vitals(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """Drop implausible blood pressure, height and weight readings."""
+    for chunk in chunks:
+        systolic = chunk["systolic_bp"]
+        diastolic = chunk["diastolic_bp"]
+        height = chunk["height"]
+        weight = chunk["weight"]
+        keep = (
+            (systolic > 0) & (diastolic > 0) & (systolic < 250) & (diastolic < 200)
+            & (height > 120) & (height < 220) & (weight > 30) & (weight < 200)
+        )
+        yield chunk[keep]
+
+
+def drop_duplicate_rows(chunks: Iterable[pd.DataFrame], seen: Optional[Set[int]] = None) -> Iterator[pd.DataFrame]:
+    """Drop rows whose full contents already appeared in this or an earlier chunk."""
+    seen = set() if seen is None else seen
+    for chunk in chunks:
+        hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        first_in_chunk = ~pd.Series(hashes).duplicated().to_numpy()
+        unseen = np.fromiter((value not in seen for value in hashes.tolist()), dtype=bool, count=len(hashes))
+        keep = first_in_chunk & unseen
+        seen.update(hashes[keep].tolist())
+        yield chunk[keep]
+
+
+def derive_heart_columns(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """Add BMI, convert age from days to years and keep ages 0-90."""
+    for chunk in chunks:
+        chunk = chunk.assign(
+            bmi=chunk["weight"] / ((chunk["height"] / 100) ** 2),
+            age=(chunk["age"] / 365.25).round(1),
+        )
+        yield chunk[(chunk["age"] >= 0) & (chunk["age"] <= 90)]
+
+
+def clean_heart_chunks(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """Compose the full cleaning pipeline over raw heart chunks."""
+    return derive_heart_columns(drop_duplicate_rows(filter_vitals(rename_heart_columns(chunks))))
+
+
+def clean_heart_csv(source: str, destination: str, chunksize: int = DEFAULT_CHUNKSIZE) -> int:
+    """Clean ``source`` into ``destination`` chunk by chunk and return the rows written."""
+    rows = 0
+    with open(destination, "w", newline="") as output:
+        for position, chunk in enumerate(clean_heart_chunks(read_heart_chunks(source, chunksize))):
+            chunk.to_csv(output, header=position == 0, index=False)
+            rows += len(chunk)
+    return rows
+
+
+DIABETES_NUMERIC_COLUMNS = ["age", "bmi", "HbA1c_level", "blood_glucose_level"]
+DIABETES_CATEGORICAL_COLUMNS = ["gender", "smoking_history"]
+
+
+def clean_diabetes(frame: pd.DataFrame) -> pd.DataFrame:
+    """Fill missing values and drop non-positive age, BMI and glucose rows.
+
+    Categoricals are left as text; encoding is done by ``utils.DiabetesEncoder``.
+    """
+    fills = {column: frame[column].median() for column in DIABETES_NUMERIC_COLUMNS}
+    fills.update({column: frame[column].mode()[0] for column in DIABETES_CATEGORICAL_COLUMNS})
+    frame = frame.fillna(fills)
+    keep = (frame["bmi"] > 0) & (frame["age"] > 0) & (frame["blood_glucose_level"] > 0)
+    return frame[keep]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Clean the raw heart dataset in streaming chunks.")
+    parser.add_argument("source", help="Raw heart CSV (semicolon separated)")
+    parser.add_argument("destination", help="Path for the cleaned CSV")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args(argv)
+    rows = clean_heart_csv(args.source, args.destination, args.chunksize)
+    print(f"Wrote {rows} cleaned rows to {args.destination}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,191 @@
+"""Combined diabetes and heart disease assessment from one patient record.
+
+    result = assess({"age": 55, "gender": "Female", "height_cm": 165, "weight_kg": 70, ...})
+    result["diabetes"]["probability"], result["heart"]["label"], result["bmi"]
+    pdf_bytes = combined_report("Jane Doe", record, result)
+
+The diabetes and heart forms both ask for age, gender, body size, glucose and
+smoking. A patient record collects each of them once (``PATIENT_FIELDS``), and
+``encode_patient`` derives both feature rows in one pass. BMI is computed once
+from height and weight and used by both models. Glucose feeds both, and the
+heart model's ``smoke`` flag is ``smoking_history == "current"``. The diabetes
+forest is scored on a small thread pool while the calling thread scores the
+heart model, so a combined assessment takes as long as the slower model
+rather than both. Both predictions go through the shared ``PREDICTION_CACHE``.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from batching import MicroBatcher
+from reports import ReportSection, cached_combined_report
+from utils import (
+    GENDER_OPTIONS,
+    SMOKING_OPTIONS,
+    build_heart_feature_matrix,
+    check_choice,
+    check_number,
+    get_diabetes_encoder,
+    load_compiled_diabetes_model,
+    load_compiled_heart_model,
+    predict_diabetes_cached,
+    predict_heart_cached,
+)
+
+PATIENT_FIELDS = (
+    "age", "gender", "height_cm", "weight_kg", "systolic_bp", "diastolic_bp", "cholesterol", "glucose",
+    "hba1c", "smoking_history", "hypertension", "heart_disease", "alco", "active",
+)
+NUMERIC_FIELDS = {
+    "age", "height_cm", "weight_kg", "systolic_bp", "diastolic_bp", "cholesterol", "glucose", "hba1c",
+}
+FLAG_FIELDS = {"hypertension", "heart_disease", "alco", "active"}
+# The record feeds both encoders, so only genders both of them know.
+GENDERS = tuple(gender for gender in GENDER_OPTIONS["heart"] if gender in GENDER_OPTIONS["diabetes"])
+
+_POOL: Optional[ThreadPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="combined")
+        return _POOL
+
+
+def _flag(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("yes", "true", "1")
+    return bool(value)
+
+
+def validate_patient(record: Mapping[str, Any]) -> Dict[str, Any]:
+    """Return a copy of ``record`` with flags as bools.
+
+    Raises ``ValueError`` for missing fields and for values the service would
+    reject: numbers failing ``utils.check_number`` and unknown genders or
+    smoking histories.
+    """
+    missing = [field for field in PATIENT_FIELDS if field not in record]
+    if missing:
+        raise ValueError(f"Patient record is missing {', '.join(missing)}")
+    patient = dict(record)
+    for field in sorted(NUMERIC_FIELDS):
+        check_number(field, patient[field])
+    check_choice("gender", patient["gender"], GENDERS)
+    check_choice("smoking_history", patient["smoking_history"], SMOKING_OPTIONS)
+    for field in FLAG_FIELDS:
+        patient[field] = _flag(patient[field])
+    return patient
+
+
+def encode_patient(patient: Mapping[str, Any], diabetes_model: Any) -> Tuple[np.ndarray, np.ndarray, float]:
+    """Derive ``(diabetes row, heart row, bmi)`` from one validated patient record."""
+    heart_row, bmi = build_heart_feature_matrix(
+        age=patient["age"],
+        gender=patient["gender"],
+        height_cm=patient["height_cm"],
+        weight_kg=patient["weight_kg"],
+        systolic_bp=patient["systolic_bp"],
+        diastolic_bp=patient["diastolic_bp"],
+        cholesterol=patient["cholesterol"],
+        glucose=patient["glucose"],
+        smoke=patient["smoking_history"] == "current",
+        alco=patient["alco"],
+        active=patient["active"],
+    )
+    bmi_value = float(bmi[0])
+    diabetes_row = get_diabetes_encoder(diabetes_model).encode(
+        age=patient["age"],
+        hypertension_opt="Yes" if patient["hypertension"] else "No",
+        heart_disease_opt="Yes" if patient["heart_disease"] else "No",
+        bmi=bmi_value,
+        hba1c=patient["hba1c"],
+        glucose=patient["glucose"],
+        gender_opt=patient["gender"],
+        smoking_opt=patient["smoking_history"],
+    )
+    return diabetes_row, heart_row, bmi_value
+
+
+def _result(prediction: int, probability: float) -> Dict[str, Any]:
+    return {"prediction": int(prediction), "probability": float(probability),
+            "label": "High Risk" if prediction == 1 else "Low Risk"}
+
+
+def assess(
+    record: Mapping[str, Any],
+    diabetes_model: Any = None,
+    heart_model: Any = None,
+    batcher: Optional[MicroBatcher] = None,
+    versions: Optional[Mapping[str, str]] = None,
+) -> Dict[str, Any]:
+    """Score one patient record against both models concurrently.
+
+    The models default to the compiled engines (``scaler=None``). With
+    ``batcher`` the diabetes cache miss joins other concurrent diabetes
+    requests, as in the single-condition form. ``versions`` maps a disease
+    to the cache version of a model not loaded through ``ARTIFACT_REGISTRY``
+    (see ``predict_diabetes_cached``). Returns
+    ``{"bmi": ..., "diabetes": {...}, "heart": {...}}``, and each result has
+    ``prediction``, ``probability`` and ``label``.
+    """
+    patient = validate_patient(record)
+    diabetes_model = diabetes_model if diabetes_model is not None else load_compiled_diabetes_model()
+    heart_model = heart_model if heart_model is not None else load_compiled_heart_model()
+    diabetes_row, heart_row, bmi = encode_patient(patient, diabetes_model)
+    versions = versions or {}
+    diabetes_future = _pool().submit(
+        predict_diabetes_cached, diabetes_model, None, diabetes_row, versions.get("diabetes"), batcher
+    )
+    heart = predict_heart_cached(heart_model, None, heart_row, versions.get("heart"))
+    diabetes = diabetes_future.result()
+    return {"bmi": bmi, "diabetes": _result(*diabetes), "heart": _result(*heart)}
+
+
+def report_sections(record: Mapping[str, Any], result: Mapping[str, Any]) -> List[ReportSection]:
+    """The diabetes and heart report sections for an assessed record, labelled like the app's reports."""
+    patient = validate_patient(record)
+
+    def yes_no(value: bool) -> str:
+        return "Yes" if value else "No"
+
+    bmi = f"{result['bmi']:.1f}"
+    diabetes_inputs = {
+        "Age": patient["age"],
+        "Gender": patient["gender"],
+        "BMI": bmi,
+        "Smoking History": patient["smoking_history"],
+        "Hypertension": yes_no(patient["hypertension"]),
+        "Heart Disease": yes_no(patient["heart_disease"]),
+        "HbA1c Level": patient["hba1c"],
+        "Blood Glucose Level": patient["glucose"],
+    }
+    heart_inputs = {
+        "Age": patient["age"],
+        "Gender": patient["gender"],
+        "Height (cm)": patient["height_cm"],
+        "Weight (kg)": patient["weight_kg"],
+        "BMI": bmi,
+        "Systolic BP (mmHg)": patient["systolic_bp"],
+        "Diastolic BP (mmHg)": patient["diastolic_bp"],
+        "Cholesterol (mg/dL)": patient["cholesterol"],
+        "Glucose (mg/dL)": patient["glucose"],
+        "Smoker": yes_no(patient["smoking_history"] == "current"),
+        "Alcohol Use": yes_no(patient["alco"]),
+        "Physically Active": yes_no(patient["active"]),
+    }
+    return [
+        ("Diabetes", diabetes_inputs, result["diabetes"]["label"], result["diabetes"]["probability"] * 100),
+        ("Heart Disease", heart_inputs, result["heart"]["label"], result["heart"]["probability"] * 100),
+    ]
+
+
+def combined_report(patient_name: str, record: Mapping[str, Any], result: Mapping[str, Any]) -> Optional[bytes]:
+    """One PDF with the diabetes and heart pages for an assessed record (memoized; ``None`` without fpdf)."""
+    return cached_combined_report(patient_name, report_sections(record, result))
@@ -0,0 +1,205 @@
+"""Typed columnar cache for the training datasets.
+
+The first ``load_dataset("heart")`` parses ``data/heart.csv`` and stores each
+column as a ``.npy`` file under ``data/.cache/heart/`` with compact dtypes:
+integer columns are downcast to the smallest type that holds them (0/1 flags
+become int8), floats become float32 and text columns become categoricals,
+stored as integer codes plus a category list. Later loads memory-map only the
+requested columns and skip CSV parsing entirely.
+
+The cache manifest records the source file's SHA-256, size, mtime and field
+separator. A changed size or mtime triggers a re-hash, and the cache is rebuilt
+only when the content hash or the separator differs. Rebuilds write new
+content-addressed column files and swap the manifest in last, like
+``artifact_store``, so a concurrent load never sees half-written columns.
+Caches for CSV paths are named after the file and a hash of its resolved
+path, so same-named files in different directories do not share a cache. float32 keeps about 7 significant digits, which
+covers every measured value in these datasets. Derived columns such as
+``cleaned_heart.csv``'s ``bmi`` are rounded to that precision.
+
+    python datasets.py            # build or refresh every cache
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from artifact_store import replace_manifest, save_array
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+CACHE_DIR = DATA_DIR / ".cache"
+MANIFEST_NAME = "manifest.json"
+FORMAT_VERSION = 1
+
+# Registered datasets: name -> (file under data/, field separator).
+DATASETS: Dict[str, Tuple[str, str]] = {
+    "diabetes": ("diabetes.csv", ","),
+    "heart": ("heart.csv", ";"),
+    "cleaned_heart": ("cleaned_heart.csv", ","),
+}
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _resolve(dataset: Union[str, Path], sep: Optional[str]) -> Tuple[Path, str, str]:
+    """Return ``(source path, separator, cache name)`` for a dataset name or CSV path."""
+    if isinstance(dataset, str) and dataset in DATASETS:
+        filename, default_sep = DATASETS[dataset]
+        return DATA_DIR / filename, sep or default_sep, dataset
+    source = Path(dataset)
+    path_hash = hashlib.sha256(str(source.resolve()).encode()).hexdigest()[:12]
+    return source, sep or ",", f"{source.stem}-{path_hash}"
+
+
+def compact_column(values: pd.Series) -> pd.Series:
+    """Downcast one column: smallest integer type, float32, or categorical."""
+    if pd.api.types.is_bool_dtype(values):
+        return values.astype(np.int8)
+    if pd.api.types.is_integer_dtype(values):
+        return pd.to_numeric(values, downcast="integer")
+    if pd.api.types.is_float_dtype(values):
+        return values.astype(np.float32)
+    return values.astype("category")
+
+
+def compact_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Apply ``compact_column`` to every column of ``frame``."""
+    return pd.DataFrame({name: compact_column(frame[name]) for name in frame.columns})
+
+
+def _write_cache(frame: pd.DataFrame, directory: Path, source_info: Dict[str, Any]) -> None:
+    """Write ``frame`` column by column, then swap in the manifest (see ``artifact_store.save_array``)."""
+    directory.mkdir(parents=True, exist_ok=True)
+    columns = []
+    for position, name in enumerate(frame.columns):
+        values = frame[name]
+        entry: Dict[str, Any] = {"name": str(name)}
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            array = values.cat.codes.to_numpy()
+            entry["categories"] = [str(category) for category in values.cat.categories]
+        else:
+            array = values.to_numpy()
+        saved = save_array(directory, f"col_{position:03d}", array)
+        entry.update(file=saved["file"], dtype=saved["dtype"])
+        columns.append(entry)
+
+    manifest = {"format": FORMAT_VERSION, "rows": len(frame), "source": source_info, "columns": columns}
+    _replace_manifest(directory, manifest)
+
+
+def _replace_manifest(directory: Path, manifest: Dict[str, Any]) -> None:
+    replace_manifest(directory, manifest, [entry["file"] for entry in manifest["columns"]])
+
+
+def _read_manifest(directory: Path) -> Optional[Dict[str, Any]]:
+    try:
+        manifest = json.loads((directory / MANIFEST_NAME).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return manifest if manifest.get("format") == FORMAT_VERSION else None
+
+
+def _cache_is_current(manifest: Optional[Dict[str, Any]], source: Path, sep: str, directory: Path) -> bool:
+    """Check the cache against ``source`` and ``sep``; refresh the fingerprint if only mtime moved."""
+    if manifest is None or manifest["source"].get("sep") != sep:
+        return False
+    stat = source.stat()
+    recorded = manifest["source"]
+    if recorded["size"] == stat.st_size and recorded["mtime_ns"] == stat.st_mtime_ns:
+        return True
+    if recorded["size"] != stat.st_size or recorded["sha256"] != _sha256(source):
+        return False
+    recorded["mtime_ns"] = stat.st_mtime_ns
+    _replace_manifest(directory, manifest)
+    return True
+
+
+def build_cache(
+    dataset: Union[str, Path],
+    *,
+    sep: Optional[str] = None,
+    cache_dir: Optional[Path] = None,
+    force: bool = False,
+) -> Path:
+    """Create or refresh the columnar cache for ``dataset`` and return its directory."""
+    source, sep, name = _resolve(dataset, sep)
+    directory = Path(cache_dir or CACHE_DIR) / name
+    if not force and _cache_is_current(_read_manifest(directory), source, sep, directory):
+        return directory
+    stat = source.stat()
+    source_info = {
+        "path": source.name,
+        "sep": sep,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": _sha256(source),
+    }
+    _write_cache(compact_frame(pd.read_csv(source, sep=sep)), directory, source_info)
+    return directory
+
+
+def dataset_source(dataset: Union[str, Path], *, sep: Optional[str] = None, cache_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """Return the cached source record (file name, size, SHA-256) for ``dataset``."""
+    directory = build_cache(dataset, sep=sep, cache_dir=cache_dir)
+    return dict(_read_manifest(directory)["source"])
+
+
+def load_dataset(
+    dataset: Union[str, Path],
+    columns: Optional[Sequence[str]] = None,
+    *,
+    sep: Optional[str] = None,
+    cache_dir: Optional[Path] = None,
+) -> pd.DataFrame:
+    """Return ``dataset`` (a registered name or CSV path) with compact dtypes.
+
+    Builds the cache on first use. ``columns`` selects and orders the columns;
+    only those files are read. Raises ``KeyError`` for unknown column names.
+    If a concurrent rebuild removes the columns mid-read, the new manifest is
+    read and the load retried.
+    """
+    attempts = 3
+    while True:
+        directory = build_cache(dataset, sep=sep, cache_dir=cache_dir)
+        manifest = _read_manifest(directory)
+        entries = {entry["name"]: entry for entry in manifest["columns"]}
+        wanted: List[str] = list(entries) if columns is None else list(columns)
+        missing = [name for name in wanted if name not in entries]
+        if missing:
+            raise KeyError(f"Unknown columns for {directory.name}: {missing}")
+        try:
+            data = {name: _load_column(directory, entries[name]) for name in wanted}
+        except FileNotFoundError:
+            attempts -= 1
+            if not attempts:
+                raise
+            continue
+        return pd.DataFrame(data, index=pd.RangeIndex(manifest["rows"]))
+
+
+def _load_column(directory: Path, entry: Dict[str, Any]) -> Any:
+    values = np.load(directory / entry["file"], mmap_mode="r", allow_pickle=False)
+    if "categories" in entry:
+        return pd.Categorical.from_codes(np.asarray(values), entry["categories"])
+    return np.array(values)
+
+
+def main() -> int:
+    for name in DATASETS:
+        directory = build_cache(name)
+        print(f"Cached {name} -> {directory}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
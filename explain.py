@@ -0,0 +1,212 @@
+"""Per-feature explanations of heart and diabetes predictions over whole batches.
+
+    explanation = explain_heart(load_heart_model(), load_heart_scaler(), heart_matrix)
+    explanation = explain_diabetes(load_compiled_diabetes_model(), None, diabetes_matrix)
+    explanation.top(0)      # [(label, contribution), ...] for row 0, largest first
+    explanation.factors(0)  # the same as (label, text) pairs for reports
+
+The heart model is a logistic regression, so its contributions are exact:
+coefficient times the scaled feature value, in log-odds, with the intercept
+as the bias (the risk of a patient at the training mean). The diabetes forest
+uses path contributions (``CompiledForest.contributions``): each split a
+patient passes is credited with the change in positive-class fraction it
+causes, in probability, with the forest's base rate as the bias. In both
+cases ``bias + contributions.sum(axis=1)`` is the model's output for the row.
+
+``top`` and ``factors`` rank what a clinician would read: the heart model's
+row ``id`` is left out, and each one-hot group (gender, cholesterol, glucose,
+smoking history) is summed into one factor labelled with the patient's own
+category, e.g. "Cholesterol: normal" rather than a dummy the patient does not
+have. Yes/no flags are labelled the same way ("Smoker: no").
+
+Both run as NumPy over the whole batch; 10k diabetes rows take about two
+seconds on one core and 10k heart rows a few milliseconds.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from inference import CompiledForest
+from utils import DIABETES_FEATURE_COLUMNS, HEART_FEATURE_COLUMNS, FeatureBatch, _scale_features
+
+FEATURE_LABELS = {
+    "age": "Age",
+    "bmi": "BMI",
+    "HbA1c_level": "HbA1c Level",
+    "blood_glucose_level": "Blood Glucose Level",
+    "height": "Height",
+    "weight": "Weight",
+    "systolic_bp": "Systolic BP",
+    "diastolic_bp": "Diastolic BP",
+}
+
+# Columns that carry no clinical meaning and are never reported as factors.
+EXCLUDED_FEATURES = frozenset({"id"})
+
+# One-hot groups and yes/no flags as (label, category when no column is set, {column: category}).
+CATEGORICAL_GROUPS: List[Tuple[str, str, Dict[str, str]]] = [
+    ("Hypertension", "no", {"hypertension": "yes"}),
+    ("Heart Disease", "no", {"heart_disease": "yes"}),
+    ("Smoker", "no", {"smoke": "yes"}),
+    ("Alcohol Use", "no", {"alco": "yes"}),
+    ("Physically Active", "no", {"active": "yes"}),
+    ("Gender", "Male", {"gender_2": "Female"}),
+    ("Cholesterol", "normal", {"cholesterol_2": "above normal", "cholesterol_3": "well above normal"}),
+    ("Glucose", "normal", {"gluc_2": "above normal", "gluc_3": "well above normal"}),
+    ("Gender", "Female", {"gender_Male": "Male", "gender_Other": "Other"}),
+    ("Smoking", "no info", {
+        "smoking_history_current": "current",
+        "smoking_history_ever": "ever",
+        "smoking_history_former": "former",
+        "smoking_history_never": "never",
+        "smoking_history_not current": "not current",
+    }),
+]
+
+
+class Explanation:
+    """Per-row, per-feature contributions plus the bias they start from.
+
+    ``units`` is ``"log-odds"`` (linear models) or ``"probability"`` (forests).
+    ``values`` are the unscaled feature rows; ``top`` reads the patient's
+    category of each one-hot group from them.
+    """
+
+    def __init__(self, feature_names: Sequence[str], bias: float, contributions: np.ndarray, units: str,
+                 values: Optional[np.ndarray] = None) -> None:
+        self.feature_names = [str(name) for name in feature_names]
+        self.bias = float(bias)
+        self.contributions = contributions
+        self.units = units
+        self.values = values
+        self._factors = self._factor_columns()
+
+    def _factor_columns(self) -> List[Tuple[str, List[int], Optional[Tuple[str, List[str]]]]]:
+        """``(label, columns, categories)`` per reported factor, in feature order.
+
+        ``categories`` is ``None`` for plain features and otherwise the
+        baseline category plus one category per column of a one-hot group.
+        """
+        positions = {name: index for index, name in enumerate(self.feature_names)}
+        grouped: Dict[int, Tuple[str, List[int], Optional[Tuple[str, List[str]]]]] = {}
+        for label, baseline, dummies in CATEGORICAL_GROUPS:
+            present = [(positions[column], category) for column, category in dummies.items() if column in positions]
+            if present:
+                columns = [index for index, _ in present]
+                grouped[min(columns)] = (label, columns, (baseline, [category for _, category in present]))
+        members = {index for _, columns, _ in grouped.values() for index in columns}
+        factors = []
+        for index, name in enumerate(self.feature_names):
+            if index in grouped:
+                factors.append(grouped[index])
+            elif index not in members and name not in EXCLUDED_FEATURES:
+                factors.append((FEATURE_LABELS.get(name, name), [index], None))
+        return factors
+
+    def __len__(self) -> int:
+        return int(self.contributions.shape[0])
+
+    @property
+    def baseline_probability(self) -> float:
+        """The risk before any feature is taken into account."""
+        if self.units == "log-odds":
+            return 1.0 / (1.0 + math.exp(-self.bias))
+        return self.bias
+
+    def totals(self) -> np.ndarray:
+        """``bias + contributions`` per row: the model's logit or probability."""
+        return self.bias + self.contributions.sum(axis=1)
+
+    def _label(self, row: int, label: str, columns: List[int], categories: Optional[Tuple[str, List[str]]]) -> str:
+        if categories is None or self.values is None:
+            return label
+        baseline, names = categories
+        active = [name for column, name in zip(columns, names) if self.values[row, column] != 0]
+        return f"{label}: {active[0] if active else baseline}"
+
+    def top(self, row: int = 0, k: int = 5) -> List[Tuple[str, float]]:
+        """The ``k`` largest non-zero factors of ``row`` by magnitude, as ``(label, value)``.
+
+        One-hot groups count as one factor (the sum of their columns) and
+        ``EXCLUDED_FEATURES`` are skipped; see the module docstring.
+        """
+        contributions = self.contributions[row]
+        values = np.array([contributions[columns].sum() for _, columns, _ in self._factors])
+        order = np.argsort(-np.abs(values), kind="stable")[:k]
+        return [
+            (self._label(row, *self._factors[index]), float(values[index]))
+            for index in order
+            if values[index] != 0
+        ]
+
+    def describe(self, value: float) -> str:
+        """``+0.84 log-odds (raises risk)`` / ``-3.1 pts (lowers risk)``."""
+        direction = "raises risk" if value > 0 else "lowers risk"
+        if self.units == "log-odds":
+            return f"{value:+.2f} log-odds ({direction})"
+        return f"{value * 100:+.1f} pts ({direction})"
+
+    def factors(self, row: int = 0, k: int = 5) -> List[Tuple[str, str]]:
+        """``top`` formatted as ``(label, text)`` pairs for the PDF report's Key Factors section."""
+        return [(label, self.describe(value)) for label, value in self.top(row, k)]
+
+
+def _feature_names(model: Any, scaler: Any, n_features: int, default: Optional[Sequence[str]]) -> List[str]:
+    for source in (model, scaler):
+        names = getattr(source, "feature_names_in_", None)
+        if names is not None:
+            return [str(name) for name in names]
+    if default is not None and len(default) == n_features:
+        return list(default)
+    return [f"feature_{index}" for index in range(n_features)]
+
+
+def _raw_values(features: FeatureBatch) -> np.ndarray:
+    values = np.asarray(features, dtype=np.float64)
+    return values.reshape(1, -1) if values.ndim == 1 else values
+
+
+def explain_linear(
+    model: Any, scaler: Any, features: FeatureBatch, feature_names: Optional[Sequence[str]] = None
+) -> Explanation:
+    """Exact log-odds contributions of a logistic regression: ``coef * scaled value``.
+
+    Pass the sklearn model with its scaler for contributions relative to the
+    training mean. A compiled model has the scaler folded in; with
+    ``scaler=None`` its contributions are in raw units against a zero input.
+    """
+    matrix = _scale_features(scaler, features)
+    matrix = matrix.reshape(1, -1) if matrix.ndim == 1 else matrix
+    coef = np.asarray(model.coef_, dtype=np.float64).reshape(-1)
+    intercept = float(np.asarray(model.intercept_, dtype=np.float64).reshape(-1)[0])
+    names = _feature_names(model, scaler, matrix.shape[1], feature_names)
+    return Explanation(names, intercept, matrix * coef, "log-odds", _raw_values(features))
+
+
+def explain_forest(
+    model: Any, scaler: Any, features: FeatureBatch, feature_names: Optional[Sequence[str]] = None
+) -> Explanation:
+    """Path contributions of a random forest to the positive-class probability.
+
+    ``model`` is a ``CompiledForest`` or a fitted sklearn forest, which is
+    packed first. As in ``utils.predict_*``, ``scaler=None`` is for forests
+    that already fold the scaler into their thresholds.
+    """
+    forest = model if isinstance(model, CompiledForest) else CompiledForest.from_sklearn(model)
+    matrix = _scale_features(scaler, features)
+    matrix = matrix.reshape(1, -1) if matrix.ndim == 1 else matrix
+    bias, contributions = forest.contributions(matrix)
+    names = _feature_names(forest, scaler, matrix.shape[1], feature_names)
+    return Explanation(names, bias, contributions, "probability", _raw_values(features))
+
+
+def explain_heart(model: Any, scaler: Any, features: FeatureBatch) -> Explanation:
+    """``explain_linear`` with the heart feature labels."""
+    return explain_linear(model, scaler, features, HEART_FEATURE_COLUMNS)
+
+
+def explain_diabetes(model: Any, scaler: Any, features: FeatureBatch) -> Explanation:
+    """``explain_forest`` with the diabetes feature labels."""
+    return explain_forest(model, scaler, features, DIABETES_FEATURE_COLUMNS)
@@ -0,0 +1,204 @@
+"""Find the smallest diabetes forest that keeps the served model's accuracy.
+
+Candidates are prunes of the current forest (its first ``n`` trees cut at
+depth ``d``, see ``CompiledForest.prune``), so no retraining is needed, plus
+freshly trained ``RandomForestClassifier(n, d)`` models with ``--retrain``.
+Every candidate is scored on the notebooks' hold-out split and reports:
+
+* ``roc_auc`` / ``accuracy`` and their drop from the current model
+* ``bytes``: size of the exported memory-mapped artifact
+* ``load_ms``: median time to read that artifact fully into memory
+* ``p50_ms`` / ``p99_ms``: single-row latency of the folded engine the app serves
+
+The chosen candidate is the smallest one within ``--auc-tolerance`` and
+``--accuracy-tolerance`` (and under ``--p99-budget-ms`` if given).
+``--emit models/diabetes_model`` writes it as the array artifact the
+registry prefers over the pickle. ``export_artifact`` writes new array files
+and swaps the manifest last, so emitting over the served artifact does not
+disturb processes that have it memory-mapped; they pick it up on reload::
+
+    python forest_sizing.py --trees 25 50 100 300 --depths 8 10 12 15 --emit models/diabetes_model
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, roc_auc_score
+
+from artifact_store import export_artifact, load_array_artifact
+from inference import CompiledForest
+from training import RANDOM_STATE, split_training_data
+from utils import ArtifactLoadError, load_diabetes_model, load_diabetes_scaler
+
+DEFAULT_TREES = (10, 25, 50, 100, 200, 300)
+DEFAULT_DEPTHS = (6, 8, 10, 12, 15)
+
+
+def _artifact_footprint(forest: CompiledForest, repeats: int = 3) -> Dict[str, float]:
+    """Export ``forest`` to a scratch directory and measure its size and load time."""
+    with tempfile.TemporaryDirectory() as tmp:
+        export_artifact(forest, Path(tmp))
+        size = sum(path.stat().st_size for path in Path(tmp).iterdir())
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            load_array_artifact(Path(tmp), mmap=False)
+            timings.append(time.perf_counter() - started)
+    return {"bytes": size, "load_ms": float(np.median(timings) * 1e3)}
+
+
+def _single_row_latency(forest: CompiledForest, rows: np.ndarray) -> Dict[str, float]:
+    timings = np.empty(rows.shape[0])
+    for position in range(rows.shape[0]):
+        row = rows[position:position + 1]
+        started = time.perf_counter()
+        forest.predict_batch(row)
+        timings[position] = time.perf_counter() - started
+    return {"p50_ms": float(np.percentile(timings, 50) * 1e3), "p99_ms": float(np.percentile(timings, 99) * 1e3)}
+
+
+def evaluate_candidate(
+    name: str,
+    forest: CompiledForest,
+    scaler: Any,
+    scaled_test: np.ndarray,
+    y_test: np.ndarray,
+    latency_rows: np.ndarray,
+) -> Dict[str, Any]:
+    """Score one unfolded forest on the scaled hold-out rows and measure its footprint."""
+    probabilities = forest.positive_proba(scaled_test)
+    result: Dict[str, Any] = {
+        "candidate": name,
+        "n_estimators": forest.n_estimators,
+        "max_depth": forest.max_depth,
+        "nodes": int(forest.feature.shape[0]),
+        "roc_auc": float(roc_auc_score(y_test, probabilities)),
+        "accuracy": float(accuracy_score(y_test, probabilities > 0.5)),
+    }
+    result.update(_artifact_footprint(forest))
+    result.update(_single_row_latency(forest.with_scaler(scaler), latency_rows))
+    return result
+
+
+def choose(
+    results: Sequence[Dict[str, Any]],
+    reference: Dict[str, Any],
+    auc_tolerance: float,
+    accuracy_tolerance: float,
+    p99_budget_ms: Optional[float] = None,
+) -> Optional[Dict[str, Any]]:
+    """Return the smallest result within tolerance of ``reference`` (fastest on ties)."""
+    eligible = [
+        result for result in results
+        if result["roc_auc"] >= reference["roc_auc"] - auc_tolerance
+        and result["accuracy"] >= reference["accuracy"] - accuracy_tolerance
+        and (p99_budget_ms is None or result["p99_ms"] <= p99_budget_ms)
+    ]
+    if not eligible:
+        return None
+    return min(eligible, key=lambda result: (result["bytes"], result["p99_ms"]))
+
+
+def size_forest(
+    model: Any,
+    scaler: Any,
+    *,
+    trees: Sequence[int] = DEFAULT_TREES,
+    depths: Sequence[int] = DEFAULT_DEPTHS,
+    retrain: bool = False,
+    latency_samples: int = 200,
+    split: Optional[tuple] = None,
+) -> Dict[str, Any]:
+    """Evaluate the reference forest and every candidate; return results and engines.
+
+    Returns ``{"reference": ..., "candidates": [...], "forests": {name: CompiledForest}}``.
+    """
+    x_train, x_test, y_train, y_test = split or split_training_data("diabetes")
+    scaled_test = scaler.transform(x_test)
+    raw_test = np.asarray(x_test, dtype=np.float64)
+    rng = np.random.default_rng(RANDOM_STATE)
+    latency_rows = raw_test[rng.choice(raw_test.shape[0], min(latency_samples, raw_test.shape[0]), replace=False)]
+
+    base = model if isinstance(model, CompiledForest) else CompiledForest.from_sklearn(model)
+    forests: Dict[str, CompiledForest] = {}
+    for n_trees in trees:
+        for depth in depths:
+            if n_trees <= base.n_estimators and depth <= base.max_depth:
+                forests[f"prune-{n_trees}x{depth}"] = base.prune(n_trees, depth)
+    if retrain:
+        scaled_train = scaler.transform(x_train)
+        for n_trees in trees:
+            for depth in depths:
+                forest = RandomForestClassifier(
+                    n_estimators=n_trees, max_depth=depth, random_state=RANDOM_STATE, n_jobs=-1
+                ).fit(scaled_train, y_train)
+                forests[f"retrain-{n_trees}x{depth}"] = CompiledForest.from_sklearn(forest)
+
+    reference = evaluate_candidate("current", base, scaler, scaled_test, y_test, latency_rows)
+    candidates = [
+        evaluate_candidate(name, forest, scaler, scaled_test, y_test, latency_rows)
+        for name, forest in forests.items()
+    ]
+    return {"reference": reference, "candidates": candidates, "forests": forests}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Trade diabetes forest accuracy against size and latency.")
+    parser.add_argument("--trees", type=int, nargs="+", default=list(DEFAULT_TREES), help="Tree counts to try")
+    parser.add_argument("--depths", type=int, nargs="+", default=list(DEFAULT_DEPTHS), help="Depth limits to try")
+    parser.add_argument("--auc-tolerance", type=float, default=0.002, help="Allowed ROC AUC drop (default: 0.002)")
+    parser.add_argument("--accuracy-tolerance", type=float, default=0.002, help="Allowed accuracy drop (default: 0.002)")
+    parser.add_argument("--p99-budget-ms", type=float, help="Reject candidates slower than this single-row p99")
+    parser.add_argument("--retrain", action="store_true", help="Also train fresh forests for every combination")
+    parser.add_argument("--latency-samples", type=int, default=200, help="Single-row calls timed per candidate")
+    parser.add_argument(
+        "--emit", type=Path,
+        help="Export the chosen forest as an array artifact directory (safe over the served one)",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        model, scaler = load_diabetes_model(), load_diabetes_scaler()
+    except ArtifactLoadError as exc:
+        print(f"Failed to load model artifacts: {exc}", file=sys.stderr)
+        return 1
+
+    report = size_forest(
+        model, scaler, trees=args.trees, depths=args.depths,
+        retrain=args.retrain, latency_samples=args.latency_samples,
+    )
+    reference = report["reference"]
+    print(json.dumps(reference))
+    for result in report["candidates"]:
+        result["auc_drop"] = reference["roc_auc"] - result["roc_auc"]
+        result["accuracy_drop"] = reference["accuracy"] - result["accuracy"]
+        print(json.dumps(result))
+
+    chosen = choose(report["candidates"], reference, args.auc_tolerance, args.accuracy_tolerance, args.p99_budget_ms)
+    if chosen is None:
+        print("No candidate within tolerance; keep the current model.", file=sys.stderr)
+        return 2
+    print(
+        f"Chosen {chosen['candidate']}: {chosen['bytes'] / 1e6:.2f} MB vs {reference['bytes'] / 1e6:.2f} MB, "
+        f"p99 {chosen['p99_ms']:.3f} ms vs {reference['p99_ms']:.3f} ms, "
+        f"AUC {chosen['roc_auc']:.4f} vs {reference['roc_auc']:.4f}",
+        file=sys.stderr,
+    )
+    if args.emit:
+        export_artifact(report["forests"][chosen["candidate"]], args.emit)
+        print(f"Exported {chosen['candidate']} to {args.emit}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
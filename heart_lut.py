@@ -0,0 +1,403 @@
+"""Precomputed heart risk lookup tables over the form's discretized input space.
+
+    python heart_lut.py build                       # writes models/heart_lut/
+    table = load_heart_lut(version=artifact_version("heart"))
+    result = table.predict(age=45, gender="Male", height_cm=170, ...) if table else None
+
+Every heart form input is bounded and, apart from weight, an integer, but the
+full cross product of the form is about 2.6e12 cells, far too many to store as
+a dense probability grid. The compiled heart model is linear in its features,
+so its logit splits into independent parts instead:
+
+    logit = base + age[i] + systolic_bp[j] + diastolic_bp[k] + body[h, w] + categorical[c]
+
+``body`` is a 2-D table over height and weight because BMI couples them, and
+``categorical`` covers the 144 combinations of gender, the three cholesterol
+and glucose buckets and the three lifestyle flags. Each part is scored with
+the live model against a base patient, so together the tables hold about
+1.7M cells (7 MB as float32). They are stored like ``artifact_store``
+artifacts, as content-addressed ``.npy`` files plus a ``manifest.json`` opened
+with ``np.load(mmap_mode="r")``, so only the pages a lookup touches are read
+and a rebuild never writes into tables a running app has mapped.
+
+A lookup is five index computations, five array reads and a sigmoid. Inputs
+that are off the grid or out of its range return ``None``, and the caller falls
+back to the live model. ``build`` scores random grid points with both the
+tables and the live model and refuses to write tables whose probability error
+exceeds ``--tolerance``. The manifest records the heart artifact version, so
+``load_heart_lut`` ignores tables built from an older model.
+"""
+
+import argparse
+import json
+import math
+from bisect import bisect_right
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from artifact_store import replace_manifest, save_array
+from utils import CHOLESTEROL_CUTOFFS, GLUCOSE_CUTOFFS, MODELS_DIR, build_heart_feature_matrix
+
+MANIFEST_NAME = "manifest.json"
+FORMAT_VERSION = 1
+DEFAULT_DIR = MODELS_DIR / "heart_lut"
+
+# (start, stop, step) per numeric input, matching the Streamlit form's bounds and steps.
+DEFAULT_AXES: Dict[str, Tuple[float, float, float]] = {
+    "age": (1, 120, 1),
+    "height_cm": (120, 220, 1),
+    "weight_kg": (30.0, 200.0, 0.01),
+    "systolic_bp": (80, 200, 1),
+    "diastolic_bp": (50, 120, 1),
+}
+DEFAULT_MAX_CELLS = 4_000_000
+# The app shows risk to a tenth of a percent.
+DEFAULT_TOLERANCE = 1e-3
+
+# The patient every table part is measured against (the form's defaults).
+BASE_INPUTS: Dict[str, Any] = {
+    "age": 45, "gender": "Male", "height_cm": 170, "weight_kg": 70.0, "systolic_bp": 120, "diastolic_bp": 80,
+    "cholesterol": 200, "glucose": 100, "smoke": False, "alco": False, "active": True,
+}
+# gender_2, cholesterol bucket, glucose bucket, smoke, alco, active
+CATEGORICAL_SHAPE = (2, 3, 3, 2, 2, 2)
+
+
+class Axis:
+    """An evenly spaced grid ``start, start + step, ..., stop`` for one numeric input."""
+
+    __slots__ = ("start", "stop", "step", "size")
+
+    def __init__(self, start: float, stop: float, step: float) -> None:
+        if step <= 0 or stop < start:
+            raise ValueError(f"Invalid axis ({start}, {stop}, {step})")
+        self.start = float(start)
+        self.stop = float(stop)
+        self.step = float(step)
+        self.size = int(round((self.stop - self.start) / self.step)) + 1
+
+    def values(self) -> np.ndarray:
+        return self.start + np.arange(self.size) * self.step
+
+    def index(self, value: float) -> Optional[int]:
+        """Return the grid index of ``value``, or ``None`` if it is off the grid or out of range."""
+        position = (value - self.start) / self.step
+        index = int(round(position))
+        if abs(position - index) > 1e-6 or not 0 <= index < self.size:
+            return None
+        return index
+
+    def to_list(self) -> List[float]:
+        return [self.start, self.stop, self.step]
+
+
+def _bucket(value: float, cutoffs: Tuple[float, float]) -> int:
+    # utils._categorize for one reading, minus one: 0/1/2 for normal/above/well above.
+    return bisect_right(cutoffs, value)
+
+
+def _sigmoid(logit: float) -> float:
+    if logit >= 0:
+        return 1.0 / (1.0 + math.exp(-logit))
+    odds = math.exp(logit)
+    return odds / (1.0 + odds)
+
+
+def _categorical_index(gender: Any, cholesterol: float, glucose: float, smoke: Any, alco: Any, active: Any) -> int:
+    index = 1 if gender != "Male" else 0
+    index = index * 3 + _bucket(cholesterol, CHOLESTEROL_CUTOFFS)
+    index = index * 3 + _bucket(glucose, GLUCOSE_CUTOFFS)
+    index = index * 2 + (1 if smoke else 0)
+    index = index * 2 + (1 if alco else 0)
+    return index * 2 + (1 if active else 0)
+
+
+def _categorical_inputs() -> Dict[str, np.ndarray]:
+    """Form inputs for every categorical combination, in ``_categorical_index`` order."""
+    gender, cholesterol, glucose, smoke, alco, active = np.indices(CATEGORICAL_SHAPE).reshape(len(CATEGORICAL_SHAPE), -1)
+    # One reading per bucket: just below the first cutoff, then each cutoff itself.
+    cholesterol_readings = np.array((CHOLESTEROL_CUTOFFS[0] - 1, *CHOLESTEROL_CUTOFFS))
+    glucose_readings = np.array((GLUCOSE_CUTOFFS[0] - 1, *GLUCOSE_CUTOFFS))
+    return {
+        "gender": np.where(gender == 1, "Female", "Male").astype(object),
+        "cholesterol": cholesterol_readings[cholesterol],
+        "glucose": glucose_readings[glucose],
+        "smoke": smoke,
+        "alco": alco,
+        "active": active,
+    }
+
+
+class HeartLookupTable:
+    """Additive logit tables for the heart model; see the module docstring."""
+
+    def __init__(self, axes: Mapping[str, Axis], base_logit: float, tables: Mapping[str, np.ndarray],
+                 manifest: Optional[Dict[str, Any]] = None) -> None:
+        self.axes = dict(axes)
+        self.base_logit = float(base_logit)
+        self.tables = dict(tables)
+        self.manifest = manifest or {}
+        self._age_axis = self.axes["age"]
+        self._height_axis = self.axes["height_cm"]
+        self._weight_axis = self.axes["weight_kg"]
+        self._systolic_axis = self.axes["systolic_bp"]
+        self._diastolic_axis = self.axes["diastolic_bp"]
+        self._age = self.tables["age"]
+        self._body = self.tables["body"]
+        self._systolic = self.tables["systolic_bp"]
+        self._diastolic = self.tables["diastolic_bp"]
+        self._categorical = self.tables["categorical"]
+
+    @property
+    def cells(self) -> int:
+        return sum(int(table.size) for table in self.tables.values())
+
+    def logit(self, *, age: Any, gender: Any, height_cm: Any, weight_kg: Any, systolic_bp: Any, diastolic_bp: Any,
+              cholesterol: Any, glucose: Any, smoke: Any, alco: Any, active: Any) -> Optional[float]:
+        """The model's logit for one set of form inputs, or ``None`` if any input is off the grid."""
+        age_index = self._age_axis.index(age)
+        height_index = self._height_axis.index(height_cm)
+        weight_index = self._weight_axis.index(weight_kg)
+        systolic_index = self._systolic_axis.index(systolic_bp)
+        diastolic_index = self._diastolic_axis.index(diastolic_bp)
+        if None in (age_index, height_index, weight_index, systolic_index, diastolic_index):
+            return None
+        categorical_index = _categorical_index(gender, cholesterol, glucose, smoke, alco, active)
+        return (
+            self.base_logit
+            + float(self._age[age_index])
+            + float(self._body[height_index, weight_index])
+            + float(self._systolic[systolic_index])
+            + float(self._diastolic[diastolic_index])
+            + float(self._categorical[categorical_index])
+        )
+
+    def probability(self, **inputs: Any) -> Optional[float]:
+        """The positive-class probability for the form inputs, or ``None`` off the grid."""
+        logit = self.logit(**inputs)
+        return None if logit is None else _sigmoid(logit)
+
+    def predict(self, threshold: float = 0.5, **inputs: Any) -> Optional[Tuple[int, float]]:
+        """``(label, probability)`` like ``utils.predict_heart``, or ``None`` to fall back to the model."""
+        probability = self.probability(**inputs)
+        if probability is None:
+            return None
+        return int(probability > threshold), probability
+
+
+def _resolve_axes(axes: Optional[Mapping[str, Any]]) -> Dict[str, Axis]:
+    specs = dict(DEFAULT_AXES)
+    specs.update(axes or {})
+    unknown = set(specs) - set(DEFAULT_AXES)
+    if unknown:
+        raise ValueError(f"Unknown lookup table axes: {', '.join(sorted(unknown))}")
+    return {name: spec if isinstance(spec, Axis) else Axis(*spec) for name, spec in specs.items()}
+
+
+def table_cells(axes: Mapping[str, Axis]) -> int:
+    """Total cells the tables for ``axes`` hold."""
+    return (
+        axes["age"].size + axes["systolic_bp"].size + axes["diastolic_bp"].size
+        + axes["height_cm"].size * axes["weight_kg"].size + int(np.prod(CATEGORICAL_SHAPE))
+    )
+
+
+def build_tables(model: Any, axes: Optional[Mapping[str, Any]] = None, *, dtype: str = "float32",
+                 max_cells: int = DEFAULT_MAX_CELLS) -> HeartLookupTable:
+    """Score every table cell with ``model``, a heart model used with ``scaler=None``.
+
+    ``axes`` overrides ``DEFAULT_AXES`` entries with ``(start, stop, step)``.
+    Raises ``ValueError`` if the tables would exceed ``max_cells``.
+    """
+    if not hasattr(model, "decision_function"):
+        raise TypeError("The lookup table needs a model with decision_function, e.g. load_compiled_heart_model()")
+    axes = _resolve_axes(axes)
+    cells = table_cells(axes)
+    if cells > max_cells:
+        raise ValueError(f"The grid needs {cells:,} cells, over the {max_cells:,} cell cap")
+
+    def logits(**overrides: Any) -> np.ndarray:
+        matrix, _ = build_heart_feature_matrix(**{**BASE_INPUTS, **overrides})
+        return model.decision_function(matrix)
+
+    base_logit = float(logits()[0])
+    tables = {name: logits(**{name: axes[name].values()}) - base_logit
+              for name in ("age", "systolic_bp", "diastolic_bp")}
+    weights = axes["weight_kg"].values()
+    # One height row at a time keeps the feature matrix at ~2 MB rather than the whole 2-D grid.
+    tables["body"] = np.stack([logits(height_cm=height, weight_kg=weights) - base_logit
+                               for height in axes["height_cm"].values()])
+    tables["categorical"] = logits(**_categorical_inputs()) - base_logit
+    tables = {name: np.ascontiguousarray(table, dtype=dtype) for name, table in tables.items()}
+    return HeartLookupTable(axes, base_logit, tables)
+
+
+def max_probability_error(table: HeartLookupTable, model: Any, samples: int = 5000, seed: int = 0) -> float:
+    """Largest ``|table - model|`` probability over ``samples`` random grid points."""
+    rng = np.random.default_rng(seed)
+    inputs: Dict[str, Any] = {
+        name: axis.start + rng.integers(0, axis.size, samples) * axis.step for name, axis in table.axes.items()
+    }
+    inputs.update(
+        gender=np.where(rng.integers(0, 2, samples) == 1, "Female", "Male").astype(object),
+        cholesterol=rng.uniform(100, 400, samples),
+        glucose=rng.uniform(50, 300, samples),
+        smoke=rng.integers(0, 2, samples),
+        alco=rng.integers(0, 2, samples),
+        active=rng.integers(0, 2, samples),
+    )
+    matrix, _ = build_heart_feature_matrix(**inputs)
+    expected = model.predict_proba(matrix)[:, 1]
+    worst = 0.0
+    for row in range(samples):
+        probability = table.probability(**{name: values[row] for name, values in inputs.items()})
+        if probability is None:
+            raise ValueError("A sampled grid point fell off the grid")
+        worst = max(worst, abs(probability - float(expected[row])))
+    return worst
+
+
+def save_tables(table: HeartLookupTable, directory: Path, **attributes: Any) -> Path:
+    """Write the tables as ``.npy`` files plus a manifest and return its path.
+
+    Uses ``artifact_store.save_array`` and ``replace_manifest``: each table
+    goes to a new file and the manifest is swapped in last, so tables that
+    ``load_heart_lut`` has mapped are never overwritten.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    entries = {name: save_array(directory, name, values) for name, values in table.tables.items()}
+    manifest = {
+        "format": FORMAT_VERSION,
+        "kind": "heart_logit_tables",
+        "axes": {name: axis.to_list() for name, axis in table.axes.items()},
+        "base_logit": table.base_logit,
+        "cholesterol_cutoffs": list(CHOLESTEROL_CUTOFFS),
+        "glucose_cutoffs": list(GLUCOSE_CUTOFFS),
+        "arrays": entries,
+        "attributes": attributes,
+    }
+    return replace_manifest(directory, manifest)
+
+
+def load_tables(directory: Path, *, mmap: bool = True) -> HeartLookupTable:
+    """Open saved tables, memory-mapped by default.
+
+    Raises ``FileNotFoundError`` if the manifest is missing and ``ValueError``
+    if it is malformed, from another format version or was built with
+    different cholesterol/glucose cutoffs.
+    """
+    directory = Path(directory)
+    manifest_path = directory / MANIFEST_NAME
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"Malformed manifest: {manifest_path}") from exc
+    if manifest.get("format") != FORMAT_VERSION or manifest.get("kind") != "heart_logit_tables":
+        raise ValueError(f"Unsupported manifest format: {manifest_path}")
+    if (tuple(manifest.get("cholesterol_cutoffs", ())) != CHOLESTEROL_CUTOFFS
+            or tuple(manifest.get("glucose_cutoffs", ())) != GLUCOSE_CUTOFFS):
+        raise ValueError(f"Lookup table was built with different category cutoffs: {manifest_path}")
+    tables = {}
+    for name, entry in manifest["arrays"].items():
+        array_path = directory / entry["file"]
+        values = np.load(array_path, mmap_mode="r" if mmap else None, allow_pickle=False)
+        if values.dtype.str != entry["dtype"] or list(values.shape) != entry["shape"]:
+            raise ValueError(f"Array does not match manifest: {array_path}")
+        tables[name] = values
+    axes = {name: Axis(*spec) for name, spec in manifest["axes"].items()}
+    try:
+        return HeartLookupTable(axes, manifest["base_logit"], tables, manifest)
+    except KeyError as exc:
+        raise ValueError(f"Incomplete lookup table {directory}: missing {exc}") from exc
+
+
+# directory -> ((manifest inode, mtime), tables)
+_LOADED: Dict[Path, Tuple[Tuple[int, int], HeartLookupTable]] = {}
+
+
+def _model_version(table: HeartLookupTable) -> Optional[str]:
+    return table.manifest.get("attributes", {}).get("model_version")
+
+
+def load_heart_lut(directory: Optional[Path] = None, version: Optional[str] = None) -> Optional[HeartLookupTable]:
+    """Return the saved tables, or ``None`` if there are none or they were built from another ``version``.
+
+    ``version`` is ``utils.artifact_version("heart")`` at build time. The
+    tables are opened once, so a rerun only pays a ``stat``. They are reopened
+    when the manifest is swapped (a new inode) or when the opened tables were
+    built from a version other than the one asked for. A rebuild that
+    removes the old files mid-load returns ``None`` for that rerun.
+    """
+    directory = Path(directory) if directory is not None else DEFAULT_DIR
+    try:
+        stat = (directory / MANIFEST_NAME).stat()
+        stamp = (stat.st_ino, stat.st_mtime_ns)
+        cached = _LOADED.get(directory)
+        if cached is None or cached[0] != stamp or (version is not None and _model_version(cached[1]) != version):
+            cached = (stamp, load_tables(directory))
+            _LOADED[directory] = cached
+    except FileNotFoundError:
+        return None
+    table = cached[1]
+    if version is not None and _model_version(table) != version:
+        return None
+    return table
+
+
+def build_heart_lut(directory: Optional[Path] = None, axes: Optional[Mapping[str, Any]] = None, *,
+                    dtype: str = "float32", max_cells: int = DEFAULT_MAX_CELLS,
+                    tolerance: float = DEFAULT_TOLERANCE, samples: int = 5000) -> Path:
+    """Build tables from the current heart artifacts, check them and save them; return the manifest path.
+
+    Raises ``ValueError`` if the grid exceeds ``max_cells`` or the sampled
+    probability error exceeds ``tolerance``; nothing is written then.
+    """
+    from utils import artifact_version, load_compiled_heart_model
+
+    model = load_compiled_heart_model()
+    table = build_tables(model, axes, dtype=dtype, max_cells=max_cells)
+    error = max_probability_error(table, model, samples)
+    if error > tolerance:
+        raise ValueError(f"Lookup table error {error:.2e} exceeds the {tolerance:.2e} tolerance")
+    return save_tables(
+        table, directory if directory is not None else DEFAULT_DIR,
+        model_version=artifact_version("heart"), max_error=error, tolerance=tolerance, samples=samples,
+    )
+
+
+def _axis_spec(text: str) -> Tuple[str, Tuple[float, float, float]]:
+    name, _, spec = text.partition("=")
+    parts = spec.split(":")
+    if len(parts) != 3:
+        raise argparse.ArgumentTypeError("Use NAME=START:STOP:STEP, e.g. weight_kg=30:200:0.1")
+    return name, tuple(float(part) for part in parts)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Precompute heart risk lookup tables for the Streamlit form.")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--output", type=Path, default=DEFAULT_DIR)
+    parser.add_argument("--axis", type=_axis_spec, action="append", default=[],
+                        help="Override a grid axis as NAME=START:STOP:STEP (repeatable)")
+    parser.add_argument("--dtype", choices=["float32", "float16"], default="float32")
+    parser.add_argument("--max-cells", type=int, default=DEFAULT_MAX_CELLS)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--samples", type=int, default=5000)
+    args = parser.parse_args(argv)
+    try:
+        manifest_path = build_heart_lut(
+            args.output, dict(args.axis), dtype=args.dtype, max_cells=args.max_cells,
+            tolerance=args.tolerance, samples=args.samples,
+        )
+    except ValueError as exc:
+        parser.exit(1, f"error: {exc}\n")
+    attributes = json.loads(manifest_path.read_text())["attributes"]
+    print(f"Wrote {manifest_path.parent} (max probability error {attributes['max_error']:.2e})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,398 @@
+"""Compiled, pure-NumPy inference engines for the trained models.
+
+These take a fitted sklearn estimator (and optionally its ``StandardScaler``)
+and repack the parameters into plain arrays, so prediction no longer goes
+through sklearn's per-call validation. They expose the same ``predict`` /
+``predict_proba`` interface as the estimators they replace; engines built
+with a scaler expect raw (unscaled) features and are used with
+``scaler=None`` in ``utils.predict_*``.
+"""
+
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+
+def _as_matrix(features: Any) -> np.ndarray:
+    matrix = np.asarray(features, dtype=np.float64)
+    return matrix.reshape(1, -1) if matrix.ndim == 1 else matrix
+
+
+def _sigmoid(logits: np.ndarray) -> np.ndarray:
+    # exp(-log(1 + exp(-z))) stays finite for very large |z|.
+    return np.exp(-np.logaddexp(0.0, -logits))
+
+
+class CompiledScaler:
+    """``StandardScaler`` parameters with the same in-place subtract/divide transform.
+
+    Results are bit-for-bit identical to sklearn's ``transform``; DataFrames are
+    reordered by ``feature_names_in_`` when it is set.
+    """
+
+    with_mean = True
+    with_std = True
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray, feature_names: Optional[np.ndarray] = None) -> None:
+        self.mean_ = mean
+        self.scale_ = scale
+        self.n_features_in_ = int(np.shape(mean)[0])
+        self.feature_names_in_ = feature_names
+
+    @classmethod
+    def from_sklearn(cls, scaler: Any) -> "CompiledScaler":
+        n_features = int(scaler.n_features_in_)
+        mean = scaler.mean_ if getattr(scaler, "with_mean", True) else np.zeros(n_features)
+        scale = scaler.scale_ if getattr(scaler, "with_std", True) else np.ones(n_features)
+        return cls(
+            np.asarray(mean, dtype=np.float64),
+            np.asarray(scale, dtype=np.float64),
+            getattr(scaler, "feature_names_in_", None),
+        )
+
+    def transform(self, features: Any) -> np.ndarray:
+        if hasattr(features, "columns") and self.feature_names_in_ is not None:
+            features = features[list(self.feature_names_in_)]
+        scaled = np.array(features, dtype=np.float64)
+        scaled -= self.mean_
+        scaled /= self.scale_
+        return scaled
+
+
+class CompiledLinearModel:
+    """Binary logistic regression reduced to one dot product plus a sigmoid.
+
+    When built with a scaler, the standardization is folded into the weights:
+    ``w' = w / scale`` and ``b' = b - sum(w * mean / scale)``, so raw features
+    go straight into ``X @ w' + b'``.
+    """
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        intercept: float,
+        classes: Optional[np.ndarray] = None,
+        feature_names: Optional[np.ndarray] = None,
+    ) -> None:
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.classes_ = np.asarray(classes if classes is not None else [0, 1])
+        self.n_features_in_ = self.weights.shape[0]
+        self.feature_names_in_ = feature_names
+
+    @property
+    def coef_(self) -> np.ndarray:
+        return self.weights[np.newaxis, :]
+
+    @property
+    def intercept_(self) -> np.ndarray:
+        return np.array([self.intercept])
+
+    @classmethod
+    def from_sklearn(cls, model: Any, scaler: Any = None) -> "CompiledLinearModel":
+        """Compile a fitted binary ``LogisticRegression``, folding in ``scaler`` if given."""
+        weights = np.asarray(model.coef_, dtype=np.float64).ravel()
+        intercept = float(np.asarray(model.intercept_, dtype=np.float64).ravel()[0])
+        if scaler is not None:
+            mean = np.asarray(scaler.mean_, dtype=np.float64) if getattr(scaler, "with_mean", True) else 0.0
+            scale = np.asarray(scaler.scale_, dtype=np.float64) if getattr(scaler, "with_std", True) else 1.0
+            weights = weights / scale
+            intercept = intercept - float(np.sum(weights * mean))
+        return cls(
+            weights,
+            intercept,
+            getattr(model, "classes_", None),
+            getattr(scaler, "feature_names_in_", None),
+        )
+
+    def decision_function(self, features: Any) -> np.ndarray:
+        return _as_matrix(features) @ self.weights + self.intercept
+
+    def predict_proba(self, features: Any) -> np.ndarray:
+        positive = _sigmoid(self.decision_function(features))
+        return np.column_stack((1.0 - positive, positive))
+
+    def predict(self, features: Any) -> np.ndarray:
+        return self.classes_[(self.decision_function(features) > 0).astype(np.int64)]
+
+    def predict_batch(self, features: Any, threshold: float = 0.5) -> Tuple[np.ndarray, np.ndarray]:
+        """Return labels and positive-class probabilities for every row."""
+        probabilities = _sigmoid(self.decision_function(features))
+        return (probabilities > threshold).astype(np.int64), probabilities
+
+
+def _fold_thresholds(threshold: np.ndarray, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """Map scaled split thresholds to raw units without changing any split decision.
+
+    A raw value goes left in sklearn when ``float32((x - mean) / scale) <= t``.
+    That predicate is monotone in ``x``, so bisecting from ``t * scale + mean``
+    finds the largest float64 raw value that still goes left. A plain
+    ``t * scale + mean`` is not enough: sklearn often places ``t`` exactly on
+    a float32 training value, where rounding flips the comparison.
+    """
+
+    def goes_left(raw: np.ndarray) -> np.ndarray:
+        return ((raw - mean) / scale).astype(np.float32) <= threshold
+
+    guess = threshold * scale + mean
+    step = (np.abs(threshold) * 1e-6 + 1e-12) * scale
+    low, high = guess - step, guess + step
+    for _ in range(64):
+        widen_low, widen_high = ~goes_left(low), goes_left(high)
+        if not (widen_low.any() or widen_high.any()):
+            break
+        step = step * 2
+        low = np.where(widen_low, guess - step, low)
+        high = np.where(widen_high, guess + step, high)
+    for _ in range(128):
+        middle = low + (high - low) / 2
+        open_interval = (middle != low) & (middle != high)
+        if not open_interval.any():
+            break
+        left = goes_left(middle)
+        low = np.where(open_interval & left, middle, low)
+        high = np.where(open_interval & ~left, middle, high)
+    return low
+
+
+class CompiledForest:
+    """Random forest packed into flat node arrays and evaluated over whole batches.
+
+    All trees share one set of contiguous arrays (``feature``, ``threshold``,
+    ``left``, ``right``, ``value``); ``roots`` holds each tree's first node.
+    Leaves point to themselves, so a batch is traversed by stepping every
+    (row, tree) pair ``max_depth`` times with fancy indexing instead of
+    dispatching each tree separately. ``value`` is the positive-class
+    fraction at every node, internal nodes included.
+
+    With ``scaler`` the split thresholds are mapped back to raw feature units
+    (see ``_fold_thresholds``), so the engine consumes unscaled features with
+    the same split decisions. Without it, inputs are cast to float32 before
+    comparing, exactly like sklearn.
+
+    The win is at interactive batch sizes, where sklearn pays per-tree
+    dispatch: a single row is ~50-80x faster. From roughly a thousand rows
+    on, sklearn's Cython traversal is faster again; see
+    ``benchmarks/bench_forest.py``.
+    """
+
+    #: Rows evaluated at once; bounds the (rows x trees) index scratch arrays.
+    block_rows = 256
+
+    def __init__(
+        self,
+        *,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        n_features: int,
+        prescaled: bool,
+        classes: Optional[np.ndarray] = None,
+        feature_names: Optional[np.ndarray] = None,
+        children: Optional[np.ndarray] = None,
+    ) -> None:
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        # children[2 * node + went_left] replaces two gathers and a select per step.
+        self.children = np.column_stack((right, left)).ravel() if children is None else children
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.n_features_in_ = int(n_features)
+        self.prescaled = bool(prescaled)
+        self.classes_ = np.asarray(classes if classes is not None else [0, 1])
+        self.feature_names_in_ = feature_names
+
+    @classmethod
+    def from_sklearn(cls, forest: Any, scaler: Any = None) -> "CompiledForest":
+        """Pack a fitted binary ``RandomForestClassifier`` (or a single tree)."""
+        estimators = getattr(forest, "estimators_", [forest])
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count, dtype=np.int32)
+            is_leaf = tree.children_left < 0
+            left = np.where(is_leaf, node_ids, tree.children_left).astype(np.int32) + offset
+            right = np.where(is_leaf, node_ids, tree.children_right).astype(np.int32) + offset
+            counts = np.asarray(tree.value, dtype=np.float64)[:, 0, :]
+            positive = counts[:, 1] / counts.sum(axis=1)
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold).astype(np.float64))
+            lefts.append(left)
+            rights.append(right)
+            values.append(positive)
+            roots.append(offset)
+            offset += tree.node_count
+            max_depth = max(max_depth, int(tree.max_depth))
+
+        packed = cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            n_features=getattr(forest, "n_features_in_", 0),
+            prescaled=False,
+            classes=getattr(forest, "classes_", None),
+        )
+        return packed if scaler is None else packed.with_scaler(scaler)
+
+    def with_scaler(self, scaler: Any) -> "CompiledForest":
+        """Return a copy whose thresholds are in raw units of ``scaler``'s inputs."""
+        if self.prescaled:
+            raise ValueError("Forest thresholds already include a scaler")
+        threshold = np.array(self.threshold, dtype=np.float64)
+        split = np.isfinite(threshold)
+        threshold[split] = _fold_thresholds(
+            threshold[split],
+            np.asarray(scaler.mean_, dtype=np.float64)[self.feature[split]],
+            np.asarray(scaler.scale_, dtype=np.float64)[self.feature[split]],
+        )
+        return CompiledForest(
+            feature=self.feature,
+            threshold=threshold,
+            left=self.left,
+            right=self.right,
+            value=self.value,
+            roots=self.roots,
+            max_depth=self.max_depth,
+            n_features=self.n_features_in_,
+            prescaled=True,
+            classes=self.classes_,
+            feature_names=getattr(scaler, "feature_names_in_", None),
+            children=self.children,
+        )
+
+    def prune(self, n_estimators: Optional[int] = None, max_depth: Optional[int] = None) -> "CompiledForest":
+        """Return a compact forest of the first ``n_estimators`` trees cut at ``max_depth``.
+
+        Nodes at the depth limit become leaves predicting their stored
+        positive-class fraction, and unreachable nodes are dropped, so the
+        arrays shrink with both limits. Trees are kept in order, which makes
+        a tree-count prune of a random forest the same model as one trained
+        with fewer estimators and the same seed.
+        """
+        n_trees = self.n_estimators if n_estimators is None else min(int(n_estimators), self.n_estimators)
+        depth_limit = self.max_depth if max_depth is None else min(int(max_depth), self.max_depth)
+        if n_trees < 1 or depth_limit < 0:
+            raise ValueError("prune needs at least one tree and a non-negative depth")
+
+        frontier = np.asarray(self.roots[:n_trees], dtype=np.int64)
+        levels = [frontier]
+        depth = 0
+        while depth < depth_limit:
+            parents = frontier[self.left[frontier] != frontier]
+            if parents.size == 0:
+                break
+            frontier = np.column_stack((self.left[parents], self.right[parents])).ravel().astype(np.int64)
+            levels.append(frontier)
+            depth += 1
+
+        kept = np.concatenate(levels)
+        new_ids = np.full(self.feature.shape[0], -1, dtype=np.int64)
+        new_ids[kept] = np.arange(kept.shape[0])
+        positions = np.arange(kept.shape[0], dtype=np.int32)
+        is_leaf = self.left[kept] == kept
+        is_leaf[kept.shape[0] - levels[-1].shape[0]:] = True
+
+        return CompiledForest(
+            feature=np.where(is_leaf, 0, self.feature[kept]).astype(np.int32),
+            threshold=np.where(is_leaf, np.inf, self.threshold[kept]),
+            left=np.where(is_leaf, positions, new_ids[self.left[kept]]).astype(np.int32),
+            right=np.where(is_leaf, positions, new_ids[self.right[kept]]).astype(np.int32),
+            value=np.array(self.value[kept], dtype=np.float64),
+            roots=new_ids[self.roots[:n_trees]].astype(np.int32),
+            max_depth=depth,
+            n_features=self.n_features_in_,
+            prescaled=self.prescaled,
+            classes=self.classes_,
+            feature_names=self.feature_names_in_,
+        )
+
+    @property
+    def n_estimators(self) -> int:
+        return int(self.roots.shape[0])
+
+    def _prepare(self, features: Any) -> np.ndarray:
+        matrix = _as_matrix(features)
+        if not self.prescaled:
+            # sklearn trees compare float32 inputs against float64 thresholds.
+            matrix = matrix.astype(np.float32)
+        return matrix
+
+    def apply(self, features: Any) -> np.ndarray:
+        """Return the ``(n_rows, n_trees)`` leaf index reached by every row in every tree."""
+        matrix = np.ascontiguousarray(self._prepare(features))
+        n_rows, n_features = matrix.shape
+        leaves = np.empty((n_rows, self.n_estimators), dtype=np.int32)
+        for start in range(0, n_rows, self.block_rows):
+            block = matrix[start:start + self.block_rows]
+            flat = block.ravel()
+            row_offsets = (np.arange(block.shape[0], dtype=np.int64) * n_features)[:, None]
+            node = np.broadcast_to(self.roots, (block.shape[0], self.n_estimators)).astype(np.int64)
+            for _ in range(self.max_depth):
+                go_left = flat[row_offsets + self.feature[node]] <= self.threshold[node]
+                node = self.children[2 * node + go_left]
+            leaves[start:start + block.shape[0]] = node
+        return leaves
+
+    def contributions(self, features: Any) -> Tuple[float, np.ndarray]:
+        """Return ``(bias, (n_rows, n_features) contributions)`` to the positive-class probability.
+
+        Path contributions (Saabas): every split a row passes changes the
+        positive-class fraction from the node to the child it takes, and that
+        change is credited to the split's feature. The traversal is the one
+        ``apply`` does, with the per-step credits summed by ``np.bincount``.
+        Averaged over trees, ``bias + contributions.sum(axis=1)`` equals
+        ``positive_proba`` up to rounding; ``bias`` is the mean root value.
+        """
+        matrix = np.ascontiguousarray(self._prepare(features))
+        n_rows, n_features = matrix.shape
+        totals = np.empty((n_rows, n_features), dtype=np.float64)
+        for start in range(0, n_rows, self.block_rows):
+            block = matrix[start:start + self.block_rows]
+            rows = block.shape[0]
+            flat = block.ravel()
+            row_offsets = (np.arange(rows, dtype=np.int64) * n_features)[:, None]
+            node = np.broadcast_to(self.roots, (rows, self.n_estimators)).astype(np.int64)
+            block_totals = np.zeros(rows * n_features, dtype=np.float64)
+            for _ in range(self.max_depth):
+                split_feature = row_offsets + self.feature[node]
+                go_left = flat[split_feature] <= self.threshold[node]
+                child = self.children[2 * node + go_left]
+                # Leaves step to themselves, so finished paths add zero.
+                block_totals += np.bincount(
+                    split_feature.ravel(),
+                    weights=(self.value[child] - self.value[node]).ravel(),
+                    minlength=rows * n_features,
+                )
+                node = child
+            totals[start:start + rows] = block_totals.reshape(rows, n_features)
+        totals /= self.n_estimators
+        return float(self.value[self.roots].mean()), totals
+
+    def positive_proba(self, features: Any) -> np.ndarray:
+        return self.value[self.apply(features)].mean(axis=1)
+
+    def predict_proba(self, features: Any) -> np.ndarray:
+        positive = self.positive_proba(features)
+        return np.column_stack((1.0 - positive, positive))
+
+    def predict(self, features: Any) -> np.ndarray:
+        return self.classes_[(self.positive_proba(features) > 0.5).astype(np.int64)]
+
+    def predict_batch(self, features: Any, threshold: float = 0.5) -> Tuple[np.ndarray, np.ndarray]:
+        """Return labels and positive-class probabilities for every row."""
+        probabilities = self.positive_proba(features)
+        return (probabilities > threshold).astype(np.int64), probabilities
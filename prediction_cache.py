@@ -0,0 +1,121 @@
+"""Bounded LRU/TTL cache for model predictions.
+
+Keys are built from the encoded float64 feature vector, so inputs that encode
+identically share one entry (heart cholesterol and glucose collapse into
+three buckets each). The key also holds the artifact
+version, so a retrained or hot-reloaded model never serves stale results.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+# Rough per-entry bookkeeping cost (OrderedDict slot, key tuple, value tuple, floats).
+ENTRY_OVERHEAD_BYTES = 240
+
+
+def feature_key(disease: str, version: str, features: Any) -> Tuple[str, str, bytes]:
+    """Return the canonical cache key for one encoded feature row."""
+    row = np.ascontiguousarray(features, dtype=np.float64).ravel()
+    return disease, version, row.tobytes()
+
+
+def _entry_bytes(key: Tuple[str, str, bytes]) -> int:
+    return ENTRY_OVERHEAD_BYTES + len(key[0]) + len(key[1]) + len(key[2])
+
+
+class PredictionCache:
+    """Thread-safe LRU cache with a byte budget and a time-to-live.
+
+    Entries older than ``ttl_seconds`` are treated as misses. When an insert
+    would push the estimated size past ``max_bytes``, the least recently used
+    entries are evicted first.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_bytes = int(max_bytes)
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for ``key`` or ``None`` (counted as a miss)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value, size = entry
+            if self.ttl_seconds is not None and self._clock() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Tuple[str, str, bytes], value: Any, value_bytes: int = 0) -> None:
+        """Store ``value``, evicting least recently used entries to stay under ``max_bytes``.
+
+        ``value_bytes`` adds the size of large values (e.g. rendered reports) to the estimate.
+        """
+        size = _entry_bytes(key) + value_bytes
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[2]
+            self._entries[key] = (self._clock(), value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def get_or_compute(self, key: Tuple[str, str, bytes], compute: Callable[[], Any]) -> Any:
+        """Return the cached value or compute, store and return it."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters, hit rate and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
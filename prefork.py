@@ -0,0 +1,245 @@
+"""Pre-fork serving: load the models once, then fork workers that share them.
+
+    python prefork.py serve --workers 4 --port 8000
+    python prefork.py measure --workers 4
+
+``serve`` binds the listening socket and loads every compiled model (and the
+registry's artifacts behind it) in the parent, runs ``gc.freeze()`` and forks
+the HTTP workers from ``service.py``. The workers inherit the model pages
+copy-on-write. Freezing moves every loaded object into the permanent
+generation, so the workers' collections never write to their GC headers and
+the pages stay shared. Array buffers (forest nodes, weights) are never touched
+by reference counting at all. Dead workers are restarted; SIGINT/SIGTERM stop
+them all.
+
+``measure`` compares per-worker memory from ``/proc/<pid>/smaps_rollup`` for
+three layouts: ``naive`` (each worker loads its own copy, like
+``uvicorn --workers``), ``prefork`` and ``prefork-nofreeze``. PSS divides
+shared pages between the processes mapping them, so its sum is the real
+per-host cost. Linux only.
+"""
+
+import argparse
+import gc
+import json
+import os
+import signal
+import socket
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+import service
+
+MEASURE_MODES = ("naive", "prefork", "prefork-nofreeze")
+
+_SMAPS_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared",
+    "Shared_Dirty": "shared",
+    "Private_Clean": "private",
+    "Private_Dirty": "private",
+}
+
+
+def memory_usage(pid: int) -> Dict[str, int]:
+    """Return ``rss``/``pss``/``shared``/``private`` bytes for ``pid`` from ``smaps_rollup``."""
+    usage = {"rss": 0, "pss": 0, "shared": 0, "private": 0}
+    with open(f"/proc/{pid}/smaps_rollup") as handle:
+        for line in handle:
+            field, _, rest = line.partition(":")
+            key = _SMAPS_FIELDS.get(field)
+            if key is not None:
+                usage[key] += int(rest.split()[0]) * 1024
+    return usage
+
+
+def warm(models: Dict[str, Any]) -> None:
+    """Run one prediction per loaded model so lazily built state exists before forking."""
+    for model in models.values():
+        if not isinstance(model, Exception):
+            model.predict_batch(np.zeros((1, model.n_features_in_)))
+
+
+def preload(loader: Callable[[], Dict[str, Any]] = service.load_models, freeze: bool = True) -> Dict[str, Any]:
+    """Load and warm every model in this process, then freeze the heap for forking."""
+    models = loader()
+    warm(models)
+    gc.collect()
+    if freeze:
+        gc.freeze()
+    return models
+
+
+def fork_worker(target: Callable[[], Optional[int]]) -> int:
+    """Fork a child that runs ``target`` and exits with its return code; return the child's pid."""
+    pid = os.fork()
+    if pid:
+        return pid
+    code = 1
+    try:
+        code = target() or 0
+    finally:
+        os._exit(code)
+
+
+def _measured_worker(ready: int, release: int, unused: List[int], load: bool) -> int:
+    # Sibling workers must not hold the release pipe's write end, or close() never reaches us.
+    for fd in unused:
+        os.close(fd)
+    models = preload(freeze=False) if load else service.load_models()
+    warm(models)
+    # A full collection is what un-shares an unfrozen heap in a long-running worker.
+    gc.collect()
+    os.write(ready, b"r")
+    os.read(release, 1)
+    return 0
+
+
+def _measure_mode(mode: str, workers: int) -> Dict[str, Any]:
+    """Start ``workers`` workers in ``mode`` (from a process with no models loaded) and sample them."""
+    prefork_mode = mode != "naive"
+    if prefork_mode:
+        preload(freeze=mode == "prefork")
+    ready_read, ready_write = os.pipe()
+    release_read, release_write = os.pipe()
+    pids = [
+        fork_worker(lambda: _measured_worker(ready_write, release_read, [ready_read, release_write], not prefork_mode))
+        for _ in range(workers)
+    ]
+    for _ in pids:
+        os.read(ready_read, 1)
+    per_worker = [memory_usage(pid) for pid in pids]
+    parent = memory_usage(os.getpid())
+    os.close(release_write)
+    for pid in pids:
+        os.waitpid(pid, 0)
+    totals = {key: sum(usage[key] for usage in per_worker) for key in ("rss", "pss", "private")}
+    if prefork_mode:
+        totals["pss"] += parent["pss"]
+    return {"mode": mode, "workers": workers, "per_worker": per_worker, "parent": parent, "total": totals}
+
+
+def measure(workers: int, modes: List[str] = list(MEASURE_MODES)) -> List[Dict[str, Any]]:
+    """Measure every mode in its own freshly forked process so no mode inherits another's models."""
+    results = []
+    for mode in modes:
+        read_end, write_end = os.pipe()
+
+        def run(mode: str = mode) -> int:
+            os.close(read_end)
+            with os.fdopen(write_end, "w") as handle:
+                json.dump(_measure_mode(mode, workers), handle)
+            return 0
+
+        pid = fork_worker(run)
+        os.close(write_end)
+        with os.fdopen(read_end) as handle:
+            payload = handle.read()
+        os.waitpid(pid, 0)
+        results.append(json.loads(payload))
+    return results
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _serve_worker(sock: socket.socket) -> int:
+    import uvicorn
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    gc.enable()
+    # The app's lifespan finds the models already cached by the registry.
+    server = uvicorn.Server(uvicorn.Config(service.create_app(), log_level="warning"))
+    server.run(sockets=[sock])
+    return 0
+
+
+def serve(workers: int, host: str = "127.0.0.1", port: int = 8000) -> int:
+    """Bind, preload, then fork and supervise ``workers`` HTTP workers until signalled."""
+    sock = bind_socket(host, port)
+    # Keep the collector from touching the heap between loading and freezing.
+    gc.disable()
+    models = preload()
+    unavailable = [disease for disease, model in models.items() if isinstance(model, Exception)]
+    if unavailable:
+        print(f"Models unavailable: {', '.join(unavailable)}", file=sys.stderr)
+
+    stopping = False
+    children: List[int] = []
+
+    def stop(signum: int, frame: Any) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    # Install the handlers before forking so a signal mid-startup still reaches
+    # every child forked so far; later ones are not started once stopping.
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for _ in range(workers):
+        if stopping:
+            break
+        children.append(fork_worker(lambda: _serve_worker(sock)))
+    gc.enable()
+    print(f"Serving on http://{host}:{port} with {workers} pre-forked workers", file=sys.stderr)
+    while children:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        if pid in children:
+            children.remove(pid)
+            if not stopping:
+                children.append(fork_worker(lambda: _serve_worker(sock)))
+    sock.close()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Serve or measure pre-forked workers sharing model memory.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="Run the HTTP service with pre-forked workers")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    measure_parser = commands.add_parser("measure", help="Compare per-worker memory against a naive baseline")
+    measure_parser.add_argument("--workers", type=int, default=4)
+    measure_parser.add_argument("--modes", nargs="+", choices=MEASURE_MODES, default=list(MEASURE_MODES))
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "serve":
+        return serve(args.workers, args.host, args.port)
+    results = measure(args.workers, args.modes)
+    for result in results:
+        print(json.dumps(result))
+    baseline = next((result for result in results if result["mode"] == "naive"), None)
+    for result in results:
+        line = (
+            f"{result['mode']:>17}: {result['total']['pss'] / 2**20:7.1f} MiB PSS total, "
+            f"{np.mean([usage['private'] for usage in result['per_worker']]) / 2**20:6.1f} MiB private per worker"
+        )
+        if baseline is not None and result is not baseline:
+            line += f" ({result['total']['pss'] / baseline['total']['pss']:.0%} of naive)"
+        print(line, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
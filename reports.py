@@ -0,0 +1,556 @@
+"""Template-based PDF reports.
+
+``build_fpdf_report`` is the original FPDF layout. ``build_report`` draws the
+same page straight into PDF content-stream bytes. A ``ReportTemplate`` is
+compiled once per condition and input-label set. It renders the layout once
+with placeholder slots, so every rectangle, label, colour and position becomes
+a fixed byte string, and later reports only splice the escaped patient name,
+timestamp, input values and result into those bytes. Helvetica widths are
+read from FPDF once per process and reused for line wrapping. Reports whose
+values wrap or spill onto a second page take the general flow path, which
+lays out the page the same way FPDF does. fpdf itself is imported on first
+use, so importing this module does not load it.
+
+    pdf_bytes = build_report("Heart Disease", "Jane Doe", {"Age": 55}, "Low Risk", 32.8)
+"""
+
+import importlib.util
+import re
+import threading
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+from urllib.parse import quote
+
+from prediction_cache import PredictionCache
+
+# Page geometry in millimetres, matching FPDF's A4 defaults and the margins
+# build_fpdf_report sets.
+PAGE_WIDTH = 210.0
+PAGE_HEIGHT = 297.0
+MARGIN = 12.0
+BREAK_AT = PAGE_HEIGHT - 15.0
+CELL_MARGIN = 1.0
+CONTENT_WIDTH = PAGE_WIDTH - 2 * MARGIN
+LEFT_COLUMN = CONTENT_WIDTH * 0.6
+LABEL_WIDTH = 55.0
+VALUE_WIDTH = CONTENT_WIDTH - LABEL_WIDTH
+_K = 72 / 25.4  # points per millimetre
+
+NAVY = (26, 33, 62)
+PANEL = (240, 245, 250)
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+HIGH_RISK = (244, 67, 54)
+LOW_RISK = (76, 175, 80)
+
+_FONTS = {"": b"F1", "B": b"F2"}
+
+Part = Union[bytes, str]  # a str part names a slot filled in at render time
+
+
+@lru_cache(maxsize=None)
+def pdf_available() -> bool:
+    """True when fpdf is installed, so reports can be rendered; does not import it."""
+    return importlib.util.find_spec("fpdf") is not None
+
+
+def _fpdf():
+    """Import and return the ``FPDF`` class on first use."""
+    from fpdf import FPDF
+
+    return FPDF
+
+
+def warm_reports() -> None:
+    """Import fpdf and read the font metrics ahead of the first report."""
+    if pdf_available():
+        font_metrics()
+
+
+def build_fpdf_report(disease_name, patient_name, inputs, prediction_label, probability_percent, factors=None):
+    """Build the report with FPDF, rebuilding the whole document on every call.
+
+    ``factors`` is an optional list of ``(label, text)`` rows for a Key Factors
+    section after the result, e.g. ``explain.Explanation.factors()``.
+    """
+    if not pdf_available():
+        return None
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+    safe_name = patient_name.strip() or "Unknown"
+    pdf = _fpdf()()
+    pdf.set_margins(left=12, top=12, right=12)
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    page_width = getattr(pdf, "epw", None) or (pdf.w - pdf.l_margin - pdf.r_margin)
+
+    pdf.set_fill_color(26, 33, 62)
+    pdf.set_text_color(255, 255, 255)
+    pdf.set_font("Helvetica", style="B", size=16)
+    pdf.rect(pdf.l_margin, pdf.t_margin, page_width, 16, style="F")
+    pdf.set_xy(pdf.l_margin + 4, pdf.t_margin + 4)
+    pdf.cell(page_width - 8, 8, "Disease Prediction Report")
+
+    pdf.set_text_color(0, 0, 0)
+    pdf.ln(20)
+    pdf.set_font("Helvetica", size=11)
+    left_col = page_width * 0.6
+    right_col = page_width - left_col
+    pdf.cell(left_col, 7, f"Generated: {timestamp}")
+    pdf.cell(right_col, 7, f"Condition: {disease_name}", ln=1)
+    pdf.set_font("Helvetica", style="B", size=13)
+    pdf.cell(left_col, 8, f"Patient Name: {safe_name}")
+    pdf.set_font("Helvetica", size=11)
+    pdf.cell(right_col, 8, "", ln=1)
+    pdf.ln(2)
+
+    pdf.set_fill_color(240, 245, 250)
+    pdf.set_text_color(26, 33, 62)
+    pdf.set_font("Helvetica", style="B", size=12)
+    pdf.cell(page_width, 8, "Inputs", ln=1, fill=True)
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_font("Helvetica", size=11)
+
+    label_width = 55
+    value_width = page_width - label_width
+
+    def draw_kv_row(label, value):
+        pdf.set_x(pdf.l_margin)
+        pdf.set_font("Helvetica", style="B", size=11)
+        pdf.cell(label_width, 7, str(label))
+        pdf.set_font("Helvetica", size=11)
+        try:
+            pdf.multi_cell(value_width, 7, str(value), new_x="LMARGIN", new_y="NEXT")
+        except TypeError:
+            pdf.multi_cell(value_width, 7, str(value))
+
+    for key, value in inputs.items():
+        draw_kv_row(key, value)
+
+    pdf.ln(2)
+    pdf.set_fill_color(240, 245, 250)
+    pdf.set_text_color(26, 33, 62)
+    pdf.set_font("Helvetica", style="B", size=12)
+    pdf.cell(page_width, 8, "Result", ln=1, fill=True)
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_font("Helvetica", size=11)
+
+    risk_color = (244, 67, 54) if prediction_label == "High Risk" else (76, 175, 80)
+    pdf.set_text_color(*risk_color)
+    pdf.set_font("Helvetica", style="B", size=12)
+    pdf.cell(page_width, 7, f"Prediction: {prediction_label}", ln=1)
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_font("Helvetica", size=11)
+    pdf.cell(page_width, 7, f"Risk Level: {probability_percent:.1f}%", ln=1)
+
+    if factors:
+        pdf.ln(2)
+        pdf.set_fill_color(240, 245, 250)
+        pdf.set_text_color(26, 33, 62)
+        pdf.set_font("Helvetica", style="B", size=12)
+        pdf.cell(page_width, 8, "Key Factors", ln=1, fill=True)
+        pdf.set_text_color(0, 0, 0)
+        pdf.set_font("Helvetica", size=11)
+        for label, text in factors:
+            draw_kv_row(label, text)
+
+    pdf_output = pdf.output(dest="S")
+    if isinstance(pdf_output, (bytes, bytearray)):
+        return bytes(pdf_output)
+    return str(pdf_output).encode("latin1")
+
+
+@lru_cache(maxsize=None)
+def font_metrics() -> Dict[str, Tuple[float, ...]]:
+    """Return Helvetica glyph widths (in 1/1000 em) per style, read from FPDF once."""
+    pdf = _fpdf()()
+    metrics = {}
+    for style in _FONTS:
+        pdf.set_font("Helvetica", style=style, size=10)
+        em = 1000.0 / pdf.font_size
+        metrics[style] = tuple(
+            pdf.get_string_width(chr(code)) * em if code >= 32 else 0.0 for code in range(256)
+        )
+    return metrics
+
+
+def _encode(text: Any) -> bytes:
+    return str(text).replace("\r", "").encode("latin-1", "replace")
+
+
+def _escape(raw: bytes) -> bytes:
+    if b"(" not in raw and b")" not in raw and b"\\" not in raw:
+        return raw
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+@lru_cache(maxsize=None)
+def _short_line_limit(style: str, size: float, width: float) -> int:
+    """Longest byte count that fits ``width`` mm even if every glyph is the widest one."""
+    return int((width - 2 * CELL_MARGIN) * _K * 1000.0 / size // max(font_metrics()[style]))
+
+
+def fits_one_line(raw: bytes, width: float, style: str = "", size: float = 11) -> bool:
+    """True when ``raw`` fits on one ``multi_cell`` line of ``width`` mm."""
+    if b"\n" in raw:
+        return False
+    if len(raw) <= _short_line_limit(style, size, width):
+        return True
+    return text_width(raw, style, size) <= width - 2 * CELL_MARGIN
+
+
+def text_width(raw: bytes, style: str, size: float) -> float:
+    """Width in millimetres of latin-1 ``raw`` in Helvetica ``style`` at ``size`` points."""
+    widths = font_metrics()[style]
+    return sum(map(widths.__getitem__, raw)) * size / _K / 1000.0
+
+
+def wrap(raw: bytes, width: float, style: str = "", size: float = 11) -> List[bytes]:
+    """Split ``raw`` into lines fitting ``width`` mm the way ``FPDF.multi_cell`` does."""
+    limit = width - 2 * CELL_MARGIN
+    widths = font_metrics()[style]
+    scale = size / _K / 1000.0
+    lines: List[bytes] = []
+    for paragraph in raw.split(b"\n"):
+        line = b""
+        line_width = 0.0
+        for word in paragraph.split(b" "):
+            word_width = sum(map(widths.__getitem__, word)) * scale
+            space = widths[32] * scale if line else 0.0
+            if line and line_width + space + word_width > limit:
+                lines.append(line)
+                line, line_width, space = b"", 0.0, 0.0
+            if not line and word_width > limit:
+                # A single word wider than the cell is broken between characters.
+                for code in word:
+                    char_width = widths[code] * scale
+                    if line and line_width + char_width > limit:
+                        lines.append(line)
+                        line, line_width = b"", 0.0
+                    line += bytes((code,))
+                    line_width += char_width
+                continue
+            line = line + b" " + word if line else word
+            line_width += space + word_width
+        lines.append(line)
+    return lines
+
+
+def _color(rgb: Tuple[int, int, int]) -> bytes:
+    return b"%.3f %.3f %.3f" % tuple(channel / 255.0 for channel in rgb)
+
+
+def _rect(x: float, y: float, w: float, h: float, fill: Tuple[int, int, int]) -> bytes:
+    return b"%s rg %.2f %.2f %.2f %.2f re f\n" % (_color(fill), x * _K, (PAGE_HEIGHT - y) * _K, w * _K, -h * _K)
+
+
+def _text(x: float, y: float, h: float, style: str, size: float, color: Part, text: Part) -> List[Part]:
+    """Ops for an FPDF ``cell`` at ``(x, y)`` of height ``h``; ``color``/``text`` may be slots."""
+    baseline = y + 0.5 * h + 0.3 * size / _K
+    position = b" rg /%s %.2f Tf %.2f %.2f Td (" % (_FONTS[style], size, (x + CELL_MARGIN) * _K, (PAGE_HEIGHT - baseline) * _K)
+    return [b"BT ", color if isinstance(color, str) else _color(color), position, text, b") Tj ET\n"]
+
+
+class _Flow:
+    """Top-to-bottom cursor that starts a new page where FPDF's auto page break would."""
+
+    def __init__(self) -> None:
+        self.pages: List[List[Part]] = [[]]
+        self.y = MARGIN
+
+    def emit(self, parts: Sequence[Part]) -> None:
+        self.pages[-1].extend(parts)
+
+    def need(self, h: float) -> None:
+        if self.y + h > BREAK_AT:
+            self.pages.append([])
+            self.y = MARGIN
+
+
+class ReportTemplate:
+    """Precompiled report layout for one condition and one ordered set of input labels."""
+
+    def __init__(self, disease_name: str, labels: Sequence[Any]) -> None:
+        self.disease_name = str(disease_name)
+        self.labels = tuple(str(label) for label in labels)
+        self._condition = _escape(_encode(f"Condition: {self.disease_name}"))
+        self._labels = [_escape(_encode(label)) for label in self.labels]
+        flow = self._layout({f"value{i}": ["value%d" % i] for i in range(len(self.labels))})
+        pages = flow.pages
+        # Where an optional Key Factors section starts on the single-page path.
+        self._end_y = flow.y
+        # A template only exists for the common single-page, one-line-per-value case.
+        self.single_page = len(pages) == 1
+        self._static: List[bytes] = []
+        self._slots: List[str] = []
+        pending = b""
+        for part in pages[0]:
+            if isinstance(part, str):
+                self._static.append(pending)
+                self._slots.append(part)
+                pending = b""
+            else:
+                pending += part
+        self._static.append(pending)
+
+    def _layout(self, values: Mapping[str, Sequence[Part]]) -> _Flow:
+        """Lay the page out like ``build_fpdf_report``; ``values`` maps ``value<i>`` to its lines."""
+        flow = _Flow()
+        flow.emit([_rect(MARGIN, MARGIN, CONTENT_WIDTH, 16, NAVY)])
+        flow.emit(_text(MARGIN + 4, MARGIN + 4, 8, "B", 16, WHITE, b"Disease Prediction Report"))
+        flow.y = MARGIN + 4 + 20
+        flow.emit(_text(MARGIN, flow.y, 7, "", 11, BLACK, "generated"))
+        flow.emit(_text(MARGIN + LEFT_COLUMN, flow.y, 7, "", 11, BLACK, self._condition))
+        flow.y += 7
+        flow.emit(_text(MARGIN, flow.y, 8, "B", 13, BLACK, "patient"))
+        flow.y += 8 + 2
+        self._section(flow, b"Inputs")
+        for position, label in enumerate(self._labels):
+            flow.need(7)
+            flow.emit(_text(MARGIN, flow.y, 7, "B", 11, BLACK, label))
+            for line in values[f"value{position}"]:
+                flow.need(7)
+                flow.emit(_text(MARGIN + LABEL_WIDTH, flow.y, 7, "", 11, BLACK, line))
+                flow.y += 7
+        flow.y += 2
+        self._section(flow, b"Result")
+        flow.need(7)
+        flow.emit(_text(MARGIN, flow.y, 7, "B", 12, "risk_color", "prediction"))
+        flow.y += 7
+        flow.need(7)
+        flow.emit(_text(MARGIN, flow.y, 7, "", 11, BLACK, "risk"))
+        flow.y += 7
+        return flow
+
+    def _factors(self, flow: _Flow, factors: Sequence[Tuple[Any, Any]]) -> None:
+        """Append the Key Factors section, laid out like the inputs."""
+        flow.y += 2
+        self._section(flow, b"Key Factors")
+        for label, text in factors:
+            flow.need(7)
+            flow.emit(_text(MARGIN, flow.y, 7, "B", 11, BLACK, _escape(_encode(label))))
+            for line in wrap(_encode(text), VALUE_WIDTH):
+                flow.need(7)
+                flow.emit(_text(MARGIN + LABEL_WIDTH, flow.y, 7, "", 11, BLACK, _escape(line)))
+                flow.y += 7
+
+    @staticmethod
+    def _section(flow: _Flow, title: bytes) -> None:
+        flow.need(8)
+        flow.emit([_rect(MARGIN, flow.y, CONTENT_WIDTH, 8, PANEL)])
+        flow.emit(_text(MARGIN, flow.y, 8, "B", 12, NAVY, title))
+        flow.y += 8
+
+    def render(
+        self,
+        patient_name: str,
+        values: Sequence[Any],
+        prediction_label: str,
+        probability_percent: float,
+        timestamp: Optional[str] = None,
+        factors: Optional[Sequence[Tuple[Any, Any]]] = None,
+    ) -> bytes:
+        """Return the PDF for one patient; ``values`` follow the template's label order."""
+        return document(self.pages(patient_name, values, prediction_label, probability_percent, timestamp, factors))
+
+    def pages(
+        self,
+        patient_name: str,
+        values: Sequence[Any],
+        prediction_label: str,
+        probability_percent: float,
+        timestamp: Optional[str] = None,
+        factors: Optional[Sequence[Tuple[Any, Any]]] = None,
+    ) -> List[bytes]:
+        """Return the filled-in page content streams, for ``document`` to wrap.
+
+        ``factors`` adds a Key Factors section of ``(label, text)`` rows after the result.
+        """
+        if len(values) != len(self.labels):
+            raise ValueError(f"Expected {len(self.labels)} values, got {len(values)}")
+        timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M")
+        slots: Dict[str, bytes] = {
+            "generated": _escape(_encode(f"Generated: {timestamp}")),
+            "patient": _escape(_encode(f"Patient Name: {patient_name.strip() or 'Unknown'}")),
+            "risk_color": _color(HIGH_RISK if prediction_label == "High Risk" else LOW_RISK),
+            "prediction": _escape(_encode(f"Prediction: {prediction_label}")),
+            "risk": _escape(_encode(f"Risk Level: {probability_percent:.1f}%")),
+        }
+        encoded = [_encode(value) for value in values]
+        if self.single_page and all(fits_one_line(raw, VALUE_WIDTH) for raw in encoded):
+            for position, raw in enumerate(encoded):
+                slots[f"value{position}"] = _escape(raw)
+            content = bytearray(self._static[0])
+            for slot, static in zip(self._slots, self._static[1:]):
+                content += slots[slot]
+                content += static
+            if not factors:
+                return [bytes(content)]
+            tail = _Flow()
+            tail.y = self._end_y
+            self._factors(tail, factors)
+            return [bytes(content) + b"".join(tail.pages[0])] + [b"".join(page) for page in tail.pages[1:]]
+
+        lines = {f"value{i}": [_escape(line) for line in wrap(raw, VALUE_WIDTH)] for i, raw in enumerate(encoded)}
+        flow = self._layout(lines)
+        if factors:
+            self._factors(flow, factors)
+        return [b"".join(slots.get(part, b"") if isinstance(part, str) else part for part in page) for page in flow.pages]
+
+
+def _document_head(page_count: int) -> Tuple[bytes, List[int]]:
+    kids = b" ".join(b"%d 0 R" % (6 + 2 * page) for page in range(page_count))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, page_count),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+        b"<< /Producer (Disease Prediction System) >>",
+    ]
+    head = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(head))
+        head += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    return bytes(head), offsets
+
+
+@lru_cache(maxsize=8)
+def _cached_head(page_count: int) -> Tuple[bytes, Tuple[int, ...]]:
+    head, offsets = _document_head(page_count)
+    return head, tuple(offsets)
+
+
+def document(contents: Sequence[bytes]) -> bytes:
+    """Wrap one content stream per page into a complete PDF file."""
+    head, offsets = _cached_head(len(contents))
+    out = bytearray(head)
+    offsets = list(offsets)
+    media_box = b"[0 0 %.2f %.2f]" % (PAGE_WIDTH * _K, PAGE_HEIGHT * _K)
+    for page, content in enumerate(contents):
+        number = 6 + 2 * page
+        offsets.append(len(out))
+        out += (
+            b"%d 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox %s "
+            b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>\nendobj\n"
+            % (number, media_box, number + 1)
+        )
+        offsets.append(len(out))
+        out += b"%d 0 obj\n<< /Length %d >>\nstream\n" % (number + 1, len(content))
+        out += content
+        out += b"\nendstream\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(offsets) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R /Info 5 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(offsets) + 1, xref)
+    return bytes(out)
+
+
+# Rendered reports keyed on (condition, patient name, inputs + result).
+REPORT_CACHE = PredictionCache(max_bytes=32 * 1024 * 1024, ttl_seconds=3600.0)
+
+
+def report_key(
+    disease_name, patient_name, inputs, prediction_label, probability_percent, factors=None
+) -> Tuple[str, str, bytes]:
+    """Cache key for one report; the timestamp is deliberately not part of it."""
+    payload = repr((list(inputs.items()), prediction_label, round(float(probability_percent), 1), list(factors or ())))
+    return f"report:{disease_name}", patient_name.strip(), payload.encode("utf-8")
+
+
+def cached_report(disease_name, patient_name, inputs, prediction_label, probability_percent, factors=None):
+    """``build_report`` memoized in ``REPORT_CACHE``, so downloading the same result again is free.
+
+    A cached report keeps the timestamp of its first rendering.
+    """
+    key = report_key(disease_name, patient_name, inputs, prediction_label, probability_percent, factors)
+    pdf_bytes = REPORT_CACHE.get(key)
+    if pdf_bytes is None:
+        pdf_bytes = build_report(
+            disease_name, patient_name, inputs, prediction_label, probability_percent, factors=factors
+        )
+        if pdf_bytes is not None:
+            REPORT_CACHE.put(key, pdf_bytes, value_bytes=len(pdf_bytes))
+    return pdf_bytes
+
+
+def report_filename(disease_name: str, patient_name: str) -> str:
+    """``Diabetes_Report_<name>.pdf`` / ``Heart_Disease_Report_<name>.pdf``, as the app names downloads."""
+    safe_name = (patient_name.strip() or "Unknown").replace(" ", "_").replace("/", "_").replace("\\", "_")
+    return f"{disease_name.replace(' ', '_')}_Report_{safe_name}.pdf"
+
+
+def content_disposition(filename: str) -> str:
+    """``Content-Disposition`` header value for downloading ``filename``.
+
+    ``filename=`` carries an ASCII fallback reduced to ``[A-Za-z0-9_.-]``,
+    so quotes or non-latin-1 patient names cannot break or fail to encode the
+    header; the original name goes in the RFC 5987 ``filename*`` parameter.
+    """
+    fallback = re.sub(r"[^A-Za-z0-9_.-]", "_", filename)
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+_TEMPLATES: Dict[Tuple[str, Tuple[str, ...]], ReportTemplate] = {}
+_TEMPLATES_LOCK = threading.Lock()
+
+
+def get_template(disease_name: str, labels: Sequence[Any]) -> ReportTemplate:
+    """Return the compiled template for this condition and label order, building it once."""
+    key = (str(disease_name), tuple(str(label) for label in labels))
+    template = _TEMPLATES.get(key)
+    if template is None:
+        with _TEMPLATES_LOCK:
+            template = _TEMPLATES.get(key)
+            if template is None:
+                template = _TEMPLATES[key] = ReportTemplate(*key)
+    return template
+
+
+def build_report(
+    disease_name, patient_name, inputs, prediction_label, probability_percent, timestamp=None, factors=None
+):
+    """Drop-in replacement for ``build_fpdf_report`` that renders from a cached template.
+
+    Returns ``None`` when fpdf (needed once for the font metrics) is not installed.
+    """
+    if not pdf_available():
+        return None
+    template = get_template(disease_name, list(inputs.keys()))
+    return template.render(
+        patient_name, list(inputs.values()), prediction_label, probability_percent, timestamp, factors
+    )
+
+
+# (condition, inputs, prediction label, probability percent) for one section of a combined report
+ReportSection = Tuple[str, Mapping[str, Any], str, float]
+
+
+def build_combined_report(patient_name, sections: Sequence[ReportSection], timestamp=None):
+    """One PDF holding each condition's report page(s) in order, sharing one timestamp.
+
+    Returns ``None`` when fpdf is not installed.
+    """
+    if not pdf_available():
+        return None
+    timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M")
+    contents: List[bytes] = []
+    for disease_name, inputs, prediction_label, probability_percent in sections:
+        template = get_template(disease_name, list(inputs.keys()))
+        contents += template.pages(patient_name, list(inputs.values()), prediction_label, probability_percent, timestamp)
+    return document(contents)
+
+
+def cached_combined_report(patient_name, sections: Sequence[ReportSection]):
+    """``build_combined_report`` memoized in ``REPORT_CACHE`` like ``cached_report``."""
+    payload = repr([
+        (disease_name, list(inputs.items()), prediction_label, round(float(probability_percent), 1))
+        for disease_name, inputs, prediction_label, probability_percent in sections
+    ])
+    key = ("report:combined", patient_name.strip(), payload.encode("utf-8"))
+    pdf_bytes = REPORT_CACHE.get(key)
+    if pdf_bytes is None:
+        pdf_bytes = build_combined_report(patient_name, sections)
+        if pdf_bytes is not None:
+            REPORT_CACHE.put(key, pdf_bytes, value_bytes=len(pdf_bytes))
+    return pdf_bytes
@@ -0,0 +1,137 @@
+"""Bulk CSV scoring for the diabetes and heart disease models.
+
+Reads a patient file in the raw ``data/diabetes.csv`` or ``data/heart.csv``
+schema in fixed-size chunks, scores each chunk with one vectorized call and
+appends the rows plus ``prediction``/``probability`` columns to the output.
+
+    python score_csv.py heart data/heart.csv heart_scores.csv --workers 4
+"""
+
+import argparse
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, TextIO
+
+import pandas as pd
+
+from utils import (
+    ArtifactLoadError,
+    get_diabetes_encoder,
+    heart_matrix_from_records,
+    load_diabetes_model,
+    load_diabetes_scaler,
+    load_heart_model,
+    load_heart_scaler,
+    predict_diabetes_batch,
+    predict_heart_batch,
+)
+
+
+DEFAULT_SEPARATORS = {"diabetes": ",", "heart": ";"}
+DEFAULT_CHUNKSIZE = 50_000
+
+
+def score_chunk(disease: str, chunk: pd.DataFrame, threshold: float = 0.5) -> pd.DataFrame:
+    """Return ``chunk`` with ``prediction`` and ``probability`` columns appended."""
+    if disease == "diabetes":
+        scaler = load_diabetes_scaler()
+        features = get_diabetes_encoder(scaler).encode_records(chunk)
+        labels, probabilities = predict_diabetes_batch(load_diabetes_model(), scaler, features, threshold)
+    else:
+        features = heart_matrix_from_records(chunk)
+        labels, probabilities = predict_heart_batch(
+            load_heart_model(), load_heart_scaler(), features, threshold
+        )
+    scored = chunk.copy()
+    scored["prediction"] = labels
+    scored["probability"] = probabilities
+    return scored
+
+
+def iter_chunks(path: str, sep: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Yield the input file as DataFrames of at most ``chunksize`` rows."""
+    with pd.read_csv(path, sep=sep, chunksize=chunksize) as reader:
+        yield from reader
+
+
+def _write_chunk(scored: pd.DataFrame, output: TextIO, sep: str, first: bool) -> None:
+    scored.to_csv(output, sep=sep, header=first, index=False)
+
+
+def score_file(
+    disease: str,
+    input_path: str,
+    output: TextIO,
+    *,
+    sep: Optional[str] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    workers: int = 1,
+    threshold: float = 0.5,
+) -> int:
+    """Score ``input_path`` chunk by chunk into ``output`` and return the row count.
+
+    With ``workers > 1`` chunks are fanned out to a process pool. At most two
+    chunks per worker are in flight and results are written in input order,
+    so memory stays proportional to ``chunksize * workers``.
+    """
+    sep = sep or DEFAULT_SEPARATORS[disease]
+    chunks = iter_chunks(input_path, sep, chunksize)
+    rows = 0
+    first = True
+
+    if workers <= 1:
+        for chunk in chunks:
+            scored = score_chunk(disease, chunk, threshold)
+            _write_chunk(scored, output, sep, first)
+            first = False
+            rows += len(scored)
+        return rows
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(score_chunk, disease, chunk, threshold))
+            if len(pending) >= workers * 2:
+                scored = pending.popleft().result()
+                _write_chunk(scored, output, sep, first)
+                first = False
+                rows += len(scored)
+        while pending:
+            scored = pending.popleft().result()
+            _write_chunk(scored, output, sep, first)
+            first = False
+            rows += len(scored)
+    return rows
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Score a patient CSV with the trained models.")
+    parser.add_argument("disease", choices=sorted(DEFAULT_SEPARATORS), help="Model to score with")
+    parser.add_argument("input", help="CSV in the raw data/diabetes.csv or data/heart.csv schema")
+    parser.add_argument("output", help="Destination CSV ('-' for stdout)")
+    parser.add_argument("--sep", help="Field separator (default: ',' for diabetes, ';' for heart)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Rows per chunk")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (default: 1)")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Positive-class probability cut-off")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    options = dict(sep=args.sep, chunksize=args.chunksize, workers=args.workers, threshold=args.threshold)
+    try:
+        if args.output == "-":
+            rows = score_file(args.disease, args.input, sys.stdout, **options)
+        else:
+            with open(args.output, "w", newline="") as output:
+                rows = score_file(args.disease, args.input, output, **options)
+    except ArtifactLoadError as exc:
+        print(f"Failed to load model artifacts: {exc}", file=sys.stderr)
+        return 1
+    print(f"Scored {rows} {args.disease} records", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,441 @@
+"""Headless JSON inference service for the diabetes and heart disease models.
+
+    uvicorn service:app --workers 4
+    python service.py --port 8000 --workers 4
+
+Endpoints:
+
+* ``POST /predict/diabetes`` and ``POST /predict/heart`` take one JSON record
+  or a list of them and return ``{"prediction", "probability", "label"}``
+  (plus ``bmi`` for heart) or ``{"predictions": [...]}`` for lists.
+* ``POST /report/pdf`` takes ``{"disease", "patient_name", "record"}``, scores
+  the record and returns the same PDF the Streamlit app offers.
+* ``POST /reports/diabetes`` and ``POST /reports/heart`` take a list of
+  records (each with an optional ``patient_name``) and stream back a ZIP with
+  one report per record.
+* ``GET /health`` reports which models loaded.
+
+The compiled models are loaded once at startup. Encoding, prediction and PDF
+rendering run on a thread pool via ``run_in_executor``, so the event loop only
+parses and serializes JSON. A list body is scored with one vectorized call.
+Single records are looked up in the shared prediction cache, and misses from
+concurrent requests are coalesced by a per-model ``MicroBatcher``.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from batching import MicroBatcher
+from bulk_reports import ReportJob, iter_zip, render_reports
+from prediction_cache import feature_key
+from reports import build_report, content_disposition, pdf_available, report_filename
+from utils import (
+    PREDICTION_CACHE,
+    GENDER_OPTIONS,
+    SMOKING_OPTIONS,
+    ArtifactLoadError,
+    artifact_version,
+    build_heart_feature_matrix,
+    check_choice,
+    check_number,
+    get_diabetes_encoder,
+    load_compiled_diabetes_model,
+    load_compiled_heart_model,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_ROWS = 10_000
+
+DIABETES_FIELDS = ("age", "gender", "hypertension", "heart_disease", "smoking_history", "bmi", "hba1c", "glucose")
+HEART_FIELDS = (
+    "age", "gender", "height_cm", "weight_kg", "systolic_bp", "diastolic_bp",
+    "cholesterol", "glucose", "smoke", "alco", "active",
+)
+NUMERIC_FIELDS = {
+    "age", "bmi", "hba1c", "glucose", "height_cm", "weight_kg", "systolic_bp", "diastolic_bp", "cholesterol",
+}
+FLAG_FIELDS = {"hypertension", "heart_disease", "smoke", "alco", "active"}
+# The categories each encoder knows (see ``utils.check_choice``).
+CHOICES = {
+    "diabetes": {"gender": GENDER_OPTIONS["diabetes"], "smoking_history": SMOKING_OPTIONS},
+    "heart": {"gender": GENDER_OPTIONS["heart"]},
+}
+
+DISEASE_NAMES = {"diabetes": "Diabetes", "heart": "Heart Disease"}
+
+REPORT_LABELS = {
+    "diabetes": {
+        "age": "Age", "gender": "Gender", "bmi": "BMI", "smoking_history": "Smoking History",
+        "hypertension": "Hypertension", "heart_disease": "Heart Disease",
+        "hba1c": "HbA1c Level", "glucose": "Blood Glucose Level",
+    },
+    "heart": {
+        "age": "Age", "gender": "Gender", "height_cm": "Height (cm)", "weight_kg": "Weight (kg)",
+        "bmi": "BMI", "systolic_bp": "Systolic BP (mmHg)", "diastolic_bp": "Diastolic BP (mmHg)",
+        "cholesterol": "Cholesterol (mg/dL)", "glucose": "Glucose (mg/dL)", "smoke": "Smoker",
+        "alco": "Alcohol Use", "active": "Physically Active",
+    },
+}
+
+
+class RequestError(ValueError):
+    """A request body that cannot be scored; carries the HTTP status to return."""
+
+    def __init__(self, message: str, status_code: int = 422) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _flag(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("yes", "true", "1")
+    return bool(value)
+
+
+def parse_records(
+    body: Any, fields: Sequence[str], choices: Optional[Dict[str, Sequence[str]]] = None
+) -> Dict[str, np.ndarray]:
+    """Turn a record or list of records into one column array per field.
+
+    Numbers are checked with ``utils.check_number`` and the fields in
+    ``choices`` (see ``CHOICES``) with ``utils.check_choice``.
+    """
+    choices = choices or {}
+    records = body if isinstance(body, list) else [body]
+    if not records:
+        raise RequestError("Expected at least one record")
+    if len(records) > MAX_BATCH_ROWS:
+        raise RequestError(f"Batches are limited to {MAX_BATCH_ROWS} records", status_code=413)
+    columns: Dict[str, List[Any]] = {field: [] for field in fields}
+    for position, record in enumerate(records):
+        if not isinstance(record, dict):
+            raise RequestError(f"Record {position} is not a JSON object")
+        missing = [field for field in fields if field not in record]
+        if missing:
+            raise RequestError(f"Record {position} is missing {', '.join(missing)}")
+        for field in fields:
+            value = record[field]
+            try:
+                if field in FLAG_FIELDS:
+                    value = _flag(value)
+                elif field in choices:
+                    check_choice(field, value, choices[field])
+                elif field in NUMERIC_FIELDS:
+                    check_number(field, value)
+            except ValueError as exc:
+                raise RequestError(f"Record {position}: {exc}") from None
+            columns[field].append(value)
+    arrays = {}
+    for field, values in columns.items():
+        dtype = np.float64 if field in NUMERIC_FIELDS else (bool if field in FLAG_FIELDS else object)
+        arrays[field] = np.asarray(values, dtype=dtype)
+    return arrays
+
+
+def encode_diabetes(model: Any, columns: Dict[str, np.ndarray]) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+    features = get_diabetes_encoder(model).encode_batch(
+        age=columns["age"],
+        hypertension=columns["hypertension"],
+        heart_disease=columns["heart_disease"],
+        bmi=columns["bmi"],
+        hba1c=columns["hba1c"],
+        glucose=columns["glucose"],
+        gender=columns["gender"],
+        smoking_history=columns["smoking_history"],
+    )
+    return features, [{} for _ in range(features.shape[0])]
+
+
+def encode_heart(model: Any, columns: Dict[str, np.ndarray]) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+    features, bmi = build_heart_feature_matrix(
+        age=columns["age"],
+        gender=columns["gender"],
+        height_cm=columns["height_cm"],
+        weight_kg=columns["weight_kg"],
+        systolic_bp=columns["systolic_bp"],
+        diastolic_bp=columns["diastolic_bp"],
+        cholesterol=columns["cholesterol"],
+        glucose=columns["glucose"],
+        smoke=columns["smoke"],
+        alco=columns["alco"],
+        active=columns["active"],
+    )
+    return features, [{"bmi": float(value)} for value in bmi]
+
+
+def _result(label: Any, probability: Any, extra: Dict[str, Any]) -> Dict[str, Any]:
+    label = int(label)
+    result = {"prediction": label, "probability": float(probability), "label": "High Risk" if label == 1 else "Low Risk"}
+    result.update(extra)
+    return result
+
+
+ENCODERS: Dict[str, Callable[[Any, Dict[str, np.ndarray]], Tuple[np.ndarray, List[Dict[str, Any]]]]] = {
+    "diabetes": encode_diabetes,
+    "heart": encode_heart,
+}
+FIELDS = {"diabetes": DIABETES_FIELDS, "heart": HEART_FIELDS}
+# Only the forest has a per-call cost worth amortizing; the compiled linear
+# heart model scores a row faster than a batcher can hand it over.
+BATCHED_DISEASES = ("diabetes",)
+
+
+def encode_body(model: Any, disease: str, body: Any) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+    """Parse and encode a request body into a feature matrix plus per-row extras."""
+    return ENCODERS[disease](model, parse_records(body, FIELDS[disease], CHOICES[disease]))
+
+
+def shape_response(body: Any, labels: Any, probabilities: Any, extras: List[Dict[str, Any]]) -> Any:
+    results = [_result(*row) for row in zip(labels, probabilities, extras)]
+    return {"predictions": results} if isinstance(body, list) else results[0]
+
+
+def predict_body(model: Any, disease: str, body: Any) -> Any:
+    """Parse, score and shape the response for one request body synchronously."""
+    features, extras = encode_body(model, disease, body)
+    labels, probabilities = model.predict_batch(features)
+    return shape_response(body, labels, probabilities, extras)
+
+
+def prepare_single(
+    model: Any, disease: str, body: Any, score: bool = True, version: Optional[str] = None
+) -> Tuple[np.ndarray, List[Dict[str, Any]], Any, Any]:
+    """Encode one record and look it up in the prediction cache (runs on the pool).
+
+    ``version`` is the artifact version ``model`` was loaded from (see
+    ``load_models_with_versions``). It keys the cache, so predictions from a
+    model loaded at startup are never filed under a newer artifact on disk.
+    With ``score`` a cache miss is scored inline; otherwise the cached value
+    is ``None`` and the caller scores ``features`` itself.
+    """
+    features, extras = encode_body(model, disease, body)
+    key = feature_key(disease, version or artifact_version(disease), features)
+    cached = PREDICTION_CACHE.get(key)
+    if cached is None and score:
+        labels, probabilities = model.predict_batch(features)
+        cached = (int(labels[0]), float(probabilities[0]))
+        PREDICTION_CACHE.put(key, cached)
+    return features, extras, key, cached
+
+
+def report_inputs(disease: str, record: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the input table the app's report shows for a scored record."""
+    inputs = {}
+    for field, label in REPORT_LABELS[disease].items():
+        if field == "bmi":
+            value = result["bmi"] if disease == "heart" else record["bmi"]
+            inputs[label] = f"{value:.1f}" if disease == "heart" else value
+        elif field in FLAG_FIELDS:
+            inputs[label] = "Yes" if _flag(record[field]) else "No"
+        else:
+            inputs[label] = record[field]
+    return inputs
+
+
+def render_report(model: Any, disease: str, patient_name: str, record: Dict[str, Any]) -> Optional[bytes]:
+    """Score ``record`` and render the app's PDF report for it (runs on the pool)."""
+    result = predict_body(model, disease, record)
+    return build_report(
+        disease_name=DISEASE_NAMES[disease],
+        patient_name=patient_name,
+        inputs=report_inputs(disease, record, result),
+        prediction_label=result["label"],
+        probability_percent=result["probability"] * 100,
+    )
+
+
+def bulk_report_jobs(model: Any, disease: str, body: Any) -> List[ReportJob]:
+    """Score a list of records in one call and return a report job per record (runs on the pool)."""
+    if not isinstance(body, list):
+        raise RequestError('Expected a JSON list of records, each with an optional "patient_name"')
+    results = predict_body(model, disease, body)["predictions"]
+    return [
+        (str(record.get("patient_name") or ""), report_inputs(disease, record, result), result["label"],
+         result["probability"] * 100)
+        for record, result in zip(body, results)
+    ]
+
+
+MODEL_LOADERS: Dict[str, Callable[[], Any]] = {
+    "diabetes": load_compiled_diabetes_model,
+    "heart": load_compiled_heart_model,
+}
+
+
+def load_models_with_versions() -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Load every compiled model with the artifact version it was built from.
+
+    Load errors are recorded in place of the model instead of raised. The
+    version is read before and after loading and the load is retried if an
+    artifact changed in between, so each version matches its model.
+    """
+    models: Dict[str, Any] = {}
+    versions: Dict[str, str] = {}
+    for disease, loader in MODEL_LOADERS.items():
+        try:
+            for _ in range(3):
+                version = artifact_version(disease)
+                model = loader()
+                if artifact_version(disease) == version:
+                    break
+            models[disease], versions[disease] = model, version
+        except ArtifactLoadError as exc:
+            logger.error("Model %s unavailable: %s", disease, exc)
+            models[disease] = exc
+    return models, versions
+
+
+def load_models() -> Dict[str, Any]:
+    """Load every compiled model, recording load errors instead of raising."""
+    return load_models_with_versions()[0]
+
+
+def _error(message: str, status_code: int) -> JSONResponse:
+    return JSONResponse({"error": message}, status_code=status_code)
+
+
+async def _read_json(request: Request) -> Any:
+    try:
+        return json.loads(await request.body())
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise RequestError("Request body is not valid JSON", status_code=400)
+
+
+def _model_for(request: Request, disease: str) -> Any:
+    model = request.app.state.models.get(disease)
+    if model is None or isinstance(model, Exception):
+        raise RequestError(f"The {disease} model is unavailable", status_code=503)
+    return model
+
+
+async def _run(request: Request, func: Callable[..., Any], *args: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(request.app.state.executor, func, *args)
+
+
+async def predict_endpoint(request: Request) -> Response:
+    disease = request.path_params["disease"]
+    if disease not in ENCODERS:
+        return _error(f"Unknown disease: {disease}", 404)
+    try:
+        model = _model_for(request, disease)
+        body = await _read_json(request)
+        if isinstance(body, list):
+            return JSONResponse(await _run(request, predict_body, model, disease, body))
+        batcher = request.app.state.batchers.get(disease)
+        version = request.app.state.versions[disease]
+        features, extras, key, cached = await _run(
+            request, prepare_single, model, disease, body, batcher is None, version
+        )
+        if cached is None:
+            # Concurrent single-record requests share one vectorized model call.
+            cached = await batcher.predict_async(features)
+            PREDICTION_CACHE.put(key, cached)
+        return JSONResponse(shape_response(body, [cached[0]], [cached[1]], extras))
+    except RequestError as exc:
+        return _error(str(exc), exc.status_code)
+
+
+async def report_endpoint(request: Request) -> Response:
+    try:
+        body = await _read_json(request)
+        if not isinstance(body, dict) or body.get("disease") not in ENCODERS or not isinstance(body.get("record"), dict):
+            raise RequestError('Expected {"disease": "diabetes"|"heart", "patient_name": ..., "record": {...}}')
+        disease = body["disease"]
+        model = _model_for(request, disease)
+        patient_name = str(body.get("patient_name") or "")
+        pdf_bytes = await _run(request, render_report, model, disease, patient_name, body["record"])
+    except RequestError as exc:
+        return _error(str(exc), exc.status_code)
+    if pdf_bytes is None:
+        return _error("PDF generation is unavailable (fpdf is not installed)", 501)
+    headers = {"Content-Disposition": content_disposition(report_filename(DISEASE_NAMES[disease], patient_name))}
+    return Response(pdf_bytes, media_type="application/pdf", headers=headers)
+
+
+async def bulk_report_endpoint(request: Request) -> Response:
+    disease = request.path_params["disease"]
+    if disease not in ENCODERS:
+        return _error(f"Unknown disease: {disease}", 404)
+    if not pdf_available():
+        return _error("PDF generation is unavailable (fpdf is not installed)", 501)
+    try:
+        model = _model_for(request, disease)
+        body = await _read_json(request)
+        jobs = await _run(request, bulk_report_jobs, model, disease, body)
+    except RequestError as exc:
+        return _error(str(exc), exc.status_code)
+    # Reports are rendered while the archive streams out, one entry at a time.
+    archive = iter_zip(render_reports(disease, jobs))
+    filename = f"{DISEASE_NAMES[disease].replace(' ', '_')}_Reports.zip"
+    headers = {"Content-Disposition": content_disposition(filename)}
+    return StreamingResponse(archive, media_type="application/zip", headers=headers)
+
+
+async def health_endpoint(request: Request) -> Response:
+    models = request.app.state.models
+    status = {disease: not isinstance(model, Exception) for disease, model in models.items()}
+    return JSONResponse({"models": status}, status_code=200 if all(status.values()) else 503)
+
+
+def create_app(max_workers: Optional[int] = None, max_batch_size: int = 64, max_wait: float = 0.002) -> Starlette:
+    """Build the ASGI app; models, batchers and the thread pool live for the app's lifespan.
+
+    ``max_batch_size``/``max_wait`` configure the micro-batchers that coalesce
+    concurrent single-record predictions (see ``batching.MicroBatcher``).
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        app.state.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        app.state.models, app.state.versions = load_models_with_versions()
+        app.state.batchers = {
+            disease: MicroBatcher(model.predict_batch, max_batch_size=max_batch_size, max_wait=max_wait, name=f"{disease}-batcher")
+            for disease, model in app.state.models.items()
+            if disease in BATCHED_DISEASES and not isinstance(model, Exception)
+        }
+        try:
+            yield
+        finally:
+            for batcher in app.state.batchers.values():
+                batcher.close()
+            app.state.executor.shutdown(wait=True)
+
+    routes = [
+        Route("/predict/{disease:str}", predict_endpoint, methods=["POST"]),
+        Route("/report/pdf", report_endpoint, methods=["POST"]),
+        Route("/reports/{disease:str}", bulk_report_endpoint, methods=["POST"]),
+        Route("/health", health_endpoint, methods=["GET"]),
+    ]
+    return Starlette(routes=routes, lifespan=lifespan)
+
+
+app = create_app()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the prediction models over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (default: 1)")
+    args = parser.parse_args(argv)
+    uvicorn.run("service:app", host=args.host, port=args.port, workers=args.workers, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
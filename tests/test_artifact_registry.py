@@ -0,0 +1,90 @@
+"""Tests for the process-wide artifact registry."""
+
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import utils
+
+
+def _write_pickle(path, value, mtime_ns=None):
+    with open(path, "wb") as handle:
+        pickle.dump(value, handle)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_registry_caches_and_counts_hits():
+    print("Testing registry cache hits and misses...")
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_pickle(Path(tmp) / "model.pkl", {"version": 1})
+        registry = utils.ArtifactRegistry(Path(tmp))
+
+        first = registry.get("model.pkl")
+        second = registry.get("model.pkl")
+
+        assert first is second, "Registry should return the cached object"
+        stats = registry.stats()
+        assert stats["misses"] == 1, f"Expected 1 miss, got {stats['misses']}"
+        assert stats["hits"] == 1, f"Expected 1 hit, got {stats['hits']}"
+        assert stats["artifacts"]["model.pkl"]["load_seconds"] >= 0.0
+    print("✅ Registry cache test passed")
+
+
+def test_registry_hot_reloads_only_on_content_change():
+    print("Testing registry hot reload...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "model.pkl"
+        _write_pickle(path, {"version": 1}, mtime_ns=1_000_000_000)
+        registry = utils.ArtifactRegistry(Path(tmp))
+        original = registry.get("model.pkl")
+        version = registry.version("model.pkl")
+
+        # Same bytes, new mtime: re-hashed but not reloaded.
+        _write_pickle(path, {"version": 1}, mtime_ns=2_000_000_000)
+        assert registry.get("model.pkl") is original, "Touching the file should not reload it"
+        assert registry.version("model.pkl") == version
+
+        _write_pickle(path, {"version": 2}, mtime_ns=3_000_000_000)
+        reloaded = registry.get("model.pkl")
+        assert reloaded == {"version": 2}, f"Expected reloaded artifact, got {reloaded}"
+        assert registry.version("model.pkl") != version, "Version should follow the file hash"
+        assert registry.stats()["artifacts"]["model.pkl"]["loads"] == 2
+    print("✅ Registry hot reload test passed")
+
+
+def test_registry_missing_and_corrupt_artifacts():
+    print("Testing registry error handling...")
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = utils.ArtifactRegistry(Path(tmp))
+        (Path(tmp) / "broken.pkl").write_bytes(b"not a pickle")
+
+        for filename, message in (("absent.pkl", "Missing"), ("broken.pkl", "Corrupted")):
+            try:
+                registry.get(filename)
+            except utils.ArtifactLoadError as exc:
+                assert message in str(exc), f"Unexpected error message: {exc}"
+            else:
+                raise AssertionError(f"{filename} should raise ArtifactLoadError")
+    print("✅ Registry error handling test passed")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("Running Artifact Registry Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_registry_caches_and_counts_hits()
+        test_registry_hot_reloads_only_on_content_change()
+        test_registry_missing_and_corrupt_artifacts()
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60 + "\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}\n")
+        sys.exit(1)
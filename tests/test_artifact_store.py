@@ -0,0 +1,143 @@
+"""Tests for the memory-mapped .npy artifact format."""
+
+import pickle
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import artifact_store
+import utils
+from inference import CompiledForest, CompiledLinearModel, CompiledScaler
+
+
+def _copy_heart_pickles(target):
+    for filename in ("heart_model.pkl", "heart_scaler.pkl"):
+        shutil.copy(utils.MODELS_DIR / filename, Path(target) / filename)
+
+
+def test_exported_heart_artifacts_match_pickles():
+    print("Testing heart artifact export round trip...")
+    with tempfile.TemporaryDirectory() as tmp:
+        _copy_heart_pickles(tmp)
+        manifests = artifact_store.export_models_dir(Path(tmp), ["heart_model.pkl", "heart_scaler.pkl"])
+        assert len(manifests) == 2, f"Expected two manifests, got {manifests}"
+
+        registry = utils.ArtifactRegistry(Path(tmp))
+        model = registry.get("heart_model.pkl")
+        scaler = registry.get("heart_scaler.pkl")
+        assert isinstance(model, CompiledLinearModel), f"Expected compiled model, got {type(model)}"
+        assert isinstance(scaler, CompiledScaler), f"Expected compiled scaler, got {type(scaler)}"
+        assert isinstance(scaler.mean_, np.memmap), "Scaler arrays should be memory-mapped"
+        assert registry.stats()["artifacts"]["heart_model.pkl"]["source"].endswith("manifest.json")
+
+        features, _ = utils.build_heart_features(
+            age=61, gender="Female", height_cm=158, weight_kg=82.0, systolic_bp=150, diastolic_bp=95,
+            cholesterol=250, glucose=110, smoke=False, alco=False, active=False,
+        )
+        expected = utils.predict_heart(utils.load_heart_model(), utils.load_heart_scaler(), features)
+        actual = utils.predict_heart(model, scaler, features)
+        assert actual[0] == expected[0], "Exported heart model should give the same label"
+        assert abs(actual[1] - expected[1]) < 1e-12, "Exported heart model should give the same probability"
+        assert np.array_equal(scaler.transform(features), utils.load_heart_scaler().transform(features))
+    print("✅ Heart artifact export test passed")
+
+
+def test_forest_export_round_trip():
+    print("Testing forest artifact export round trip...")
+    rng = np.random.default_rng(0)
+    features = rng.normal(size=(500, 6))
+    target = (features[:, 0] > features[:, 1]).astype(int)
+    forest = RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0).fit(features, target)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact_store.export_artifact(forest, Path(tmp) / "forest")
+        loaded = artifact_store.load_array_artifact(Path(tmp) / "forest", verify=True)
+
+    assert isinstance(loaded, CompiledForest), f"Expected CompiledForest, got {type(loaded)}"
+    assert np.allclose(loaded.predict_proba(features), forest.predict_proba(features), rtol=0, atol=1e-12)
+    print("✅ Forest artifact export test passed")
+
+
+def test_reexport_leaves_mapped_arrays_intact():
+    print("Testing re-export over a memory-mapped artifact...")
+    rng = np.random.default_rng(1)
+    features = rng.normal(size=(500, 6))
+    target = (features[:, 0] > features[:, 1]).astype(int)
+    large = RandomForestClassifier(n_estimators=20, max_depth=8, random_state=0).fit(features, target)
+    small = RandomForestClassifier(n_estimators=2, max_depth=2, random_state=0).fit(features, target)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp) / "forest"
+        artifact_store.export_artifact(large, directory)
+        mapped = artifact_store.load_array_artifact(directory)
+        before = mapped.predict_proba(features)
+
+        # The smaller arrays would truncate the mapped files if they were rewritten in place.
+        artifact_store.export_artifact(small, directory)
+        assert np.array_equal(mapped.predict_proba(features), before), "A mapped artifact should keep its arrays"
+        reloaded = artifact_store.load_array_artifact(directory, verify=True)
+        assert reloaded.n_estimators == 2, "A reload should see the new export"
+
+        manifest = artifact_store.load_manifest(directory)
+        referenced = {entry["file"] for entry in manifest["arrays"].values()}
+        on_disk = {path.name for path in directory.iterdir() if path.name != artifact_store.MANIFEST_NAME}
+        assert on_disk == referenced, f"Only the current arrays should remain: {on_disk - referenced}"
+    print("✅ Re-export test passed")
+
+
+def test_pickle_fallback_and_corrupt_manifest():
+    print("Testing pickle fallback and corrupt manifests...")
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(Path(tmp) / "scaler.pkl", "wb") as handle:
+            pickle.dump({"pickled": True}, handle)
+        registry = utils.ArtifactRegistry(Path(tmp))
+        assert registry.get("scaler.pkl") == {"pickled": True}, "Pickle should be used without a manifest"
+
+        (Path(tmp) / "scaler").mkdir()
+        (Path(tmp) / "scaler" / "manifest.json").write_text("{not json")
+        try:
+            registry.get("scaler.pkl")
+        except utils.ArtifactLoadError as exc:
+            assert "Corrupted" in str(exc), f"Unexpected error message: {exc}"
+        else:
+            raise AssertionError("A corrupt manifest should raise ArtifactLoadError")
+
+        for malformed in (
+            "[]",
+            '{"format": 1, "kind": "standard_scaler", "arrays": []}',
+            '{"format": 1, "kind": "standard_scaler", "arrays": {"mean": {"file": "mean.npy"}}}',
+            '{"format": 1, "kind": "standard_scaler", "arrays": {}, "attributes": []}',
+            '{"format": 1, "kind": "standard_scaler", "arrays": {"mean": {"file": 3, "dtype": "<f8", "shape": [1]}}}',
+        ):
+            (Path(tmp) / "scaler" / "manifest.json").write_text(malformed)
+            try:
+                registry.get("scaler.pkl")
+            except utils.ArtifactLoadError as exc:
+                assert "Corrupted" in str(exc), f"Unexpected error message: {exc}"
+            else:
+                raise AssertionError(f"A malformed manifest should raise ArtifactLoadError: {malformed}")
+    print("✅ Pickle fallback test passed")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("Running Artifact Store Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_exported_heart_artifacts_match_pickles()
+        test_forest_export_round_trip()
+        test_reexport_leaves_mapped_arrays_intact()
+        test_pickle_fallback_and_corrupt_manifest()
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60 + "\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}\n")
+        sys.exit(1)
@@ -0,0 +1,77 @@
+"""Tests for the vectorized batch prediction helpers."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import utils
+
+
+def _heart_batch(rows=500, seed=0):
+    rng = np.random.default_rng(seed)
+    scaler = utils.load_heart_scaler()
+    matrix = rng.normal(scaler.mean_, scaler.scale_, size=(rows, len(scaler.mean_)))
+    return pd.DataFrame(matrix, columns=scaler.feature_names_in_)
+
+
+def test_heart_batch_matches_sklearn():
+    print("Testing heart batch prediction parity...")
+    model = utils.load_heart_model()
+    scaler = utils.load_heart_scaler()
+    features = _heart_batch()
+
+    labels, probabilities = utils.predict_heart_batch(model, scaler, features)
+    scaled = scaler.transform(features)
+
+    assert labels.shape == (len(features),), f"Unexpected label shape {labels.shape}"
+    assert np.array_equal(labels, model.predict(scaled)), "Labels should match model.predict"
+    assert np.allclose(probabilities, model.predict_proba(scaled)[:, 1]), "Probabilities should match"
+
+    array_labels, array_probabilities = utils.predict_heart_batch(model, scaler, features.to_numpy())
+    assert np.array_equal(array_labels, labels), "NumPy input should give the same labels"
+    assert np.allclose(array_probabilities, probabilities), "NumPy input should give the same probabilities"
+    print("✅ Heart batch prediction test passed")
+
+
+def test_diabetes_batch_matches_sklearn_forest():
+    print("Testing diabetes batch prediction parity...")
+    rng = np.random.default_rng(1)
+    columns = utils.load_diabetes_scaler().feature_names_in_
+    train = pd.DataFrame(rng.normal(size=(400, len(columns))), columns=columns)
+    target = (train.iloc[:, 0] + train.iloc[:, 4] > 0).astype(int)
+    scaler = StandardScaler().fit(train)
+    model = RandomForestClassifier(n_estimators=20, max_depth=5, random_state=0)
+    model.fit(scaler.transform(train), target)
+
+    labels, probabilities = utils.predict_diabetes_batch(model, scaler, train)
+    scaled = scaler.transform(train)
+
+    assert np.array_equal(labels, model.predict(scaled)), "Labels should match model.predict"
+    assert np.allclose(probabilities, model.predict_proba(scaled)[:, 1]), "Probabilities should match"
+
+    single_label, single_probability = utils.predict_diabetes(model, scaler, train.iloc[[3]])
+    assert single_label == labels[3], "Single-row helper should wrap the batch helper"
+    assert single_probability == probabilities[3]
+    print("✅ Diabetes batch prediction test passed")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("Running Batch Prediction Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_heart_batch_matches_sklearn()
+        test_diabetes_batch_matches_sklearn_forest()
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60 + "\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}\n")
+        sys.exit(1)
@@ -0,0 +1,180 @@
+"""Tests for the micro-batching dispatcher."""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from batching import MicroBatcher
+
+
+class _RecordingModel:
+    """Scores rows by their first column and records every batch it is given."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict_batch(self, matrix):
+        self.batch_sizes.append(matrix.shape[0])
+        probabilities = matrix[:, 0] / 100.0
+        return (probabilities >= 0.5).astype(np.int64), probabilities
+
+
+def _concurrent_predictions(batcher, count):
+    results = [None] * count
+    start = threading.Barrier(count)
+
+    def call(position):
+        start.wait()
+        results[position] = batcher.predict([float(position), 1.0, 2.0])
+
+    threads = [threading.Thread(target=call, args=(position,)) for position in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_calls_are_coalesced():
+    print("Testing micro-batch coalescing...")
+    model = _RecordingModel()
+    batcher = MicroBatcher(model.predict_batch, max_batch_size=16, max_wait=0.05)
+    try:
+        results = _concurrent_predictions(batcher, 40)
+    finally:
+        batcher.close()
+    for position, (label, probability) in enumerate(results):
+        assert probability == position / 100.0, "Each caller should get its own row's result"
+        assert label == int(position >= 50), "Labels should follow the caller's row"
+    assert sum(model.batch_sizes) == 40, "Every row should be scored exactly once"
+    assert len(model.batch_sizes) < 40, "Concurrent rows should share model calls"
+    assert max(model.batch_sizes) <= 16, "Batches must respect max_batch_size"
+    stats = batcher.stats()
+    assert stats["rows"] == 40 and stats["batches"] == len(model.batch_sizes), "Stats should count batches"
+    print("✅ Micro-batch coalescing test passed")
+
+
+def test_errors_blocks_and_close():
+    print("Testing micro-batch errors, blocks and shutdown...")
+
+    def failing(matrix):
+        raise ValueError("model exploded")
+
+    batcher = MicroBatcher(failing, max_wait=0.0)
+    try:
+        batcher.predict([1.0, 2.0])
+        raise AssertionError("Model errors should reach the caller")
+    except ValueError as exc:
+        assert "exploded" in str(exc), "The original exception should propagate"
+    finally:
+        batcher.close()
+
+    model = _RecordingModel()
+    batcher = MicroBatcher(model.predict_batch, max_batch_size=4, max_wait=0.01)
+    block = batcher.submit(np.array([[10.0, 0.0], [90.0, 0.0], [30.0, 0.0]]))
+    single = batcher.submit([70.0, 0.0])
+    queued = [batcher.submit([float(value), 0.0]) for value in range(5)]
+    batcher.close()
+    labels, probabilities = block.result(timeout=1)
+    assert list(labels) == [0, 1, 0], "Blocks should get back one result per row"
+    assert single.result(timeout=1)[1][0] == 0.7, "Rows after a block should be sliced correctly"
+    assert all(future.done() for future in queued), "close() should finish queued work"
+    assert max(model.batch_sizes) <= 4, "A block that would overflow should wait for the next batch"
+    try:
+        batcher.submit([1.0, 0.0])
+        raise AssertionError("A closed batcher should reject new rows")
+    except RuntimeError:
+        pass
+    print("✅ Micro-batch errors, blocks and shutdown test passed")
+
+
+def test_predict_async_gathers_into_one_batch():
+    print("Testing async micro-batch predictions...")
+    model = _RecordingModel()
+    batcher = MicroBatcher(model.predict_batch, max_batch_size=64, max_wait=0.05)
+
+    async def gather():
+        return await asyncio.gather(*(batcher.predict_async([float(value), 0.0]) for value in range(10)))
+
+    try:
+        results = asyncio.run(gather())
+    finally:
+        batcher.close()
+    assert [probability for _, probability in results] == [value / 100.0 for value in range(10)], \
+        "Async callers should get their own results"
+    assert len(model.batch_sizes) < 10, "Awaiting callers should share model calls"
+    print("✅ Async micro-batch test passed")
+
+
+def test_get_batcher_follows_model_identity():
+    print("Testing shared batcher lookup...")
+    from utils import get_batcher
+
+    class _Constant:
+        def __init__(self, probability):
+            self.probability = probability
+
+        def predict_proba(self, matrix):
+            return np.column_stack([1 - np.full(len(matrix), self.probability), np.full(len(matrix), self.probability)])
+
+    first_model = _Constant(0.2)
+    first = get_batcher("test-disease", first_model)
+    assert get_batcher("test-disease", first_model) is first, "The same model should reuse its batcher"
+    assert first.predict([1.0, 2.0]) == (0, 0.2), "The batcher should score with the given model"
+    errors = []
+
+    def hammer():
+        try:
+            for _ in range(200):
+                first.predict([1.0, 2.0])
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=hammer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    second = get_batcher("test-disease", _Constant(0.9))
+    for thread in threads:
+        thread.join()
+    assert not errors, "Threads using a batcher that is being replaced should not fail"
+    before = first.stats()["rows"]
+    threads = [threading.Thread(target=lambda: [first.predict([1.0, 2.0]) for _ in range(500)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert first.stats()["rows"] - before == 2000, "Rows scored on caller threads should all be counted"
+    assert second is not first, "A reloaded model should get a new batcher"
+    assert second.predict([1.0, 2.0]) == (1, 0.9), "The new batcher should use the new model"
+    assert first.predict([1.0, 2.0]) == (0, 0.2), "Callers still holding the replaced batcher should get results"
+    first.close()
+    try:
+        first.submit([1.0, 2.0])
+        raise AssertionError("A closed batcher should reject new rows")
+    except RuntimeError:
+        pass
+    second.close()
+    print("✅ Shared batcher lookup test passed")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("Running Micro-Batching Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_concurrent_calls_are_coalesced()
+        test_errors_blocks_and_close()
+        test_predict_async_gathers_into_one_batch()
+        test_get_batcher_follows_model_identity()
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60 + "\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}\n")
+        sys.exit(1)
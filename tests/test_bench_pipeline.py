@@ -0,0 +1,70 @@
+"""Tests for the request-path benchmark suite."""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from bench_pipeline import bench_disease, compare, main, repeats_for
+
+
+def test_heart_stages_report_percentiles():
+    print("Testing heart benchmark stages...")
+    results = list(bench_disease("heart", [1, 10], repeats=3, pdf=False))
+    stages = {(result["stage"], result["batch_size"]) for result in results}
+    for stage in ("features", "scaler_transform", "predict", "predict_proba", "compiled_predict_proba"):
+        assert (stage, 1) in stages and (stage, 10) in stages, f"{stage} should run at every batch size"
+    assert ("artifact_load", 1) in stages and ("form_features", 1) in stages, "Single-shot stages should run"
+    for result in results:
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"], "Percentiles should be ordered"
+        assert result["rows_per_s"] > 0, "Throughput should be reported"
+    print("✅ Heart benchmark stage test passed")
+
+
+def test_compare_flags_only_slower_stages():
+    print("Testing benchmark baseline comparison...")
+    baseline = {
+        "heart/predict/1": {"p50_ms": 1.0},
+        "heart/features/1": {"p50_ms": 1.0},
+    }
+    results = [
+        {"disease": "heart", "stage": "predict", "batch_size": 1, "p50_ms": 1.2},
+        {"disease": "heart", "stage": "features", "batch_size": 1, "p50_ms": 1.5},
+        {"disease": "heart", "stage": "pdf_report", "batch_size": 1, "p50_ms": 9.0},
+        {"disease": "diabetes", "skipped": "Missing artifact"},
+    ]
+    regressions = compare(results, baseline, tolerance=0.25)
+    assert len(regressions) == 1 and regressions[0].startswith("heart/features/1"), "Only the 50% slowdown should fail"
+    assert repeats_for(100_000, 50) == 3 and repeats_for(1, 50) == 50, "Large batches should use fewer repeats"
+    print("✅ Benchmark comparison test passed")
+
+
+def test_missing_baseline_is_not_silent():
+    print("Testing benchmark runs without a baseline...")
+    quick = ["--diseases", "heart", "--batch-sizes", "1", "--repeats", "2", "--no-pdf"]
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = Path(tmp) / "baseline.json"
+        assert main(quick + ["--baseline", str(baseline)]) == 2, "A requested baseline that is missing should fail"
+        baseline.write_text(json.dumps({"heart/compiled_predict_proba/1": {"p50_ms": 1e-9}}))
+        assert main(quick + ["--baseline", str(baseline)]) == 1, "An existing baseline should be compared"
+    print("✅ Missing baseline test passed")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("Running Benchmark Suite Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_heart_stages_report_percentiles()
+        test_compare_flags_only_slower_stages()
+        test_missing_baseline_is_not_silent()
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60 + "\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}\n")
+        sys.exit(1)
@@ -0,0 +1,72 @@
+"""Tests for bulk PDF report export into streamed ZIP archives."""
+
+import io
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bulk_reports import UniqueNames, export_reports, iter_zip, report_inputs
+
+HEART_CSV = Path(__file__).resolve().parent.parent / "data" / "heart.csv"
+
+
+def test_unique_names_and_zip_stream():
+    print("Testing report names and ZIP streaming...")
+    unique = UniqueNames()
+    names = [unique(name) for name in ["A_Report_Jo.pdf", "A_Report_Jo.pdf", "A_Report_Jo_2.pdf", "A_Report_Jo.pdf"]]
+    assert names == ["A_Report_Jo.pdf", "A_Report_Jo_2.pdf", "A_Report_Jo_2_2.pdf", "A_Report_Jo_3.pdf"], names
+
+    entries = [(f"report_{i}.pdf", b"%PDF-" + bytes([i]) * 1000) for i in range(5)]
+    chunks = list(iter_zip(iter(entries)))
+    assert len(chunks) == len(entries) + 1, "Each entry and the central directory should be yielded separately"
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.testzip() is None, "The streamed archive should pass CRC checks"
+        assert [(name, archive.read(name)) for name in archive.namelist()] == entries, "Entries should round-trip"
+    print("✅ Report names and ZIP streaming test passed")
+
+
+def test_export_reports_from_raw_heart_rows():
+    print("Testing bulk heart report export...")
+    records = pd.read_csv(HEART_CSV, sep=";", nrows=25)
+    records["name"] = ["Jo Doe" if position % 10 == 0 else f"Patient {position}" for position in range(len(records))]
+    inputs = report_inputs("heart", records.iloc[:1])[0]
+    assert inputs["Age"] == round(records["age"].iloc[0] / 365.25, 1), "Age should be converted from days"
+    assert inputs["Cholesterol"] in {"Normal", "Above Normal", "Well Above Normal"}, "Categories should be labelled"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "patients.csv"
+        records.to_csv(source, sep=";", index=False)
+        output = io.BytesIO()
+        count = export_reports(
+            "heart", str(source), output, name_column="name", chunksize=10, workers=2, batch_size=4
+        )
+    assert count == len(records), "One report per row should be written"
+    with zipfile.ZipFile(io.BytesIO(output.getvalue())) as archive:
+        names = archive.namelist()
+        assert names[:2] == ["Heart_Disease_Report_Jo_Doe.pdf", "Heart_Disease_Report_Patient_1.pdf"], names[:2]
+        assert "Heart_Disease_Report_Jo_Doe_2.pdf" in names and "Heart_Disease_Report_Jo_Doe_3.pdf" in names, \
+            "Repeated names should be suffixed"
+        assert len(set(names)) == len(names), "Entry names should be unique"
+        assert all(archive.read(name).startswith(b"%PDF-") for name in names), "Every entry should be a PDF"
+    print("✅ Bulk heart report export test passed")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("Running Bulk Report Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_unique_names_and_zip_stream()
+        test_export_reports_from_raw_heart_rows()
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60 + "\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}\n")
+        sys.exit(1)
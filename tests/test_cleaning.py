@@ -0,0 +1,71 @@
+"""Tests for the streaming heart cleaning pipeline."""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cleaning import clean_heart_chunks, clean_heart_csv
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def notebook_clean(df):
+    """The in-memory logic of preparation/clean_heart.ipynb."""
+    df = df.rename(columns={"ap_hi": "systolic_bp", "ap_lo": "diastolic_bp", "cardio": "target"})
+    df = df.drop_duplicates()
+    df = df[(df["systolic_bp"] > 0) & (df["diastolic_bp"] > 0) & (df["systolic_bp"] < 250) & (df["diastolic_bp"] < 200)]
+    df = df[(df["height"] > 120) & (df["height"] < 220) & (df["weight"] > 30) & (df["weight"] < 200)]
+    df = df.assign(bmi=df["weight"] / ((df["height"] / 100) ** 2))
+    df = df.assign(age=(df["age"] / 365.25).round(1))
+    return df[(df["age"] >= 0) & (df["age"] <= 90)]
+
+
+def test_chunked_pipeline_matches_notebook_with_cross_chunk_duplicates():
+    print("Testing chunked cleaning against the notebook logic...")
+    raw = pd.read_csv(DATA_DIR / "heart.csv", sep=";", nrows=500)
+    rng = np.random.default_rng(0)
+    duplicates = raw.iloc[rng.integers(0, len(raw), 120)]
+    raw = pd.concat([raw, duplicates], ignore_index=True)
+    raw.loc[::37, "ap_hi"] = -100
+    raw.loc[::41, "height"] = 250
+
+    expected = notebook_clean(raw).reset_index(drop=True)
+    chunks = (raw.iloc[start:start + 64] for start in range(0, len(raw), 64))
+    cleaned = pd.concat(list(clean_heart_chunks(chunks)), ignore_index=True)
+
+    assert len(expected) < len(raw) - 120, "Fixture should exercise duplicates and filters"
+    pd.testing.assert_frame_equal(cleaned, expected)
+    print("✅ Chunked cleaning parity test passed")
+
+
+def test_clean_heart_csv_reproduces_committed_dataset():
+    print("Testing streamed cleaning against data/cleaned_heart.csv...")
+    with tempfile.TemporaryDirectory() as tmp:
+        destination = Path(tmp) / "cleaned_heart.csv"
+        rows = clean_heart_csv(str(DATA_DIR / "heart.csv"), str(destination), chunksize=10_000)
+        produced = destination.read_bytes()
+    reference = (DATA_DIR / "cleaned_heart.csv").read_bytes()
+    assert produced == reference, "Streamed output should be byte-identical to the committed dataset"
+    assert rows == reference.count(b"\n") - 1, "Returned row count should match rows written"
+    print("✅ Cleaned dataset reproduction test passed")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("Running Cleaning Pipeline Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_chunked_pipeline_matches_notebook_with_cross_chunk_duplicates()
+        test_clean_heart_csv_reproduces_committed_dataset()
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60 + "\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}\n")
+        sys.exit(1)
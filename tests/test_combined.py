@@ -0,0 +1,116 @@
+"""Tests for the combined diabetes and heart assessment."""
+
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import utils
+from combined import PATIENT_FIELDS, assess, combined_report, encode_patient, validate_patient
+from inference import CompiledForest
+
+PATIENT = {
+    "age": 55, "gender": "Female", "height_cm": 165, "weight_kg": 70.0, "systolic_bp": 130, "diastolic_bp": 85,
+    "cholesterol": 250, "glucose": 140, "hba1c": 6.4, "smoking_history": "current",
+    "hypertension": "Yes", "heart_disease": "No", "alco": False, "active": True,
+}
+
+
+def _diabetes_forest():
+    rng = np.random.default_rng(0)
+    columns = utils.DIABETES_FEATURE_COLUMNS
+    train = pd.DataFrame(rng.normal(size=(2000, len(columns))) * 10 + 40, columns=columns)
+    target = (train["HbA1c_level"] + rng.normal(scale=5, size=2000) > train["bmi"]).astype(int)
+    scaler = StandardScaler().fit(train)
+    forest = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0).fit(scaler.transform(train), target)
+    return CompiledForest.from_sklearn(forest).with_scaler(scaler)
+
+
+def test_encode_patient_matches_the_separate_forms():
+    print("Testing the shared encoding pass...")
+    diabetes_model = _diabetes_forest()
+    patient = validate_patient(PATIENT)
+    diabetes_row, heart_row, bmi = encode_patient(patient, diabetes_model)
+
+    expected_heart, expected_bmi = utils.build_heart_feature_matrix(
+        age=55, gender="Female", height_cm=165, weight_kg=70.0, systolic_bp=130, diastolic_bp=85,
+        cholesterol=250, glucose=140, smoke=True, alco=False, active=True,
+    )
+    expected_diabetes = utils.get_diabetes_encoder(diabetes_model).encode(
+        age=55, hypertension_opt="Yes", heart_disease_opt="No", bmi=float(expected_bmi[0]), hba1c=6.4,
+        glucose=140, gender_opt="Female", smoking_opt="current",
+    )
+    assert np.array_equal(heart_row, expected_heart), "The heart row should match the cardiac form"
+    assert np.array_equal(diabetes_row, expected_diabetes), "The diabetes row should use the shared BMI"
+    assert abs(bmi - 70.0 / 1.65 ** 2) < 1e-9, "BMI should come from height and weight"
+
+    for field in ("hba1c", "smoking_history"):
+        incomplete = {key: value for key, value in PATIENT.items() if key != field}
+        try:
+            validate_patient(incomplete)
+        except ValueError as exc:
+            assert field in str(exc), "The error should name the missing field"
+        else:
+            raise AssertionError(f"A record without {field} should be rejected")
+    for field, value in (
+        ("age", float("nan")), ("age", 150), ("weight_kg", float("inf")), ("height_cm", 0), ("systolic_bp", -120),
+        ("hba1c", -1.0), ("gender", "male"), ("gender", "Other"), ("smoking_history", "sometimes"),
+    ):
+        try:
+            validate_patient(dict(PATIENT, **{field: value}))
+        except ValueError as exc:
+            assert str(exc).startswith(field), f"The error should name {field}: {exc}"
+        else:
+            raise AssertionError(f"{field}={value!r} should be rejected as the service rejects it")
+    assert len(PATIENT_FIELDS) == len(PATIENT), "The fixture should cover every patient field"
+    print("✅ Shared encoding test passed")
+
+
+def test_assess_scores_both_models_and_renders_one_pdf():
+    print("Testing combined assessment and report...")
+    diabetes_model = _diabetes_forest()
+    heart_model = utils.load_compiled_heart_model()
+    versions = {"diabetes": "combined-test", "heart": "combined-test"}
+    result = assess(PATIENT, diabetes_model, heart_model, versions=versions)
+
+    diabetes_row, heart_row, _ = encode_patient(validate_patient(PATIENT), diabetes_model)
+    expected_diabetes = utils.predict_diabetes(diabetes_model, None, diabetes_row)
+    expected_heart = utils.predict_heart(heart_model, None, heart_row)
+    assert (result["diabetes"]["prediction"], result["diabetes"]["probability"]) == expected_diabetes, \
+        "The diabetes result should match scoring it alone"
+    assert (result["heart"]["prediction"], result["heart"]["probability"]) == expected_heart, \
+        "The heart result should match scoring it alone"
+    assert result["heart"]["label"] in ("High Risk", "Low Risk"), "Labels should be filled in"
+    assert assess(PATIENT, diabetes_model, heart_model, versions=versions) == result, "Repeats should agree"
+
+    pdf_bytes = combined_report("Jane Doe", PATIENT, result)
+    assert pdf_bytes.startswith(b"%PDF-"), "The combined report should be a PDF"
+    assert b"/Count 2" in pdf_bytes, "Both conditions should be in one document"
+    assert b"(Condition: Diabetes)" in pdf_bytes and b"(Condition: Heart Disease)" in pdf_bytes, \
+        "Each condition should get its page"
+    generated = set(re.findall(rb"\(Generated: [^)]*\)", pdf_bytes))
+    assert len(generated) == 1, "Both pages should share one timestamp"
+    assert combined_report("Jane Doe", PATIENT, result) is pdf_bytes, "The combined report should be memoized"
+    print("✅ Combined assessment test passed")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("Running Combined Assessment Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_encode_patient_matches_the_separate_forms()
+        test_assess_scores_both_models_and_renders_one_pdf()
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60 + "\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}\n")
+        sys.exit(1)
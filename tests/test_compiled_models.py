@@ -0,0 +1,115 @@
+"""Parity tests for the compiled NumPy inference engines."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import utils
+from inference import CompiledForest, CompiledLinearModel
+
+
+def _heart_inputs(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return dict(
+        age=rng.integers(1, 121, rows),
+        gender=rng.choice(["Male", "Female"], rows),
+        height_cm=rng.integers(120, 221, rows),
+        weight_kg=rng.uniform(30, 200, rows),
+        systolic_bp=rng.integers(80, 201, rows),
+        diastolic_bp=rng.integers(50, 121, rows),
+        cholesterol=rng.integers(100, 401, rows),
+        glucose=rng.integers(50, 301, rows),
+        smoke=rng.integers(0, 2, rows),
+        alco=rng.integers(0, 2, rows),
+        active=rng.integers(0, 2, rows),
+    )
+
+
+def test_compiled_heart_model_matches_predict_heart():
+    print("Testing compiled heart model parity...")
+    model = utils.load_heart_model()
+    scaler = utils.load_heart_scaler()
+    compiled = utils.load_compiled_heart_model()
+    matrix, _ = utils.build_heart_feature_matrix(**_heart_inputs(2000))
+
+    labels, probabilities = utils.predict_heart_batch(model, scaler, matrix)
+    compiled_labels, compiled_probabilities = utils.predict_heart_batch(compiled, None, matrix)
+
+    assert np.array_equal(compiled_labels, labels), "Compiled labels should match sklearn"
+    assert np.allclose(compiled_probabilities, probabilities, rtol=0, atol=1e-12), "Probabilities drifted"
+    assert np.array_equal(compiled.predict(matrix), labels), "predict() should agree with the threshold"
+
+    for row in range(5):
+        single = {name: values[row] for name, values in _heart_inputs(5, seed=3).items()}
+        features, _ = utils.build_heart_features(**single)
+        expected = utils.predict_heart(model, scaler, features)
+        actual = utils.predict_heart(compiled, None, features.to_numpy())
+        assert actual[0] == expected[0], "Single-row label should match predict_heart"
+        assert abs(actual[1] - expected[1]) < 1e-12, "Single-row probability should match predict_heart"
+    print("✅ Compiled heart model parity test passed")
+
+
+def test_compiled_linear_model_is_cached_per_artifact_version():
+    print("Testing compiled model caching...")
+    first = utils.load_compiled_heart_model()
+    second = utils.load_compiled_heart_model()
+    assert first is second, "Compiled model should be built once per artifact version"
+    assert isinstance(first, CompiledLinearModel)
+    extreme = np.full((1, first.n_features_in_), 1e6)
+    assert np.all(np.isfinite(first.predict_proba(extreme))), "Sigmoid should stay finite"
+    print("✅ Compiled model caching test passed")
+
+
+def _fitted_forest(rows=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = utils.DIABETES_FEATURE_COLUMNS
+    train = pd.DataFrame(rng.normal(size=(rows, len(columns))) * 10 + 40, columns=columns)
+    target = (train["age"] + rng.normal(scale=5, size=rows) > train["bmi"]).astype(int)
+    scaler = StandardScaler().fit(train)
+    forest = RandomForestClassifier(n_estimators=40, max_depth=8, random_state=seed)
+    forest.fit(scaler.transform(train), target)
+    return forest, scaler, train
+
+
+def test_compiled_forest_matches_sklearn():
+    print("Testing compiled forest parity...")
+    forest, scaler, train = _fitted_forest()
+    scaled = scaler.transform(train)
+    expected = forest.predict_proba(scaled)
+
+    compiled = CompiledForest.from_sklearn(forest)
+    assert compiled.n_estimators == 40
+    assert np.allclose(compiled.predict_proba(scaled), expected, rtol=0, atol=1e-12), "Probabilities drifted"
+    assert np.array_equal(compiled.predict(scaled), forest.predict(scaled)), "Labels should match sklearn"
+    assert np.array_equal(compiled.apply(scaled) - compiled.roots, forest.apply(scaled)), "Leaves should match"
+
+    folded = CompiledForest.from_sklearn(forest, scaler)
+    folded_proba = folded.predict_proba(train.to_numpy())
+    assert np.abs(folded_proba - expected).max() < 1e-12, "Folded thresholds should match sklearn"
+
+    labels, probabilities = utils.predict_diabetes_batch(folded, None, train.to_numpy())
+    assert np.allclose(probabilities, expected[:, 1], rtol=0, atol=1e-12), "predict_diabetes_batch should accept scaler=None"
+    print("✅ Compiled forest parity test passed")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("Running Compiled Model Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_compiled_heart_model_matches_predict_heart()
+        test_compiled_linear_model_is_cached_per_artifact_version()
+        test_compiled_forest_matches_sklearn()
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60 + "\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}\n")
+        sys.exit(1)
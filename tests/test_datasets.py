@@ -0,0 +1,93 @@
+"""Tests for the columnar dataset cache."""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import datasets
+
+
+def test_cache_round_trip_with_compact_dtypes():
+    print("Testing dataset cache round trip...")
+    with tempfile.TemporaryDirectory() as tmp:
+        raw = pd.read_csv(datasets.DATA_DIR / "diabetes.csv")
+        cached = datasets.load_dataset("diabetes", cache_dir=Path(tmp))
+
+        assert cached["hypertension"].dtype == np.int8, "0/1 flags should be int8"
+        assert cached["bmi"].dtype == np.float32, "Vitals should be float32"
+        assert isinstance(cached["smoking_history"].dtype, pd.CategoricalDtype), "Text should be categorical"
+        assert list(cached.columns) == list(raw.columns), "Column order should be preserved"
+        assert (cached["gender"].astype(str) == raw["gender"].astype(str)).all(), "Categories should round-trip"
+        np.testing.assert_array_equal(cached["bmi"].to_numpy(), raw["bmi"].to_numpy(np.float32))
+        np.testing.assert_array_equal(cached["blood_glucose_level"].to_numpy(), raw["blood_glucose_level"].to_numpy())
+
+        subset = datasets.load_dataset("diabetes", ["diabetes", "age"], cache_dir=Path(tmp))
+        assert list(subset.columns) == ["diabetes", "age"], "Column selection should follow the request"
+        try:
+            datasets.load_dataset("diabetes", ["missing"], cache_dir=Path(tmp))
+            assert False, "Unknown columns should raise KeyError"
+        except KeyError:
+            pass
+    print("✅ Dataset cache round trip test passed")
+
+
+def test_cache_invalidated_by_source_hash():
+    print("Testing dataset cache invalidation...")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        source = tmp / "vitals.csv"
+        source.write_text("id;weight\n1;70.5\n2;80.0\n")
+        first = datasets.load_dataset(source, sep=";", cache_dir=tmp / "cache")
+        assert first["weight"].tolist() == [70.5, 80.0], "Initial load should parse the source"
+
+        manifest_path = datasets.build_cache(source, sep=";", cache_dir=tmp / "cache") / datasets.MANIFEST_NAME
+        built_at = manifest_path.read_text()
+        stat = source.stat()
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        datasets.load_dataset(source, sep=";", cache_dir=tmp / "cache")
+        assert '"sha256"' in manifest_path.read_text(), "Touching the file should keep the cache"
+        assert manifest_path.read_text() != built_at, "A touched file should only refresh the fingerprint"
+
+        directory = manifest_path.parent
+        mapped = np.load(directory / datasets._read_manifest(directory)["columns"][1]["file"], mmap_mode="r")
+        source.write_text("id;weight\n1;70.5\n2;81.0\n")
+        updated = datasets.load_dataset(source, sep=";", cache_dir=tmp / "cache")
+        assert updated["weight"].tolist() == [70.5, 81.0], "Changed content should rebuild the cache"
+        assert mapped.tolist() == [70.5, 80.0], "A rebuild should not write into mapped column files"
+        referenced = {entry["file"] for entry in datasets._read_manifest(directory)["columns"]}
+        assert {path.name for path in directory.glob("*.npy")} == referenced, "Old column files should be removed"
+
+        comma = datasets.load_dataset(source, sep=",", cache_dir=tmp / "cache")
+        assert list(comma.columns) == ["id;weight"], "A different separator should rebuild the cache"
+        assert datasets.load_dataset(source, sep=";", cache_dir=tmp / "cache")["weight"].tolist() == [70.5, 81.0], \
+            "Switching back should parse with the requested separator"
+
+        (tmp / "other").mkdir()
+        other = tmp / "other" / "vitals.csv"
+        other.write_text("id;weight\n1;99.0\n")
+        assert datasets.load_dataset(other, sep=";", cache_dir=tmp / "cache")["weight"].tolist() == [99.0], \
+            "Same-named files in other directories should get their own cache"
+        assert datasets.build_cache(other, sep=";", cache_dir=tmp / "cache") != directory, "Caches are keyed by path"
+    print("✅ Dataset cache invalidation test passed")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("Running Dataset Cache Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_cache_round_trip_with_compact_dtypes()
+        test_cache_invalidated_by_source_hash()
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60 + "\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}\n")
+        sys.exit(1)
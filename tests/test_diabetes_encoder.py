@@ -0,0 +1,90 @@
+"""Tests for the precompiled diabetes feature encoder."""
+
+import itertools
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import utils
+
+GENDERS = ["Female", "Male", "Other"]
+SMOKING = ["never", "former", "ever", "current", "not current", "No Info"]
+
+
+def test_encoder_matches_dataframe_builder_bit_for_bit():
+    print("Testing diabetes encoder parity...")
+    encoder = utils.DiabetesEncoder.from_scaler(utils.load_diabetes_scaler())
+    row = np.empty((1, encoder.n_features))
+
+    for gender, smoking, hypertension, heart_disease in itertools.product(
+        GENDERS, SMOKING, ["No", "Yes"], ["No", "Yes"]
+    ):
+        inputs = dict(
+            age=37, hypertension_opt=hypertension, heart_disease_opt=heart_disease, bmi=27.31,
+            hba1c=6.1, glucose=142, gender_opt=gender, smoking_opt=smoking,
+        )
+        expected = utils.build_diabetes_features(**inputs).to_numpy(dtype=np.float64)
+        encoded = encoder.encode(**inputs)
+        reused = encoder.encode(**inputs, out=row)
+
+        assert encoded.dtype == np.float64, f"Expected float64, got {encoded.dtype}"
+        assert np.array_equal(encoded, expected), f"Encoder differs for {gender}/{smoking}"
+        assert reused is row and np.array_equal(reused, expected), "Preallocated row should be filled in place"
+    print("✅ Diabetes encoder parity test passed")
+
+
+def test_encoder_batch_and_scaling_match_sklearn():
+    print("Testing diabetes batch encoding and scaling...")
+    scaler = utils.load_diabetes_scaler()
+    encoder = utils.get_diabetes_encoder(scaler)
+    combos = list(itertools.product(GENDERS, SMOKING, [0, 1], [0, 1]))
+    rng = np.random.default_rng(0)
+    ages = rng.uniform(1, 80, len(combos))
+
+    matrix = encoder.encode_batch(
+        age=ages,
+        hypertension=[combo[2] for combo in combos],
+        heart_disease=[combo[3] for combo in combos],
+        bmi=np.full(len(combos), 24.5),
+        hba1c=np.full(len(combos), 5.8),
+        glucose=np.full(len(combos), 120),
+        gender=[combo[0] for combo in combos],
+        smoking_history=[combo[1] for combo in combos],
+    )
+    expected = np.vstack([
+        utils.build_diabetes_features(
+            age=age, hypertension_opt="Yes" if hypertension else "No",
+            heart_disease_opt="Yes" if heart_disease else "No", bmi=24.5, hba1c=5.8, glucose=120,
+            gender_opt=gender, smoking_opt=smoking,
+        ).to_numpy(dtype=np.float64)
+        for age, (gender, smoking, hypertension, heart_disease) in zip(ages, combos)
+    ])
+
+    assert np.array_equal(matrix, expected), "Batch encoding should match the row builder"
+    frame = utils.build_diabetes_features(
+        age=50, hypertension_opt="Yes", heart_disease_opt="No", bmi=31.0, hba1c=7.0, glucose=180,
+        gender_opt="Male", smoking_opt="former",
+    )
+    assert np.array_equal(
+        utils._scale_features(scaler, frame.to_numpy(dtype=np.float64)), scaler.transform(frame)
+    ), "NumPy standardization should match scaler.transform exactly"
+    print("✅ Diabetes batch encoding test passed")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("Running Diabetes Encoder Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_encoder_matches_dataframe_builder_bit_for_bit()
+        test_encoder_batch_and_scaling_match_sklearn()
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60 + "\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}\n")
+        sys.exit(1)
@@ -0,0 +1,140 @@
+"""Tests for per-feature prediction explanations."""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import utils
+from explain import Explanation, explain_diabetes, explain_forest, explain_heart, explain_linear
+from inference import CompiledForest
+
+
+def _diabetes_training(rows=2000):
+    rng = np.random.default_rng(0)
+    columns = utils.DIABETES_FEATURE_COLUMNS
+    train = pd.DataFrame(rng.normal(size=(rows, len(columns))) * 10 + 40, columns=columns)
+    target = (train["HbA1c_level"] + rng.normal(scale=5, size=rows) > train["bmi"]).astype(int)
+    scaler = StandardScaler().fit(train)
+    forest = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0).fit(scaler.transform(train), target)
+    return train, scaler, forest
+
+
+def _saabas_reference(forest, scaled_row):
+    """Per-tree Python loop over sklearn's decision paths."""
+    contributions = np.zeros(scaled_row.shape[0])
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        counts = tree.value[:, 0, :]
+        positive = counts[:, 1] / counts.sum(axis=1)
+        path = estimator.decision_path(scaled_row.reshape(1, -1).astype(np.float32)).indices
+        for parent, child in zip(path[:-1], path[1:]):
+            contributions[tree.feature[parent]] += positive[child] - positive[parent]
+    return contributions / len(forest.estimators_)
+
+
+def test_linear_contributions_are_exact():
+    print("Testing logistic regression contributions...")
+    rng = np.random.default_rng(1)
+    features = rng.normal(size=(500, 4)) * [1, 10, 100, 0.1] + [0, 50, 200, 1]
+    target = (features[:, 0] + features[:, 1] / 10 + rng.normal(size=500) > 5).astype(int)
+    scaler = StandardScaler().fit(features)
+    model = LogisticRegression().fit(scaler.transform(features), target)
+
+    explanation = explain_linear(model, scaler, features)
+    assert explanation.contributions.shape == (500, 4), "One contribution per row and feature"
+    assert np.allclose(explanation.contributions, model.coef_[0] * scaler.transform(features)), \
+        "Contributions are coefficient times scaled value"
+    assert np.allclose(explanation.totals(), model.decision_function(scaler.transform(features))), \
+        "Bias plus contributions should be the logit"
+
+    matrix, _ = utils.build_heart_feature_matrix(
+        age=[45, 70], gender=["Male", "Female"], height_cm=[170, 160], weight_kg=[70.0, 95.0],
+        systolic_bp=[120, 165], diastolic_bp=[80, 100], cholesterol=[180, 260], glucose=[90, 140],
+        smoke=[False, True], alco=[False, False], active=[True, False],
+    )
+    heart = explain_heart(utils.load_heart_model(), utils.load_heart_scaler(), matrix)
+    assert np.allclose(heart.totals(), utils.load_compiled_heart_model().decision_function(matrix)), \
+        "The heart explanation should add up to the compiled model's logit"
+    assert heart.top(1, 1)[0][0] == "Systolic BP", "A systolic BP of 165 should dominate"
+    assert heart.factors(1, 1)[0][1].endswith("log-odds (raises risk)"), "Factors should be formatted"
+
+    labels = [label for label, _ in heart.top(0, 20)]
+    assert "id" not in labels, "The row id is not a clinical factor"
+    assert "Cholesterol: normal" in labels and "Gender: Male" in labels, "Groups take the patient's category"
+    assert not any(label.startswith("Cholesterol: ") and label != "Cholesterol: normal" for label in labels), \
+        "Only the patient's own cholesterol category should be listed"
+    assert "Smoker: yes" in [label for label, _ in heart.top(1, 20)], "Flags should show the patient's value"
+    names = heart.feature_names
+    group = [names.index("cholesterol_2"), names.index("cholesterol_3")]
+    assert dict(heart.top(1, 20))["Cholesterol: well above normal"] == heart.contributions[1, group].sum(), \
+        "A group's contribution is the sum of its dummies"
+    print("✅ Linear contribution test passed")
+
+
+def test_forest_contributions_match_decision_paths():
+    print("Testing random forest path contributions...")
+    train, scaler, forest = _diabetes_training()
+    rows = train.to_numpy()[:300]
+    folded = CompiledForest.from_sklearn(forest).with_scaler(scaler)
+
+    explanation = explain_diabetes(folded, None, rows)
+    probabilities = forest.predict_proba(scaler.transform(train.iloc[:300]))[:, 1]
+    assert np.allclose(explanation.totals(), probabilities), "Bias plus contributions should be the probability"
+    for row in (0, 7, 123):
+        reference = _saabas_reference(forest, scaler.transform(train.iloc[[row]])[0])
+        assert np.allclose(explanation.contributions[row], reference), "Credits should match the decision path"
+
+    unfolded = explain_forest(forest, scaler, train.iloc[:300])
+    assert np.allclose(unfolded.contributions, explanation.contributions), \
+        "A sklearn forest with its scaler should give the same contributions"
+    assert unfolded.feature_names == list(utils.DIABETES_FEATURE_COLUMNS), "Names should come from the scaler"
+    assert explanation.factors(0)[0][1].endswith("pts (raises risk)") or \
+        explanation.factors(0)[0][1].endswith("pts (lowers risk)"), "Forest factors are in percentage points"
+
+    columns = utils.DIABETES_FEATURE_COLUMNS
+    values = np.zeros((1, len(columns)))
+    values[0, columns.index("smoking_history_former")] = 1
+    contributions = np.full((1, len(columns)), 0.01)
+    grouped = Explanation(columns, 0.1, contributions, "probability", values)
+    top = dict(grouped.top(0, 20))
+    assert np.isclose(top["Smoking: former"], 0.05), "Smoking history should be one factor summing five dummies"
+    assert np.isclose(top["Gender: Female"], 0.02), "Gender should be labelled with the patient's category"
+    assert "Hypertension: no" in top and len(top) == 8, "Thirteen columns should make eight factors"
+    print("✅ Forest contribution test passed")
+
+
+def test_explaining_ten_thousand_rows_takes_seconds():
+    print("Testing batch explanation speed...")
+    train, scaler, forest = _diabetes_training(10000)
+    folded = CompiledForest.from_sklearn(forest).with_scaler(scaler)
+    start = time.perf_counter()
+    explanation = explain_diabetes(folded, None, train.to_numpy())
+    elapsed = time.perf_counter() - start
+    assert len(explanation) == 10000, "Every row should be explained"
+    assert elapsed < 10.0, f"10k rows should take seconds, took {elapsed:.1f} s"
+    print("✅ Batch explanation speed test passed")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("Running Explanation Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_linear_contributions_are_exact()
+        test_forest_contributions_match_decision_paths()
+        test_explaining_ten_thousand_rows_takes_seconds()
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60 + "\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}\n")
+        sys.exit(1)
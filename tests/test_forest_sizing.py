@@ -0,0 +1,82 @@
+"""Tests for forest pruning and the right-sizing tool."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from forest_sizing import choose, size_forest
+from inference import CompiledForest
+
+
+def _synthetic_problem():
+    rng = np.random.default_rng(7)
+    features = pd.DataFrame(rng.normal(size=(1200, 5)), columns=[f"f{i}" for i in range(5)])
+    labels = (features["f0"] + 0.5 * features["f1"] ** 2 + rng.normal(scale=0.5, size=1200) > 0.5).astype(int)
+    x_train, x_test, y_train, y_test = train_test_split(features, labels.to_numpy(), test_size=0.25, random_state=0)
+    scaler = StandardScaler().fit(x_train)
+    forest = RandomForestClassifier(n_estimators=20, max_depth=8, random_state=0).fit(scaler.transform(x_train), y_train)
+    return forest, scaler, (x_train, x_test, y_train, y_test)
+
+
+def test_prune_matches_truncated_forest():
+    print("Testing compiled forest pruning...")
+    forest, _, (_, x_test, _, _) = _synthetic_problem()
+    compiled = CompiledForest.from_sklearn(forest)
+    rows = np.asarray(x_test, dtype=np.float64)
+
+    first_five = compiled.prune(n_estimators=5)
+    expected = np.mean([tree.predict_proba(rows.astype(np.float32))[:, 1] for tree in forest.estimators_[:5]], axis=0)
+    np.testing.assert_allclose(first_five.positive_proba(rows), expected, rtol=0, atol=1e-12)
+
+    shallow = compiled.prune(max_depth=3)
+    capped = CompiledForest(
+        feature=compiled.feature, threshold=compiled.threshold, left=compiled.left, right=compiled.right,
+        value=compiled.value, roots=compiled.roots, max_depth=3, n_features=compiled.n_features_in_, prescaled=False,
+    )
+    np.testing.assert_array_equal(shallow.positive_proba(rows), capped.positive_proba(rows))
+    assert shallow.feature.shape[0] < compiled.feature.shape[0], "Pruned forest should drop unreachable nodes"
+    assert shallow.max_depth == 3, "Pruned depth should be recorded"
+    print("✅ Forest pruning test passed")
+
+
+def test_size_forest_reports_and_chooses_within_tolerance():
+    print("Testing forest right-sizing report...")
+    forest, scaler, split = _synthetic_problem()
+    report = size_forest(forest, scaler, trees=[5, 20], depths=[2, 8], latency_samples=20, split=split)
+    reference = report["reference"]
+    names = {result["candidate"] for result in report["candidates"]}
+    assert names == {"prune-5x2", "prune-5x8", "prune-20x2", "prune-20x8"}, "Every combination should be evaluated"
+    full = next(result for result in report["candidates"] if result["candidate"] == "prune-20x8")
+    assert full["roc_auc"] == reference["roc_auc"], "The unpruned candidate should equal the reference"
+    for key in ("bytes", "load_ms", "p50_ms", "p99_ms"):
+        assert all(result[key] > 0 for result in report["candidates"]), f"{key} should be measured"
+
+    chosen = choose(report["candidates"], reference, auc_tolerance=1.0, accuracy_tolerance=1.0)
+    assert chosen["bytes"] == min(result["bytes"] for result in report["candidates"]), "Loose tolerance picks the smallest"
+    strict = choose(report["candidates"], reference, auc_tolerance=0.0, accuracy_tolerance=0.0)
+    assert strict["roc_auc"] >= reference["roc_auc"], "Zero tolerance must not lose AUC"
+    assert choose(report["candidates"], reference, 1.0, 1.0, p99_budget_ms=0.0) is None, "Impossible budgets choose nothing"
+    print("✅ Forest right-sizing test passed")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("Running Forest Sizing Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_prune_matches_truncated_forest()
+        test_size_forest_reports_and_chooses_within_tolerance()
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60 + "\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}\n")
+        sys.exit(1)
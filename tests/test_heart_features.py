@@ -0,0 +1,88 @@
+"""Tests for the columnar heart feature builder."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import utils
+
+
+def _reference_row(age, gender, height_cm, weight_kg, systolic_bp, diastolic_bp,
+                   cholesterol, glucose, smoke, alco, active):
+    cholesterol_cat = 1 if cholesterol < 200 else 2 if cholesterol < 240 else 3
+    glucose_cat = 1 if glucose < 100 else 2 if glucose < 126 else 3
+    bmi = float(weight_kg) / ((float(height_cm) / 100.0) ** 2)
+    return [
+        0, float(age), int(height_cm), float(weight_kg), int(systolic_bp), int(diastolic_bp),
+        int(smoke), int(alco), int(active), bmi, int(gender != "Male"),
+        int(cholesterol_cat == 2), int(cholesterol_cat == 3), int(glucose_cat == 2), int(glucose_cat == 3),
+    ]
+
+
+def test_category_cutoffs_and_single_row_schema():
+    print("Testing heart category cut-offs...")
+    for cholesterol, glucose, expected in [
+        (199, 99, [0, 0, 0, 0]),
+        (200, 100, [1, 0, 1, 0]),
+        (239.9, 125.9, [1, 0, 1, 0]),
+        (240, 126, [0, 1, 0, 1]),
+    ]:
+        features, bmi = utils.build_heart_features(
+            age=50, gender="Female", height_cm=165.7, weight_kg=70.0, systolic_bp=130, diastolic_bp=85,
+            cholesterol=cholesterol, glucose=glucose, smoke=True, alco=False, active=True,
+        )
+        assert list(features.columns) == utils.HEART_FEATURE_COLUMNS, "Schema should be fixed"
+        dummies = features[["cholesterol_2", "cholesterol_3", "gluc_2", "gluc_3"]].iloc[0].tolist()
+        assert dummies == expected, f"Wrong dummies for {cholesterol}/{glucose}: {dummies}"
+        assert features["gender_2"].iloc[0] == 1, "Female should set gender_2"
+        assert features["height"].iloc[0] == 165, "Height should be truncated like int()"
+        assert isinstance(bmi, float)
+    print("✅ Heart category cut-off test passed")
+
+
+def test_batch_matrix_matches_row_reference():
+    print("Testing heart batch feature matrix...")
+    rng = np.random.default_rng(0)
+    rows = 1000
+    inputs = dict(
+        age=rng.integers(1, 121, rows),
+        gender=rng.choice(["Male", "Female"], rows),
+        height_cm=rng.integers(120, 221, rows),
+        weight_kg=rng.uniform(30, 200, rows),
+        systolic_bp=rng.integers(80, 201, rows),
+        diastolic_bp=rng.integers(50, 121, rows),
+        cholesterol=rng.integers(100, 401, rows),
+        glucose=rng.integers(50, 301, rows),
+        smoke=rng.integers(0, 2, rows).astype(bool),
+        alco=rng.integers(0, 2, rows).astype(bool),
+        active=rng.integers(0, 2, rows).astype(bool),
+    )
+
+    matrix, bmi = utils.build_heart_feature_matrix(**inputs)
+    expected = np.array([
+        _reference_row(*values) for values in zip(*(inputs[name] for name in inputs))
+    ], dtype=np.float64)
+
+    assert matrix.shape == (rows, len(utils.HEART_FEATURE_COLUMNS)), f"Unexpected shape {matrix.shape}"
+    assert np.array_equal(matrix, expected), "Batch matrix should match the per-row reference"
+    assert np.array_equal(bmi, expected[:, utils.HEART_FEATURE_COLUMNS.index("bmi")])
+    print("✅ Heart batch feature matrix test passed")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("Running Heart Feature Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_category_cutoffs_and_single_row_schema()
+        test_batch_matrix_matches_row_reference()
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60 + "\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}\n")
+        sys.exit(1)
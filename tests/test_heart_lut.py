@@ -0,0 +1,118 @@
+"""Tests for the precomputed heart risk lookup tables."""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import utils
+from heart_lut import (
+    MANIFEST_NAME,
+    build_heart_lut,
+    build_tables,
+    load_heart_lut,
+    load_tables,
+    max_probability_error,
+    save_tables,
+)
+
+# A coarser weight axis keeps the tests fast; the defaults use 0.01 kg steps.
+AXES = {"weight_kg": (30.0, 200.0, 0.5)}
+INPUTS = {
+    "age": 61, "gender": "Female", "height_cm": 158, "weight_kg": 82.5, "systolic_bp": 145, "diastolic_bp": 92,
+    "cholesterol": 250, "glucose": 110, "smoke": True, "alco": False, "active": False,
+}
+
+
+def test_tables_match_the_live_model():
+    print("Testing lookup tables against the live heart model...")
+    model = utils.load_compiled_heart_model()
+    with tempfile.TemporaryDirectory() as tmp:
+        save_tables(build_tables(model, AXES), Path(tmp), model_version="test")
+        table = load_tables(Path(tmp))
+        assert isinstance(table.tables["body"], np.memmap), "Tables should be memory-mapped"
+        assert table.tables["body"].shape == (101, 341), "Height x weight should be one 2-D table"
+
+        for inputs in (INPUTS, {**INPUTS, "gender": "Male", "cholesterol": 180, "glucose": 130, "active": True}):
+            expected = utils.predict_heart(model, None, utils.build_heart_feature_matrix(**inputs)[0])
+            prediction, probability = table.predict(**inputs)
+            assert prediction == expected[0], "The label should match the model"
+            assert abs(probability - expected[1]) < 1e-6, "The probability should match the model"
+        assert max_probability_error(table, model, samples=500) < 1e-6, "float32 logit parts should be exact to 1e-6"
+
+        for field, value in (("weight_kg", 82.25), ("height_cm", 158.5), ("age", 0), ("systolic_bp", 201)):
+            assert table.predict(**{**INPUTS, field: value}) is None, f"{field}={value} is off the grid"
+    print("✅ Lookup table accuracy test passed")
+
+
+def test_cell_cap_tolerance_and_staleness():
+    print("Testing the cell cap, tolerance check and version check...")
+    model = utils.load_compiled_heart_model()
+    try:
+        build_tables(model, {"weight_kg": (30.0, 200.0, 0.001)})
+    except ValueError as exc:
+        assert "cell cap" in str(exc), "The error should mention the cap"
+    else:
+        raise AssertionError("A grid over the cell cap should be rejected")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp) / "heart_lut"
+        assert load_heart_lut(directory) is None, "Without tables the caller uses the live model"
+        try:
+            build_heart_lut(directory, AXES, tolerance=0.0, samples=200)
+        except ValueError as exc:
+            assert "tolerance" in str(exc), "The error should mention the tolerance"
+        else:
+            raise AssertionError("float32 rounding should exceed a zero tolerance")
+        assert not (directory / MANIFEST_NAME).exists(), "Rejected tables should not be written"
+
+        build_heart_lut(directory, AXES, dtype="float16", samples=200)
+        version = utils.artifact_version("heart")
+        table = load_heart_lut(directory, version=version)
+        assert table is not None and table.tables["age"].dtype == np.float16, "float16 tables should load"
+        assert table.manifest["attributes"]["max_error"] < 1e-3, "The measured error should be recorded"
+        assert load_heart_lut(directory, version=version) is table, "Reruns should reuse the opened tables"
+        assert load_heart_lut(directory, version="older") is None, "Tables from another model should be ignored"
+    print("✅ Cell cap, tolerance and staleness test passed")
+
+
+def test_rebuild_leaves_mapped_tables_intact():
+    print("Testing that rebuilding the tables does not touch mapped ones...")
+    model = utils.load_compiled_heart_model()
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        save_tables(build_tables(model, AXES), directory, model_version="first")
+        first = load_heart_lut(directory, version="first")
+        body = np.array(first.tables["body"])
+        expected = first.predict(**INPUTS)
+
+        save_tables(build_tables(model, {"weight_kg": (30.0, 200.0, 1.0)}, dtype="float16"), directory,
+                    model_version="second")
+        assert np.array_equal(first.tables["body"], body), "Mapped tables should keep their values"
+        assert first.predict(**INPUTS) == expected, "Mapped tables should still answer lookups"
+        second = load_heart_lut(directory, version="second")
+        assert second is not None and second.tables["body"].shape == (101, 171), "The new tables should load"
+        assert load_heart_lut(directory, version="first") is None, "The replaced version should be gone"
+        referenced = {entry["file"] for entry in second.manifest["arrays"].values()}
+        assert {path.name for path in directory.glob("*.npy")} == referenced, "Old table files should be removed"
+    print("✅ Rebuild over mapped tables test passed")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("Running Heart Lookup Table Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_tables_match_the_live_model()
+        test_cell_cap_tolerance_and_staleness()
+        test_rebuild_leaves_mapped_tables_intact()
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60 + "\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}\n")
+        sys.exit(1)
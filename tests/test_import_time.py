@@ -0,0 +1,78 @@
+"""Tests for deferred heavy imports and the background artifact warm-up."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+import utils
+from bench_imports import IMPORT_BUDGETS, bench_module, compare, deferred_import_ms, parse_importtime
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       200 |        200 |     numpy._core
+import time:       300 |        500 |   numpy
+import time:        40 |         40 |   json
+import time:       100 |        640 | utils
+import time:        10 |         10 | reports
+"""
+
+
+def test_parse_importtime_and_compare():
+    print("Testing -X importtime parsing...")
+    parsed = parse_importtime(SAMPLE)
+    assert parsed["cumulative_us"]["utils"] == 640, "Cumulative time should be read per package"
+    assert parsed["children"]["utils"] == [("numpy", 500), ("json", 40)], "Direct imports should be nested"
+    assert parsed["children"]["reports"] == [], "A leaf import has no children"
+    assert parsed["top_level"] == [("utils", 640), ("reports", 10)], "Top-level imports should be listed"
+
+    results = [
+        {"module": "utils", "median_ms": 130.0, "deferred_loaded": []},
+        {"module": "app", "median_ms": 100.0, "deferred_loaded": ["pandas"]},
+    ]
+    problems = compare(results, {"utils": {"median_ms": 100.0}, "app": {"median_ms": 100.0}}, tolerance=0.25)
+    assert len(problems) == 2, f"Both the slowdown and the eager pandas import should fail: {problems}"
+    over_budget = compare(results[:1], {}, tolerance=0.25, deferred_ms=500.0)
+    assert len(over_budget) == 1 and "budget" in over_budget[0], "130 ms is over 15% of 500 ms"
+    print("✅ Import time parsing test passed")
+
+
+def test_entry_modules_defer_heavy_imports():
+    print("Testing that entry modules defer pandas, sklearn and fpdf within their import budgets...")
+    deferred_ms = deferred_import_ms(1)
+    results = [bench_module(module, 2) for module in IMPORT_BUDGETS]
+    problems = compare(results, {}, tolerance=0.25, deferred_ms=deferred_ms)
+    assert not problems, f"Entry modules should import lazily and within budget: {problems}"
+    print("✅ Deferred import test passed")
+
+
+def test_background_warmup_builds_models_once():
+    print("Testing background artifact warm-up...")
+    ran = []
+    errors = utils.warm_artifacts(["heart"], extra=[lambda: ran.append(True)])
+    assert errors == {} and ran == [True], "Heart should warm cleanly and extra tasks should run"
+    assert utils.warm_artifacts(["heart"]) == {}, "Warming again should reuse the compiled model"
+
+    thread = utils.start_warmup(["heart"])
+    assert utils.start_warmup() is thread, "The warm-up should start once per process"
+    thread.join(60)
+    assert not thread.is_alive(), "The warm-up thread should finish"
+    assert utils.load_compiled_heart_model() is utils.load_compiled_heart_model(), "The warmed model should be cached"
+    print("✅ Background warm-up test passed")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("Running Import Time Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_parse_importtime_and_compare()
+        test_entry_modules_defer_heavy_imports()
+        test_background_warmup_builds_models_once()
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60 + "\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}\n")
+        sys.exit(1)
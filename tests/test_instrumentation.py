@@ -0,0 +1,110 @@
+"""Tests for stage histograms, metric export and the request profiler."""
+
+import json
+import pstats
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from instrumentation import METRIC_NAME, Histogram, Instrumentation
+
+
+def test_histogram_buckets_and_quantiles():
+    print("Testing latency histograms...")
+    histogram = Histogram([0.001, 0.01, 0.1])
+    for seconds in [0.0005] * 50 + [0.005] * 45 + [0.05] * 4 + [5.0]:
+        histogram.observe(seconds)
+    counts, count, total = histogram.snapshot()
+    assert counts == [50, 45, 4, 1] and count == 100, f"Unexpected bucket counts: {counts}"
+    assert abs(total - (0.025 + 0.225 + 0.2 + 5.0)) < 1e-9, "The sum should include every observation"
+    assert 0.0 < histogram.quantile(0.5) <= 0.001, "The median falls in the first bucket"
+    assert 0.001 < histogram.quantile(0.9) < 0.01, "p90 falls in the second bucket"
+    assert Histogram().quantile(0.5) == 0.0, "An empty histogram has no quantiles"
+    print("✅ Latency histogram test passed")
+
+
+def test_prometheus_and_json_export():
+    print("Testing metric export...")
+    metrics = Instrumentation()
+    with metrics.request("analysis", "heart"):
+        with metrics.stage("predict", "heart"):
+            time.sleep(0.002)
+    metrics.observe("load_artifacts", 0.2, disease="heart")
+
+    text = metrics.to_prometheus()
+    assert f"# TYPE {METRIC_NAME} histogram" in text, "The metric type should be declared"
+    assert f'{METRIC_NAME}_bucket{{disease="heart",stage="predict",le="0.001"}} 0' in text, "Buckets are cumulative"
+    assert f'{METRIC_NAME}_bucket{{disease="heart",stage="predict",le="+Inf"}} 1' in text, "+Inf holds every sample"
+    assert f'{METRIC_NAME}_count{{disease="heart",stage="request"}} 1' in text, "The request itself is timed"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = metrics.export(Path(tmp) / "metrics.json")
+        stages = {entry["stage"]: entry for entry in json.loads(path.read_text())["stages"]}
+        assert set(stages) == {"load_artifacts", "predict", "request"}, f"Unexpected stages: {set(stages)}"
+        assert stages["predict"]["sum_s"] >= 0.002, "The stage should cover the sleep"
+        assert stages["request"]["sum_s"] >= stages["predict"]["sum_s"], "The request encloses its stages"
+        assert metrics.export(Path(tmp) / "metrics.prom").read_text() == metrics.to_prometheus(), \
+            "Other suffixes should use the Prometheus text format"
+        assert sorted(p.name for p in Path(tmp).iterdir()) == ["metrics.json", "metrics.prom"], \
+            "No temporary files should be left behind"
+    print("✅ Metric export test passed")
+
+
+def test_profiler_is_opt_in_and_dumps_per_request():
+    print("Testing the request profiler...")
+    with tempfile.TemporaryDirectory() as tmp:
+        metrics = Instrumentation()
+        with metrics.request("analysis", "diabetes"):
+            sum(range(1000))
+        assert metrics.profiles_written == 0, "Profiling should be off by default"
+
+        metrics.configure(profile_dir=Path(tmp) / "profiles", metrics_path=Path(tmp) / "metrics.prom")
+        for _ in range(2):
+            with metrics.request("analysis", "diabetes"):
+                sorted(range(1000), reverse=True)
+        profiles = sorted((Path(tmp) / "profiles").glob("diabetes-analysis-*.prof"))
+        assert len(profiles) == 2 and metrics.profiles_written == 2, "Every sampled request should be dumped"
+        assert pstats.Stats(str(profiles[0])).total_calls > 0, "The dump should be a readable cProfile file"
+        assert (Path(tmp) / "metrics.prom").exists(), "Metrics should be exported after each request"
+
+        metrics.configure(profile_dir=Path(tmp) / "profiles", sample_rate=0.0)
+        with metrics.request("analysis", "diabetes"):
+            pass
+        assert metrics.profiles_written == 2, "A zero sample rate should profile nothing"
+    print("✅ Request profiler test passed")
+
+
+def test_stage_overhead_is_microseconds():
+    print("Testing instrumentation overhead...")
+    metrics = Instrumentation()
+    rounds = 20000
+    start = time.perf_counter()
+    for _ in range(rounds):
+        with metrics.stage("noop"):
+            pass
+    per_stage = (time.perf_counter() - start) / rounds
+    # A Streamlit scan rerun takes tens of milliseconds, so even 20 µs per stage stays far below 1%.
+    assert per_stage < 20e-6, f"A stage should cost microseconds, took {per_stage * 1e6:.1f} µs"
+    assert metrics.histogram("noop").count == rounds, "Every stage should be recorded"
+    print("✅ Instrumentation overhead test passed")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("Running Instrumentation Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_histogram_buckets_and_quantiles()
+        test_prometheus_and_json_export()
+        test_profiler_is_opt_in_and_dumps_per_request()
+        test_stage_overhead_is_microseconds()
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60 + "\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}\n")
+        sys.exit(1)
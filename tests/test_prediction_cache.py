@@ -0,0 +1,80 @@
+"""Tests for the bounded prediction cache."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import utils
+from prediction_cache import PredictionCache, feature_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_lru_byte_cap_and_ttl():
+    print("Testing prediction cache eviction and expiry...")
+    clock = FakeClock()
+    keys = [feature_key("heart", "v1", np.full(15, float(i))) for i in range(4)]
+    entry_size = 240 + len("heart") + len("v1") + 15 * 8
+    cache = PredictionCache(max_bytes=entry_size * 3, ttl_seconds=10, clock=clock)
+
+    for position, key in enumerate(keys[:3]):
+        cache.put(key, (0, position / 10))
+    assert cache.get(keys[0]) == (0, 0.0), "Fresh entry should hit"
+    cache.put(keys[3], (1, 0.3))
+
+    assert cache.get(keys[1]) is None, "Least recently used entry should be evicted"
+    assert cache.get(keys[0]) is not None, "Recently used entry should survive"
+    assert cache.stats()["bytes"] <= entry_size * 3, "Cache should respect its byte cap"
+
+    clock.now = 11
+    assert cache.get(keys[3]) is None, "Entries older than the TTL should expire"
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["expirations"] == 1, f"Unexpected stats {stats}"
+    assert 0 < stats["hit_rate"] < 1
+    print("✅ Prediction cache eviction test passed")
+
+
+def test_cached_heart_prediction_collapses_bucketed_inputs():
+    print("Testing cached heart predictions...")
+    utils.PREDICTION_CACHE.clear()
+    model = utils.load_compiled_heart_model()
+    inputs = dict(age=52, gender="Male", height_cm=171.4, weight_kg=80.0, systolic_bp=135, diastolic_bp=85,
+                  glucose=90, smoke=False, alco=False, active=True)
+
+    first, _ = utils.build_heart_feature_matrix(cholesterol=150, **inputs)
+    second, _ = utils.build_heart_feature_matrix(cholesterol=199, **{**inputs, "glucose": 60})
+    hits_before = utils.PREDICTION_CACHE.hits
+
+    result = utils.predict_heart_cached(model, None, first)
+    assert result == utils.predict_heart(model, None, first), "Cached result should match predict_heart"
+    assert utils.predict_heart_cached(model, None, second) == result, "Same bucket should reuse the entry"
+    assert utils.PREDICTION_CACHE.hits == hits_before + 1, "Second call should be a cache hit"
+
+    utils.predict_heart_cached(model, None, first, version="retrained")
+    assert utils.PREDICTION_CACHE.hits == hits_before + 1, "A new artifact version should miss"
+    print("✅ Cached heart prediction test passed")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("Running Prediction Cache Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_cache_lru_byte_cap_and_ttl()
+        test_cached_heart_prediction_collapses_bucketed_inputs()
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60 + "\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}\n")
+        sys.exit(1)
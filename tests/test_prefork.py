@@ -0,0 +1,49 @@
+"""Tests for pre-fork serving helpers and the memory measurement."""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from prefork import fork_worker, measure, memory_usage
+
+
+def test_memory_usage_and_fork_worker():
+    print("Testing memory sampling and worker forking...")
+    usage = memory_usage(os.getpid())
+    assert usage["rss"] > 0 and usage["pss"] > 0, "RSS and PSS should be read from smaps_rollup"
+    assert usage["shared"] + usage["private"] == usage["rss"], "Shared and private pages should add up to RSS"
+
+    pid = fork_worker(lambda: 3)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 3, "The worker should exit with the target's return code"
+    print("✅ Memory sampling and worker forking test passed")
+
+
+def test_measure_reports_every_mode():
+    print("Testing pre-fork memory measurement...")
+    results = measure(2, ["naive", "prefork"])
+    assert [result["mode"] for result in results] == ["naive", "prefork"], "Modes should be reported in order"
+    for result in results:
+        assert len(result["per_worker"]) == 2, "Every worker should be sampled"
+        assert result["total"]["pss"] > 0, "Totals should be summed"
+    prefork = results[1]
+    assert all(usage["shared"] > 0 for usage in prefork["per_worker"]), "Pre-forked workers should share pages"
+    print("✅ Pre-fork memory measurement test passed")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("Running Pre-fork Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_memory_usage_and_fork_worker()
+        test_measure_reports_every_mode()
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60 + "\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}\n")
+        sys.exit(1)
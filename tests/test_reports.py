@@ -0,0 +1,130 @@
+"""Tests for the template-based PDF report engine."""
+
+import re
+import sys
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from reports import REPORT_CACHE, build_fpdf_report, build_report, cached_report, get_template
+
+HEART_INPUTS = {
+    "Age": 55,
+    "Gender": "Female",
+    "Height (cm)": 165,
+    "BMI": "25.7",
+    "Cholesterol (mg/dL)": 220,
+    "Physically Active": "Yes",
+}
+
+
+def _page_texts(pdf_bytes):
+    """Return ``[(x, y, text), ...]`` per page content stream."""
+    pages = []
+    for match in re.finditer(rb"stream\r?\n(.*?)endstream", pdf_bytes, re.S):
+        content = match.group(1)
+        try:
+            content = zlib.decompress(content)
+        except zlib.error:
+            pass
+        pages.append([
+            (float(x), float(y), text)
+            for x, y, text in re.findall(rb"([\d.]+) ([\d.]+) Td \((.*?)\) Tj", content)
+        ])
+    return pages
+
+
+def _assert_same_layout(inputs, patient_name="Jane (J) Doe", label="Low Risk", factors=None):
+    expected = _page_texts(build_fpdf_report("Heart Disease", patient_name, inputs, label, 32.8, factors))
+    actual = _page_texts(build_report("Heart Disease", patient_name, inputs, label, 32.8, factors=factors))
+    assert len(actual) == len(expected), "Template and FPDF should produce the same number of pages"
+    for expected_page, actual_page in zip(expected, actual):
+        assert len(actual_page) == len(expected_page), "Every text run should be drawn"
+        for (ex, ey, etext), (ax, ay, atext) in zip(expected_page, actual_page):
+            assert atext == etext, f"Text differs: {atext!r} vs {etext!r}"
+            assert abs(ax - ex) < 0.02 and abs(ay - ey) < 0.02, f"{atext!r} is misplaced"
+
+
+def test_template_matches_fpdf_layout():
+    print("Testing template layout against FPDF...")
+    _assert_same_layout(HEART_INPUTS)
+    _assert_same_layout(dict(HEART_INPUTS, Gender="a long note that has to wrap " * 8), label="High Risk")
+    _assert_same_layout({f"Field {i}": f"value {i}" for i in range(40)})
+    factors = [("Age", "+0.84 log-odds (raises risk)"), ("Systolic BP", "-0.29 log-odds (lowers risk)")]
+    _assert_same_layout(HEART_INPUTS, factors=factors)
+    _assert_same_layout({f"Field {i}": f"value {i}" for i in range(29)}, factors=factors * 3)
+    print("✅ Template layout test passed")
+
+
+def test_report_structure_and_template_cache():
+    print("Testing report structure and template reuse...")
+    pdf_bytes = build_report("Heart Disease", "", HEART_INPUTS, "High Risk", 72.5, timestamp="2024-01-01 09:00")
+    assert pdf_bytes.startswith(b"%PDF-") and pdf_bytes.rstrip().endswith(b"%%EOF"), "Output should be a PDF"
+    assert b"(Patient Name: Unknown)" in pdf_bytes, "Empty names should print as Unknown"
+    assert b"(Generated: 2024-01-01 09:00)" in pdf_bytes, "The timestamp should be filled in"
+    assert b"(Risk Level: 72.5%)" in pdf_bytes, "The probability should be filled in"
+
+    xref = int(pdf_bytes.rsplit(b"startxref\n", 1)[1].split(b"\n", 1)[0])
+    entries = pdf_bytes[xref:].split(b"\n")[3:]
+    for number, entry in enumerate(entries, start=1):
+        if not entry.endswith(b" n "):
+            break
+        offset = int(entry[:10])
+        assert pdf_bytes[offset:].startswith(b"%d 0 obj" % number), f"xref offset for object {number} is wrong"
+
+    template = get_template("Heart Disease", list(HEART_INPUTS))
+    assert get_template("Heart Disease", list(HEART_INPUTS)) is template, "Templates should be built once"
+    assert template.single_page, "The heart form should fit the single-page fast path"
+    again = template.render("", list(HEART_INPUTS.values()), "High Risk", 72.5, timestamp="2024-01-01 09:00")
+    assert again == pdf_bytes, "Rendering should be deterministic for the same inputs"
+    print("✅ Report structure and template reuse test passed")
+
+
+def test_cached_report_memoizes_per_result():
+    print("Testing memoized report rendering...")
+    REPORT_CACHE.clear()
+    before = REPORT_CACHE.stats()
+    first = cached_report("Heart Disease", "Jo", HEART_INPUTS, "Low Risk", 32.8)
+    again = cached_report("Heart Disease", "Jo ", dict(HEART_INPUTS), "Low Risk", 32.8)
+    assert again is first, "The same inputs and result should reuse the rendered PDF"
+    other = cached_report("Heart Disease", "Jo", HEART_INPUTS, "High Risk", 72.5)
+    assert other is not first and b"(Prediction: High Risk)" in other, "A different result needs its own report"
+    stats = REPORT_CACHE.stats()
+    assert stats["hits"] - before["hits"] == 1 and stats["misses"] - before["misses"] == 2, \
+        f"Unexpected cache counters: {stats}"
+    assert stats["bytes"] > len(first) + len(other), "Cached reports should count towards the byte budget"
+    print("✅ Memoized report rendering test passed")
+
+
+def test_app_defers_pdf_rendering():
+    print("Testing deferred PDF rendering in the app...")
+    from streamlit.testing.v1 import AppTest
+
+    before = REPORT_CACHE.stats()
+    app = AppTest.from_file(str(Path(__file__).resolve().parent.parent / "app.py"), default_timeout=60).run()
+    app.selectbox[0].select("Heart Disease").run()
+    app.button(key="heart_scan").click().run()
+    assert not app.exception, f"The app should run cleanly: {app.exception}"
+    assert len(app.get("download_button")) == 1, "The download button should be offered"
+    stats = REPORT_CACHE.stats()
+    assert (stats["hits"], stats["misses"]) == (before["hits"], before["misses"]), "No PDF should be rendered until the download is requested"
+    print("✅ Deferred PDF rendering test passed")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("Running Report Template Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_template_matches_fpdf_layout()
+        test_report_structure_and_template_cache()
+        test_cached_report_memoizes_per_result()
+        test_app_defers_pdf_rendering()
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60 + "\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}\n")
+        sys.exit(1)
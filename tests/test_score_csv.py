@@ -0,0 +1,80 @@
+"""Tests for the chunked bulk CSV scoring CLI."""
+
+import io
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import score_csv
+import utils
+
+HEART_CSV = Path(__file__).resolve().parent.parent / "data" / "heart.csv"
+
+
+def _heart_sample(tmp_dir, rows=300):
+    sample_path = Path(tmp_dir) / "heart_sample.csv"
+    pd.read_csv(HEART_CSV, sep=";", nrows=rows).to_csv(sample_path, sep=";", index=False)
+    return sample_path
+
+
+def test_heart_records_match_form_builder():
+    print("Testing raw heart record encoding...")
+    record = pd.DataFrame(
+        [{"id": 0, "age": 45 * 365.25, "gender": 1, "height": 170, "weight": 70.0, "ap_hi": 120,
+          "ap_lo": 80, "cholesterol": 2, "gluc": 3, "smoke": 0, "alco": 1, "active": 1}]
+    )
+    form_features, _ = utils.build_heart_features(
+        age=45, gender="Male", height_cm=170, weight_kg=70.0, systolic_bp=120, diastolic_bp=80,
+        cholesterol=210, glucose=130, smoke=False, alco=True, active=True,
+    )
+    record_features = utils.heart_features_from_records(record)
+
+    assert list(record_features.columns) == utils.HEART_FEATURE_COLUMNS, "Unexpected column order"
+    assert np.array_equal(record_features.to_numpy(float), form_features.to_numpy(float)), (
+        "Raw records should encode like the form inputs"
+    )
+    print("✅ Raw heart record encoding test passed")
+
+
+def test_score_file_chunked_and_parallel_agree():
+    print("Testing chunked CSV scoring...")
+    with tempfile.TemporaryDirectory() as tmp:
+        sample_path = _heart_sample(tmp)
+
+        serial = io.StringIO()
+        rows = score_csv.score_file("heart", str(sample_path), serial, chunksize=64)
+        parallel = io.StringIO()
+        score_csv.score_file("heart", str(sample_path), parallel, chunksize=64, workers=2)
+
+    assert rows == 300, f"Expected 300 scored rows, got {rows}"
+    assert serial.getvalue() == parallel.getvalue(), "Worker pool output should match serial output"
+
+    scored = pd.read_csv(io.StringIO(serial.getvalue()), sep=";")
+    records = pd.read_csv(HEART_CSV, sep=";", nrows=300)
+    labels, probabilities = utils.predict_heart_batch(
+        utils.load_heart_model(), utils.load_heart_scaler(), utils.heart_features_from_records(records)
+    )
+    assert np.array_equal(scored["prediction"].to_numpy(), labels), "Labels differ from one-shot scoring"
+    assert np.allclose(scored["probability"].to_numpy(), probabilities), "Probabilities differ"
+    print("✅ Chunked CSV scoring test passed")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("Running Bulk CSV Scoring Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_heart_records_match_form_builder()
+        test_score_file_chunked_and_parallel_agree()
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60 + "\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}\n")
+        sys.exit(1)
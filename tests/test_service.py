@@ -0,0 +1,218 @@
+"""Tests for the JSON inference service, driven through the raw ASGI interface."""
+
+import asyncio
+import io
+import json
+import sys
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import service
+from prediction_cache import feature_key
+from utils import build_heart_feature_matrix, load_compiled_heart_model
+
+HEART_RECORD = {
+    "age": 55, "gender": "Male", "height_cm": 170, "weight_kg": 80, "systolic_bp": 140,
+    "diastolic_bp": 90, "cholesterol": 250, "glucose": 130, "smoke": False, "alco": "No", "active": 1,
+}
+
+
+async def _request(app, method, path, body=None):
+    """Send one HTTP request to ``app`` and return ``(status, headers, body bytes)``."""
+    payload = body if isinstance(body, bytes) else json.dumps(body).encode() if body is not None else b""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"content-type", b"application/json")], "client": ("test", 1), "server": ("test", 80),
+    }
+    messages = [{"type": "http.request", "body": payload, "more_body": False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        # The client stays connected until the response is complete.
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    start = next(message for message in sent if message["type"] == "http.response.start")
+    content = b"".join(message.get("body", b"") for message in sent if message["type"] == "http.response.body")
+    return start["status"], dict(start["headers"]), content
+
+
+async def _with_lifespan(app, exercise):
+    """Run ``exercise(app)`` between the app's lifespan startup and shutdown."""
+    inbox = asyncio.Queue()
+    outbox = asyncio.Queue()
+    await inbox.put({"type": "lifespan.startup"})
+    task = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}, inbox.get, outbox.put))
+    assert (await outbox.get())["type"] == "lifespan.startup.complete", "Startup should succeed"
+    try:
+        return await exercise(app)
+    finally:
+        await inbox.put({"type": "lifespan.shutdown"})
+        await outbox.get()
+        await task
+
+
+def test_heart_predictions_single_and_batched():
+    print("Testing heart prediction endpoint...")
+
+    async def exercise(app):
+        single = await _request(app, "POST", "/predict/heart", HEART_RECORD)
+        batch = await _request(app, "POST", "/predict/heart", [HEART_RECORD, dict(HEART_RECORD, age=30, smoke=True)])
+        return single, batch
+
+    (status, _, body), (batch_status, _, batch_body) = asyncio.run(_with_lifespan(service.create_app(2), exercise))
+    features, bmi = build_heart_feature_matrix(
+        age=55, gender="Male", height_cm=170, weight_kg=80, systolic_bp=140, diastolic_bp=90,
+        cholesterol=250, glucose=130, smoke=False, alco=False, active=True,
+    )
+    labels, probabilities = load_compiled_heart_model().predict_batch(features)
+
+    result = json.loads(body)
+    assert status == 200, f"Expected 200, got {status}: {body!r}"
+    assert result["prediction"] == int(labels[0]), "Prediction should match the compiled model"
+    assert abs(result["probability"] - float(probabilities[0])) < 1e-12, "Probability should match the compiled model"
+    assert abs(result["bmi"] - float(bmi[0])) < 1e-12, "BMI should be returned"
+    predictions = json.loads(batch_body)["predictions"]
+    assert batch_status == 200 and len(predictions) == 2, "List bodies should return one result per record"
+    assert predictions[0]["prediction"] == result["prediction"], "Batched and single scoring should agree"
+    assert abs(predictions[0]["probability"] - result["probability"]) < 1e-12, "Batched probability should agree"
+    print("✅ Heart prediction endpoint test passed")
+
+
+def test_request_errors_and_pdf_report():
+    print("Testing service error handling and PDF endpoint...")
+
+    async def exercise(app):
+        return (
+            await _request(app, "POST", "/predict/heart", b"{not json"),
+            await _request(app, "POST", "/predict/heart", {"age": 50}),
+            await _request(app, "POST", "/predict/heart", dict(HEART_RECORD, age="old")),
+            await _request(app, "POST", "/predict/kidney", HEART_RECORD),
+            await _request(app, "POST", "/report/pdf", {"disease": "heart", "patient_name": "Jo Doe", "record": HEART_RECORD}),
+            await _request(app, "POST", "/report/pdf", {"disease": "heart", "patient_name": "张伟", "record": HEART_RECORD}),
+            await _request(app, "POST", "/report/pdf", {"disease": "heart", "patient_name": 'Bob "B" Smith', "record": HEART_RECORD}),
+        )
+
+    out_of_range = []
+
+    async def exercise_limits(app):
+        for field, raw in (
+            ("age", b"NaN"), ("weight_kg", b"Infinity"), ("height_cm", b"0"), ("age", b"150"), ("systolic_bp", b"-120"),
+        ):
+            body = json.dumps(dict(HEART_RECORD, **{field: "%s"})).replace('"%s"', raw.decode()).encode()
+            out_of_range.append((field, await _request(app, "POST", "/predict/heart", body)))
+        for gender in ("male", "Other"):
+            response = await _request(app, "POST", "/predict/heart", dict(HEART_RECORD, gender=gender))
+            out_of_range.append(("gender", response))
+
+    asyncio.run(_with_lifespan(service.create_app(2), exercise_limits))
+    for field, (status, _, body) in out_of_range:
+        assert status == 422 and field.encode() in body, f"{field} out of range should be a 422, got {status}: {body!r}"
+
+    diabetes = {
+        "age": 50, "gender": "Female", "hypertension": 0, "heart_disease": 0, "smoking_history": "No Info",
+        "bmi": 27.5, "hba1c": 6.1, "glucose": 140,
+    }
+    assert len(service.parse_records(diabetes, service.DIABETES_FIELDS, service.CHOICES["diabetes"])["age"]) == 1, \
+        "A valid diabetes record should parse"
+    for field, value in (("gender", "female"), ("gender", "Unknown"), ("smoking_history", "sometimes")):
+        try:
+            service.parse_records([diabetes, dict(diabetes, **{field: value})], service.DIABETES_FIELDS,
+                                  service.CHOICES["diabetes"])
+        except service.RequestError as exc:
+            assert exc.status_code == 422 and str(exc).startswith(f"Record 1: {field}"), \
+                "The error should name the field"
+        else:
+            raise AssertionError(f"{field}={value!r} should be rejected, not scored as the baseline category")
+
+    invalid, missing, wrong_type, unknown, report, unicode_name, quoted_name = asyncio.run(
+        _with_lifespan(service.create_app(2), exercise)
+    )
+    assert invalid[0] == 400, "Malformed JSON should be a 400"
+    assert missing[0] == 422 and b"missing" in missing[2], "Missing fields should be a 422 naming them"
+    assert wrong_type[0] == 422, "Non-numeric vitals should be rejected"
+    assert unknown[0] == 404, "Unknown diseases should be a 404"
+    status, headers, content = report
+    assert status == 200 and content.startswith(b"%PDF-"), "Report endpoint should return a PDF"
+    assert b"Heart_Disease_Report_Jo_Doe.pdf" in headers[b"content-disposition"], "Filename should match the app"
+    assert unicode_name[0] == 200, "A non-latin-1 patient name should still get its report"
+    assert unicode_name[1][b"content-disposition"] == (
+        b'attachment; filename="Heart_Disease_Report___.pdf"; '
+        b"filename*=UTF-8''Heart_Disease_Report_%E5%BC%A0%E4%BC%9F.pdf"
+    ), "The original name should travel in filename*"
+    assert quoted_name[0] == 200 and b'filename="Heart_Disease_Report_Bob__B__Smith.pdf";' in \
+        quoted_name[1][b"content-disposition"], "Quotes must not break the header"
+    print("✅ Service error and PDF test passed")
+
+
+def test_bulk_report_zip_stream():
+    print("Testing streamed bulk report endpoint...")
+    records = [dict(HEART_RECORD, patient_name="Jo Doe"), dict(HEART_RECORD, age=30), dict(HEART_RECORD, patient_name="Jo Doe")]
+
+    async def exercise(app):
+        return (
+            await _request(app, "POST", "/reports/heart", records),
+            await _request(app, "POST", "/reports/heart", HEART_RECORD),
+        )
+
+    archive, not_a_list = asyncio.run(_with_lifespan(service.create_app(2), exercise))
+    status, headers, content = archive
+    assert status == 200 and headers[b"content-type"] == b"application/zip", "Bulk reports should stream a ZIP"
+    with zipfile.ZipFile(io.BytesIO(content)) as bundle:
+        assert bundle.namelist() == [
+            "Heart_Disease_Report_Jo_Doe.pdf", "Heart_Disease_Report_Unknown.pdf", "Heart_Disease_Report_Jo_Doe_2.pdf",
+        ], "Entries should follow the app's naming with suffixed repeats"
+        assert all(bundle.read(name).startswith(b"%PDF-") for name in bundle.namelist()), "Entries should be PDFs"
+    assert not_a_list[0] == 422, "Bulk reports need a list body"
+    print("✅ Streamed bulk report endpoint test passed")
+
+
+def test_cache_is_keyed_by_the_loaded_model_version():
+    print("Testing that cached predictions use the loaded model's version...")
+    original = service.artifact_version
+
+    async def exercise(app):
+        loaded = app.state.versions["heart"]
+        # A newer artifact lands on disk while the server keeps its startup model.
+        service.artifact_version = lambda disease: "newer"
+        try:
+            status, _, _ = await _request(app, "POST", "/predict/heart", dict(HEART_RECORD, age=41))
+        finally:
+            service.artifact_version = original
+        return loaded, status
+
+    loaded, status = asyncio.run(_with_lifespan(service.create_app(1), exercise))
+    features, _ = build_heart_feature_matrix(**dict(HEART_RECORD, age=41, alco=False, active=True))
+    assert status == 200, "The prediction should succeed"
+    assert loaded == original("heart"), "The loaded version should be recorded at startup"
+    assert service.PREDICTION_CACHE.get(feature_key("heart", loaded, features)) is not None, \
+        "The result should be cached under the version the model was loaded from"
+    assert service.PREDICTION_CACHE.get(feature_key("heart", "newer", features)) is None, \
+        "Nothing should be cached under the on-disk version"
+    print("✅ Cache version test passed")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("Running Inference Service Tests")
+    print("=" * 60 + "\n")
+
+    try:
+        test_heart_predictions_single_and_batched()
+        test_request_errors_and_pdf_report()
+        test_bulk_report_zip_stream()
+        test_cache_is_keyed_by_the_loaded_model_version()
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60 + "\n")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}\n")
+        sys.exit(1)
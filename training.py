@@ -0,0 +1,248 @@
+"""Script-driven training for the diabetes and heart disease models.
+
+Replaces the notebooks under ``models/`` with one command that reads
+``data/`` through the columnar cache, runs a cross-validated grid search over
+a process pool and writes a versioned artifact set::
+
+    python training.py heart diabetes --promote
+
+Each run writes ``models/versions/<disease>/<UTC timestamp>/`` with the
+``*_model.pkl``/``*_scaler.pkl`` pair the app loads and a ``metrics.json``
+recording the search results, hold-out metrics, dataset hash and library
+versions. ``--promote`` copies the pair into ``models/``, where the artifact
+registry picks it up on its next hash check.
+
+Scaler and model are searched together as a pipeline, so each CV fold
+fits its own scaler. The split (80/20, stratified, ``random_state=42``)
+matches the notebooks.
+"""
+
+import argparse
+import json
+import os
+import pickle
+import shutil
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
+from sklearn.model_selection import GridSearchCV, train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from artifact_store import MANIFEST_NAME, artifact_dir_for, export_artifact
+from cleaning import clean_diabetes
+from datasets import dataset_source, load_dataset
+from utils import ARTIFACT_FILENAMES, HEART_FEATURE_COLUMNS, MODELS_DIR, get_diabetes_encoder
+
+VERSIONS_DIR = MODELS_DIR / "versions"
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+
+# Grids are centred on the hand-picked notebook settings.
+PARAM_GRIDS: Dict[str, Dict[str, List[Any]]] = {
+    "heart": {"model__C": [0.1, 0.5, 1.0, 2.0]},
+    "diabetes": {"model__n_estimators": [100, 300], "model__max_depth": [10, 15, None]},
+}
+
+DATASET_NAMES = {"heart": "cleaned_heart", "diabetes": "diabetes"}
+
+
+def build_estimator(disease: str) -> Pipeline:
+    """Return the scaler + classifier pipeline searched for ``disease``."""
+    if disease == "heart":
+        model = LogisticRegression(max_iter=3000, solver="liblinear", C=0.5, class_weight="balanced")
+    else:
+        # n_jobs=1: the grid search already uses every core for folds.
+        model = RandomForestClassifier(n_estimators=300, max_depth=15, random_state=RANDOM_STATE, n_jobs=1)
+    return Pipeline([("scaler", StandardScaler()), ("model", model)])
+
+
+def heart_training_frame(frame: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray]:
+    """Encode ``cleaned_heart.csv`` rows into ``HEART_FEATURE_COLUMNS`` and labels."""
+    features = pd.DataFrame(
+        {
+            "id": frame["id"],
+            "age": frame["age"],
+            "height": frame["height"],
+            "weight": frame["weight"],
+            "systolic_bp": frame["systolic_bp"],
+            "diastolic_bp": frame["diastolic_bp"],
+            "smoke": frame["smoke"],
+            "alco": frame["alco"],
+            "active": frame["active"],
+            "bmi": frame["bmi"],
+            "gender_2": frame["gender"] == 2,
+            "cholesterol_2": frame["cholesterol"] == 2,
+            "cholesterol_3": frame["cholesterol"] == 3,
+            "gluc_2": frame["gluc"] == 2,
+            "gluc_3": frame["gluc"] == 3,
+        },
+        columns=HEART_FEATURE_COLUMNS,
+    ).astype(np.float64)
+    return features, frame["target"].to_numpy()
+
+
+def diabetes_training_frame(frame: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray]:
+    """Clean raw ``diabetes.csv`` rows and encode them into ``DIABETES_FEATURE_COLUMNS``."""
+    frame = clean_diabetes(frame)
+    encoder = get_diabetes_encoder()
+    features = pd.DataFrame(encoder.encode_records(frame), columns=list(encoder.feature_names))
+    return features, frame["diabetes"].to_numpy()
+
+
+def load_training_data(disease: str, cache_dir: Optional[Path] = None) -> Tuple[pd.DataFrame, np.ndarray]:
+    frame = load_dataset(DATASET_NAMES[disease], cache_dir=cache_dir)
+    if disease == "heart":
+        return heart_training_frame(frame)
+    return diabetes_training_frame(frame)
+
+
+def split_training_data(disease: str, cache_dir: Optional[Path] = None) -> Tuple[pd.DataFrame, pd.DataFrame, np.ndarray, np.ndarray]:
+    """Return ``(x_train, x_test, y_train, y_test)`` using the notebooks' hold-out split."""
+    features, labels = load_training_data(disease, cache_dir)
+    return train_test_split(features, labels, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=labels)
+
+
+def evaluate(pipeline: Pipeline, features: pd.DataFrame, labels: np.ndarray) -> Dict[str, float]:
+    probabilities = pipeline.predict_proba(features)[:, 1]
+    predictions = pipeline.predict(features)
+    return {
+        "accuracy": float(accuracy_score(labels, predictions)),
+        "roc_auc": float(roc_auc_score(labels, probabilities)),
+        "precision": float(precision_score(labels, predictions)),
+        "recall": float(recall_score(labels, predictions)),
+        "f1": float(f1_score(labels, predictions)),
+    }
+
+
+def _dump(artifact: Any, path: Path) -> None:
+    with open(path, "wb") as handle:
+        pickle.dump(artifact, handle, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def train(
+    disease: str,
+    *,
+    param_grid: Optional[Dict[str, List[Any]]] = None,
+    cv: int = 5,
+    n_jobs: int = -1,
+    scoring: str = "roc_auc",
+    versions_dir: Path = VERSIONS_DIR,
+    cache_dir: Optional[Path] = None,
+) -> Path:
+    """Search, fit and write one versioned artifact set; return its directory."""
+    x_train, x_test, y_train, y_test = split_training_data(disease, cache_dir)
+
+    search = GridSearchCV(
+        build_estimator(disease),
+        param_grid or PARAM_GRIDS[disease],
+        cv=cv,
+        scoring=scoring,
+        n_jobs=n_jobs,
+        refit=True,
+    )
+    started = time.perf_counter()
+    search.fit(x_train, y_train)
+    search_seconds = time.perf_counter() - started
+    best = search.best_estimator_
+
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    directory = Path(versions_dir) / disease / version
+    directory.mkdir(parents=True, exist_ok=False)
+    model_filename, scaler_filename = ARTIFACT_FILENAMES[disease]
+    model = best.named_steps["model"]
+    if isinstance(model, RandomForestClassifier):
+        model.set_params(n_jobs=-1)  # serve with every core, as the notebook model did
+    _dump(model, directory / model_filename)
+    _dump(best.named_steps["scaler"], directory / scaler_filename)
+
+    source = dataset_source(DATASET_NAMES[disease], cache_dir=cache_dir)
+    metrics = {
+        "disease": disease,
+        "version": version,
+        "dataset": {"file": source["path"], "sha256": source["sha256"], "rows": len(y_train) + len(y_test)},
+        "split": {"test_size": TEST_SIZE, "random_state": RANDOM_STATE, "train_rows": len(y_train), "test_rows": len(y_test)},
+        "search": {
+            "cv": cv,
+            "scoring": scoring,
+            "param_grid": param_grid or PARAM_GRIDS[disease],
+            "best_params": search.best_params_,
+            "best_cv_score": float(search.best_score_),
+            "seconds": round(search_seconds, 3),
+            "candidates": [
+                {"params": params, "mean_score": float(mean), "std_score": float(std)}
+                for params, mean, std in zip(
+                    search.cv_results_["params"],
+                    search.cv_results_["mean_test_score"],
+                    search.cv_results_["std_test_score"],
+                )
+            ],
+        },
+        "holdout": evaluate(best, x_test, y_test),
+        "feature_columns": list(x_train.columns),
+        "versions": {"python": sys.version.split()[0], "sklearn": sklearn.__version__, "numpy": np.__version__, "pandas": pd.__version__},
+    }
+    (directory / "metrics.json").write_text(json.dumps(metrics, indent=2, default=str))
+    return directory
+
+
+def promote(version_dir: Path, disease: str, models_dir: Path = MODELS_DIR) -> None:
+    """Copy a trained artifact pair into ``models_dir`` for the app to serve.
+
+    Files are copied to a temporary name and renamed, so readers never see a
+    partial pickle. If the pair was exported as memory-mapped arrays, the
+    arrays are re-exported too, because the registry prefers them over the
+    pickle. ``export_artifact`` writes new array files and swaps the
+    manifest, so the app and service can keep serving from their mapped
+    copies while a model is promoted.
+    """
+    for filename in ARTIFACT_FILENAMES[disease]:
+        source_path = Path(version_dir) / filename
+        temporary_path = Path(models_dir) / f".{filename}.tmp"
+        shutil.copyfile(source_path, temporary_path)
+        os.replace(temporary_path, Path(models_dir) / filename)
+        array_dir = artifact_dir_for(models_dir, filename)
+        if (array_dir / MANIFEST_NAME).exists():
+            with open(source_path, "rb") as handle:
+                export_artifact(pickle.load(handle), array_dir)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Train versioned disease models with a cross-validated grid search.")
+    parser.add_argument("diseases", nargs="+", choices=sorted(PARAM_GRIDS), help="Models to train")
+    parser.add_argument("--cv", type=int, default=5, help="Cross-validation folds (default: 5)")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Search worker processes (default: all cores)")
+    parser.add_argument("--scoring", default="roc_auc", help="Model selection metric (default: roc_auc)")
+    parser.add_argument("--versions-dir", type=Path, default=VERSIONS_DIR)
+    parser.add_argument("--promote", action="store_true", help="Copy the new artifacts into models/")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    for disease in args.diseases:
+        directory = train(disease, cv=args.cv, n_jobs=args.n_jobs, scoring=args.scoring, versions_dir=args.versions_dir)
+        metrics = json.loads((directory / "metrics.json").read_text())
+        holdout = metrics["holdout"]
+        print(
+            f"{disease}: {metrics['search']['best_params']} "
+            f"cv {metrics['search']['scoring']}={metrics['search']['best_cv_score']:.4f} "
+            f"holdout accuracy={holdout['accuracy']:.4f} roc_auc={holdout['roc_auc']:.4f} -> {directory}"
+        )
+        if args.promote:
+            promote(directory, disease)
+            print(f"Promoted {disease} artifacts to {MODELS_DIR}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,10 +1,29 @@
-"""Utility helpers for the disease prediction Streamlit app."""
+"""Utility helpers for the disease prediction Streamlit app.
+
+pandas is only imported by the helpers that build or read DataFrames, so
+``import utils`` stays cheap for the app, the service and the CLIs.
+"""
+
+from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Sequence, Tuple, Union
+import hashlib
+import math
+import os
 import pickle
+import threading
+import time
+
+import numpy as np
 
-import pandas as pd
+from artifact_store import MANIFEST_NAME, artifact_dir_for, load_array_artifact
+from batching import MicroBatcher
+from inference import CompiledForest, CompiledLinearModel
+from prediction_cache import PredictionCache, feature_key
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class ArtifactLoadError(RuntimeError):
@@ -15,36 +34,319 @@ BASE_DIR = Path(__file__).resolve().parent
 MODELS_DIR = BASE_DIR / "models"
 
 
-def _load_artifact(filename: str) -> Any:
-    """Load a pickle artifact from the models directory with error handling."""
-    artifact_path = MODELS_DIR / filename
+def _read_artifact_bytes(artifact_path: Path) -> bytes:
+    """Read the raw bytes of an artifact, mapping a missing file to ArtifactLoadError."""
     try:
         with open(artifact_path, "rb") as artifact_file:
-            return pickle.load(artifact_file)
+            return artifact_file.read()
     except FileNotFoundError as exc:
         raise ArtifactLoadError(f"Missing artifact: {artifact_path}") from exc
-    except pickle.UnpicklingError as exc:
+
+
+def _unpickle_artifact(payload: bytes, artifact_path: Path) -> Any:
+    """Unpickle artifact bytes, mapping corrupt payloads to ArtifactLoadError."""
+    try:
+        return pickle.loads(payload)
+    except (pickle.UnpicklingError, EOFError) as exc:
         raise ArtifactLoadError(f"Corrupted artifact: {artifact_path}") from exc
 
 
+def _load_array_artifact(directory: Path) -> Any:
+    """Load a memory-mapped ``.npy`` artifact directory, mapping failures to ArtifactLoadError."""
+    try:
+        return load_array_artifact(directory)
+    except FileNotFoundError as exc:
+        raise ArtifactLoadError(f"Missing artifact: {directory}") from exc
+    except (ValueError, OSError, KeyError, TypeError, AttributeError) as exc:
+        # The last three cover manifests whose values have the wrong types.
+        raise ArtifactLoadError(f"Corrupted artifact: {directory}") from exc
+
+
+def _resolve_artifact_source(models_dir: Path, filename: str) -> Path:
+    """Prefer an exported array artifact's manifest, falling back to the pickle."""
+    manifest_path = artifact_dir_for(models_dir, filename) / MANIFEST_NAME
+    return manifest_path if manifest_path.exists() else models_dir / filename
+
+
+def _decode_artifact(payload: bytes, source_path: Path) -> Any:
+    if source_path.name == MANIFEST_NAME:
+        return _load_array_artifact(source_path.parent)
+    return _unpickle_artifact(payload, source_path)
+
+
+def _load_artifact(filename: str) -> Any:
+    """Load an artifact from the models directory with error handling.
+
+    An exported ``.npy`` directory (see ``artifact_store``) takes precedence
+    over the pickle of the same name.
+    """
+    source_path = _resolve_artifact_source(MODELS_DIR, filename)
+    if source_path.name == MANIFEST_NAME:
+        return _load_array_artifact(source_path.parent)
+    return _unpickle_artifact(_read_artifact_bytes(source_path), source_path)
+
+
+class _ArtifactEntry:
+    """Cached artifact together with the file fingerprint it was loaded from."""
+
+    __slots__ = ("value", "source", "mtime_ns", "size", "sha256", "load_seconds", "hits", "loads")
+
+    def __init__(self) -> None:
+        self.value: Any = None
+        self.source: Optional[Path] = None
+        self.mtime_ns = -1
+        self.size = -1
+        self.sha256 = ""
+        self.load_seconds = 0.0
+        self.hits = 0
+        self.loads = 0
+
+
+class ArtifactRegistry:
+    """Process-wide cache that loads each artifact once and hot-reloads on change.
+
+    Every ``get`` stats the file. If its mtime or size moved, the file is
+    re-hashed and only reloaded when the SHA-256 actually differs, so a plain
+    ``touch`` never triggers an unpickle. For exported array artifacts the
+    fingerprinted file is the manifest, which embeds every array's hash.
+    """
+
+    def __init__(self, models_dir: Optional[Path] = None) -> None:
+        self.models_dir = Path(models_dir) if models_dir is not None else MODELS_DIR
+        self._entries: Dict[str, _ArtifactEntry] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lock_for(self, filename: str) -> threading.Lock:
+        with self._guard:
+            lock = self._locks.get(filename)
+            if lock is None:
+                lock = self._locks[filename] = threading.Lock()
+            return lock
+
+    def get(self, filename: str) -> Any:
+        """Return the artifact, loading it on first use or when the file changed."""
+        with self._lock_for(filename):
+            source_path = _resolve_artifact_source(self.models_dir, filename)
+            try:
+                stat = os.stat(source_path)
+            except FileNotFoundError as exc:
+                raise ArtifactLoadError(f"Missing artifact: {source_path}") from exc
+
+            entry = self._entries.get(filename)
+            fingerprint = (source_path, stat.st_mtime_ns, stat.st_size)
+            if entry is not None and (entry.source, entry.mtime_ns, entry.size) == fingerprint:
+                return self._hit(entry)
+
+            start = time.perf_counter()
+            payload = _read_artifact_bytes(source_path)
+            digest = hashlib.sha256(payload).hexdigest()
+            if entry is not None and entry.source == source_path and entry.sha256 == digest:
+                entry.mtime_ns, entry.size = stat.st_mtime_ns, stat.st_size
+                return self._hit(entry)
+
+            value = _decode_artifact(payload, source_path)
+            if entry is None:
+                entry = self._entries[filename] = _ArtifactEntry()
+            entry.value = value
+            entry.source = source_path
+            entry.mtime_ns, entry.size = stat.st_mtime_ns, stat.st_size
+            entry.sha256 = digest
+            entry.load_seconds = time.perf_counter() - start
+            entry.loads += 1
+            with self._guard:
+                self.misses += 1
+            return value
+
+    def _hit(self, entry: _ArtifactEntry) -> Any:
+        entry.hits += 1
+        with self._guard:
+            self.hits += 1
+        return entry.value
+
+    def version(self, filename: str) -> str:
+        """Return the SHA-256 of the currently cached artifact, loading it if needed."""
+        self.get(filename)
+        return self._entries[filename].sha256
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and per-artifact load timings."""
+        with self._guard:
+            entries = dict(self._entries)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "artifacts": {
+                name: {
+                    "source": str(entry.source),
+                    "sha256": entry.sha256,
+                    "size_bytes": entry.size,
+                    "load_seconds": entry.load_seconds,
+                    "loads": entry.loads,
+                    "hits": entry.hits,
+                }
+                for name, entry in entries.items()
+            },
+        }
+
+    def clear(self) -> None:
+        """Drop every cached artifact and reset the counters."""
+        with self._guard:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+ARTIFACT_REGISTRY = ArtifactRegistry()
+
+
+def artifact_stats() -> Dict[str, Any]:
+    """Return the process-wide artifact registry statistics."""
+    return ARTIFACT_REGISTRY.stats()
+
+
+ARTIFACT_FILENAMES = {
+    "diabetes": ("diabetes_model.pkl", "diabetes_scaler.pkl"),
+    "heart": ("heart_model.pkl", "heart_scaler.pkl"),
+}
+
+
+def artifact_version(disease: str) -> str:
+    """Return a version string covering the disease's model and scaler artifacts."""
+    return ":".join(ARTIFACT_REGISTRY.version(filename) for filename in ARTIFACT_FILENAMES[disease])
+
+
 def load_diabetes_model() -> Any:
     """Return the trained diabetes prediction model."""
-    return _load_artifact("diabetes_model.pkl")
+    return ARTIFACT_REGISTRY.get("diabetes_model.pkl")
 
 
 def load_heart_model() -> Any:
     """Return the trained heart disease prediction model."""
-    return _load_artifact("heart_model.pkl")
+    return ARTIFACT_REGISTRY.get("heart_model.pkl")
 
 
 def load_diabetes_scaler() -> Any:
     """Return the persisted scaler for diabetes features."""
-    return _load_artifact("diabetes_scaler.pkl")
+    return ARTIFACT_REGISTRY.get("diabetes_scaler.pkl")
 
 
 def load_heart_scaler() -> Any:
     """Return the persisted scaler for heart disease features."""
-    return _load_artifact("heart_scaler.pkl")
+    return ARTIFACT_REGISTRY.get("heart_scaler.pkl")
+
+
+# disease -> (artifact version the engine was built from, compiled engine)
+_COMPILED_MODELS: Dict[str, Tuple[str, Any]] = {}
+_COMPILE_LOCKS = {"heart": threading.Lock(), "diabetes": threading.Lock(), "diabetes_folded": threading.Lock()}
+
+
+def _compiled(key: str, version: str, build: Callable[[], Any]) -> Any:
+    """Return the engine cached under ``key`` for ``version``, building it once.
+
+    The per-key lock makes a caller that races the background warm-up wait
+    for its build instead of loading the same artifacts a second time.
+    """
+    cached = _COMPILED_MODELS.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with _COMPILE_LOCKS[key]:
+        cached = _COMPILED_MODELS.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        compiled = build()
+        _COMPILED_MODELS[key] = (version, compiled)
+    return compiled
+
+
+def load_compiled_heart_model() -> CompiledLinearModel:
+    """Return the heart model with its scaler folded in, rebuilt when either artifact changes.
+
+    Use it with ``scaler=None``: ``predict_heart(load_compiled_heart_model(), None, features)``.
+    """
+    return _compiled(
+        "heart", artifact_version("heart"),
+        lambda: CompiledLinearModel.from_sklearn(load_heart_model(), load_heart_scaler()),
+    )
+
+
+def load_compiled_diabetes_model(fold_scaler: bool = True) -> CompiledForest:
+    """Return the diabetes forest packed into flat arrays, rebuilt when an artifact changes.
+
+    With ``fold_scaler`` the split thresholds are moved into raw feature units,
+    so use it with ``scaler=None``; otherwise pass the diabetes scaler as usual.
+    """
+
+    def build() -> CompiledForest:
+        model = load_diabetes_model()
+        compiled = model if isinstance(model, CompiledForest) else CompiledForest.from_sklearn(model)
+        return compiled.with_scaler(load_diabetes_scaler()) if fold_scaler else compiled
+
+    return _compiled("diabetes_folded" if fold_scaler else "diabetes", artifact_version("diabetes"), build)
+
+
+COMPILED_LOADERS: Dict[str, Callable[[], Any]] = {
+    "diabetes": load_compiled_diabetes_model,
+    "heart": load_compiled_heart_model,
+}
+
+
+def warm_artifacts(
+    diseases: Sequence[str] = ("diabetes", "heart"), extra: Sequence[Callable[[], Any]] = ()
+) -> Dict[str, ArtifactLoadError]:
+    """Load and compile the models for ``diseases``, then run ``extra`` callables.
+
+    Load failures are returned per disease instead of raised; the caller that
+    actually needs the model reports them.
+    """
+    errors: Dict[str, ArtifactLoadError] = {}
+    for disease in diseases:
+        try:
+            COMPILED_LOADERS[disease]()
+        except ArtifactLoadError as exc:
+            errors[disease] = exc
+    for task in extra:
+        task()
+    return errors
+
+
+_WARMUP: Optional[threading.Thread] = None
+_WARMUP_LOCK = threading.Lock()
+
+
+def start_warmup(
+    diseases: Sequence[str] = ("diabetes", "heart"), extra: Sequence[Callable[[], Any]] = ()
+) -> threading.Thread:
+    """Run ``warm_artifacts`` on a daemon thread, once per process; return that thread.
+
+    Unpickling the models (and importing sklearn with them) then overlaps with
+    whatever the caller renders meanwhile, and ``load_compiled_*`` calls made
+    before it finishes wait for the in-flight build instead of repeating it.
+    """
+    global _WARMUP
+    with _WARMUP_LOCK:
+        if _WARMUP is None:
+            _WARMUP = threading.Thread(
+                target=warm_artifacts, args=(tuple(diseases), tuple(extra)), name="artifact-warmup", daemon=True
+            )
+            _WARMUP.start()
+        return _WARMUP
+
+
+DIABETES_FEATURE_COLUMNS = [
+    "age", "hypertension", "heart_disease", "bmi", "HbA1c_level", "blood_glucose_level",
+    "gender_Male", "gender_Other",
+    "smoking_history_current", "smoking_history_ever", "smoking_history_former",
+    "smoking_history_never", "smoking_history_not current",
+]
+
+HEART_FEATURE_COLUMNS = [
+    "id", "age", "height", "weight", "systolic_bp", "diastolic_bp",
+    "smoke", "alco", "active", "bmi",
+    "gender_2", "cholesterol_2", "cholesterol_3", "gluc_2", "gluc_3",
+]
 
 
 def build_diabetes_features(
@@ -59,6 +361,8 @@ def build_diabetes_features(
     smoking_opt: str,
 ) -> pd.DataFrame:
     """Compose the diabetes feature frame from raw UI inputs."""
+    import pandas as pd
+
     hypertension = 1 if hypertension_opt == "Yes" else 0
     heart_disease = 1 if heart_disease_opt == "Yes" else 0
     gender_male = 1 if gender_opt == "Male" else 0
@@ -89,6 +393,266 @@ def build_diabetes_features(
     return pd.DataFrame([feature_row])
 
 
+class DiabetesEncoder:
+    """Precompiled encoder from diabetes inputs straight into float64 feature rows.
+
+    Column positions are resolved once from ``feature_names`` (normally the
+    scaler's ``feature_names_in_``), so encoding is a handful of indexed stores
+    into a preallocated array with no dict or DataFrame in between. The output
+    is bit-for-bit identical to ``build_diabetes_features(...).to_numpy(float)``.
+    """
+
+    GENDER_COLUMNS = {"Male": "gender_Male", "Other": "gender_Other"}
+    SMOKING_COLUMNS = {
+        "current": "smoking_history_current",
+        "ever": "smoking_history_ever",
+        "former": "smoking_history_former",
+        "never": "smoking_history_never",
+        "not current": "smoking_history_not current",
+    }
+
+    def __init__(self, feature_names: Sequence[str] = tuple(DIABETES_FEATURE_COLUMNS)) -> None:
+        self.feature_names = tuple(str(name) for name in feature_names)
+        missing = set(DIABETES_FEATURE_COLUMNS) - set(self.feature_names)
+        if missing or len(self.feature_names) != len(DIABETES_FEATURE_COLUMNS):
+            raise ValueError(f"Unexpected diabetes feature columns: {self.feature_names}")
+        index = {name: position for position, name in enumerate(self.feature_names)}
+        self.n_features = len(self.feature_names)
+        self._age = index["age"]
+        self._hypertension = index["hypertension"]
+        self._heart_disease = index["heart_disease"]
+        self._bmi = index["bmi"]
+        self._hba1c = index["HbA1c_level"]
+        self._glucose = index["blood_glucose_level"]
+        self._gender = {option: index[column] for option, column in self.GENDER_COLUMNS.items()}
+        self._smoking = {option: index[column] for option, column in self.SMOKING_COLUMNS.items()}
+
+    @classmethod
+    def from_scaler(cls, scaler: Any) -> "DiabetesEncoder":
+        """Build an encoder whose column order is pinned to ``scaler.feature_names_in_``."""
+        feature_names = getattr(scaler, "feature_names_in_", None)
+        if feature_names is None:
+            return cls()
+        return cls(feature_names)
+
+    def encode(
+        self,
+        *,
+        age: float,
+        hypertension_opt: str,
+        heart_disease_opt: str,
+        bmi: float,
+        hba1c: float,
+        glucose: float,
+        gender_opt: str,
+        smoking_opt: str,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Encode one set of form inputs into a ``(1, n_features)`` float64 row."""
+        row = np.zeros((1, self.n_features)) if out is None else out
+        if out is not None:
+            row.fill(0.0)
+        values = row[0]
+        values[self._age] = age
+        values[self._hypertension] = hypertension_opt == "Yes"
+        values[self._heart_disease] = heart_disease_opt == "Yes"
+        values[self._bmi] = bmi
+        values[self._hba1c] = hba1c
+        values[self._glucose] = glucose
+        gender_slot = self._gender.get(gender_opt)
+        if gender_slot is not None:
+            values[gender_slot] = 1.0
+        smoking_slot = self._smoking.get(smoking_opt)
+        if smoking_slot is not None:
+            values[smoking_slot] = 1.0
+        return row
+
+    def encode_batch(
+        self,
+        *,
+        age: Any,
+        hypertension: Any,
+        heart_disease: Any,
+        bmi: Any,
+        hba1c: Any,
+        glucose: Any,
+        gender: Any,
+        smoking_history: Any,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Encode column arrays into an ``(n, n_features)`` float64 matrix.
+
+        ``hypertension``/``heart_disease`` are 0/1 flags (or booleans) as in
+        ``data/diabetes.csv``; ``gender`` and ``smoking_history`` hold the raw
+        category labels.
+        """
+        age = np.asarray(age, dtype=np.float64)
+        rows = age.shape[0]
+        matrix = np.empty((rows, self.n_features)) if out is None else out
+        matrix[:, self._age] = age
+        matrix[:, self._hypertension] = np.asarray(hypertension) != 0
+        matrix[:, self._heart_disease] = np.asarray(heart_disease) != 0
+        matrix[:, self._bmi] = np.asarray(bmi, dtype=np.float64)
+        matrix[:, self._hba1c] = np.asarray(hba1c, dtype=np.float64)
+        matrix[:, self._glucose] = np.asarray(glucose, dtype=np.float64)
+        gender = np.asarray(gender, dtype=object)
+        for option, slot in self._gender.items():
+            matrix[:, slot] = gender == option
+        smoking_history = np.asarray(smoking_history, dtype=object)
+        for option, slot in self._smoking.items():
+            matrix[:, slot] = smoking_history == option
+        return matrix
+
+    def encode_records(self, records: pd.DataFrame, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Encode rows in the raw ``data/diabetes.csv`` schema."""
+        return self.encode_batch(
+            age=records["age"].to_numpy(),
+            hypertension=records["hypertension"].to_numpy(),
+            heart_disease=records["heart_disease"].to_numpy(),
+            bmi=records["bmi"].to_numpy(),
+            hba1c=records["HbA1c_level"].to_numpy(),
+            glucose=records["blood_glucose_level"].to_numpy(),
+            gender=records["gender"].to_numpy(),
+            smoking_history=records["smoking_history"].to_numpy(),
+            out=out,
+        )
+
+
+_DIABETES_ENCODERS: Dict[Tuple[str, ...], DiabetesEncoder] = {}
+
+
+def get_diabetes_encoder(scaler: Any = None) -> DiabetesEncoder:
+    """Return a cached encoder pinned to ``scaler``'s column order.
+
+    Any object with ``feature_names_in_`` works, including compiled models
+    that folded the scaler in.
+    """
+    feature_names = getattr(scaler, "feature_names_in_", None)
+    key = tuple(str(name) for name in feature_names) if feature_names is not None else tuple(DIABETES_FEATURE_COLUMNS)
+    encoder = _DIABETES_ENCODERS.get(key)
+    if encoder is None:
+        encoder = _DIABETES_ENCODERS[key] = DiabetesEncoder(key)
+    return encoder
+
+
+# Input rules shared by the service and combined assessments. Ages match the
+# Streamlit forms' 1-120; every other measurement must be positive.
+AGE_RANGE = (1, 120)
+GENDER_OPTIONS = {"diabetes": ("Female", "Male", "Other"), "heart": ("Male", "Female")}
+SMOKING_OPTIONS = ("No Info", *DiabetesEncoder.SMOKING_COLUMNS)
+
+
+def check_number(field: str, value: Any) -> Any:
+    """Return ``value`` if it is a finite, in-range number for ``field``; raise ``ValueError`` otherwise."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{field} must be a finite number")
+    if field == "age":
+        if not AGE_RANGE[0] <= value <= AGE_RANGE[1]:
+            raise ValueError(f"age must be between {AGE_RANGE[0]} and {AGE_RANGE[1]}")
+    elif value <= 0:
+        raise ValueError(f"{field} must be positive")
+    return value
+
+
+def check_choice(field: str, value: Any, options: Sequence[str]) -> Any:
+    """Return ``value`` if it is one of ``options``; raise ``ValueError`` otherwise.
+
+    The encoders map unknown categories to the baseline one (e.g. ``"male"``
+    to Female), so they must be rejected before encoding.
+    """
+    if value not in options:
+        raise ValueError(f"{field} must be one of {', '.join(options)}")
+    return value
+
+
+CHOLESTEROL_CUTOFFS = (200.0, 240.0)
+GLUCOSE_CUTOFFS = (100.0, 126.0)
+
+
+def _categorize(values: Any, cutoffs: Tuple[float, float]) -> np.ndarray:
+    """Map mg/dL readings to the 1/2/3 (normal/above/well above) training categories."""
+    return np.searchsorted(np.asarray(cutoffs), np.asarray(values, dtype=np.float64), side="right") + 1
+
+
+def _heart_matrix(
+    *,
+    ids: Any,
+    age: Any,
+    gender_2: Any,
+    height_cm: Any,
+    weight_kg: Any,
+    systolic_bp: Any,
+    diastolic_bp: Any,
+    cholesterol_cat: Any,
+    gluc_cat: Any,
+    smoke: Any,
+    alco: Any,
+    active: Any,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Assemble the fixed ``HEART_FEATURE_COLUMNS`` matrix from column arrays or scalars."""
+    height = np.asarray(height_cm, dtype=np.float64)
+    weight = np.asarray(weight_kg, dtype=np.float64)
+    bmi = weight / ((height / 100.0) ** 2)
+    columns = np.broadcast_arrays(
+        np.asarray(ids, dtype=np.float64),
+        np.asarray(age, dtype=np.float64),
+        np.trunc(height),
+        weight,
+        np.trunc(np.asarray(systolic_bp, dtype=np.float64)),
+        np.trunc(np.asarray(diastolic_bp, dtype=np.float64)),
+        np.asarray(smoke) != 0,
+        np.asarray(alco) != 0,
+        np.asarray(active) != 0,
+        bmi,
+        np.asarray(gender_2) != 0,
+        np.asarray(cholesterol_cat) == 2,
+        np.asarray(cholesterol_cat) == 3,
+        np.asarray(gluc_cat) == 2,
+        np.asarray(gluc_cat) == 3,
+    )
+    matrix = np.empty((np.atleast_1d(columns[0]).shape[0], len(HEART_FEATURE_COLUMNS)))
+    for position, column in enumerate(columns):
+        matrix[:, position] = column
+    return matrix, np.broadcast_to(bmi, matrix.shape[:1]).astype(np.float64)
+
+
+def build_heart_feature_matrix(
+    *,
+    age: Any,
+    gender: Any,
+    height_cm: Any,
+    weight_kg: Any,
+    systolic_bp: Any,
+    diastolic_bp: Any,
+    cholesterol: Any,
+    glucose: Any,
+    smoke: Any,
+    alco: Any,
+    active: Any,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized heart feature builder over scalars or equal-length arrays of form inputs.
+
+    Returns an ``(n, 15)`` float64 matrix in ``HEART_FEATURE_COLUMNS`` order and
+    the BMI array. Cholesterol and glucose are bucketed at 200/240 and 100/126
+    mg/dL, and every dummy column is always present, so the schema does not
+    depend on which categories happen to appear in the batch.
+    """
+    return _heart_matrix(
+        ids=0,
+        age=age,
+        gender_2=np.asarray(gender, dtype=object) != "Male",
+        height_cm=height_cm,
+        weight_kg=weight_kg,
+        systolic_bp=systolic_bp,
+        diastolic_bp=diastolic_bp,
+        cholesterol_cat=_categorize(cholesterol, CHOLESTEROL_CUTOFFS),
+        gluc_cat=_categorize(glucose, GLUCOSE_CUTOFFS),
+        smoke=smoke,
+        alco=alco,
+        active=active,
+    )
+
+
 def build_heart_features(
     *,
     age: float,
@@ -104,72 +668,191 @@ def build_heart_features(
     active: bool,
 ) -> Tuple[pd.DataFrame, float]:
     """Compose the heart disease feature frame and BMI from raw UI inputs."""
-    gender_val = 1 if gender == "Male" else 2
-    bmi_val = float(weight_kg) / ((float(height_cm) / 100.0) ** 2)
-
-    if cholesterol < 200:
-        cholesterol_cat = 1
-    elif cholesterol < 240:
-        cholesterol_cat = 2
-    else:
-        cholesterol_cat = 3
-
-    if glucose < 100:
-        glucose_cat = 1
-    elif glucose < 126:
-        glucose_cat = 2
-    else:
-        glucose_cat = 3
+    import pandas as pd
 
-    feature_row = {
-        "id": 0,
-        "age": float(age),
-        "gender": int(gender_val),
-        "height": int(height_cm),
-        "weight": float(weight_kg),
-        "systolic_bp": int(systolic_bp),
-        "diastolic_bp": int(diastolic_bp),
-        "cholesterol": int(cholesterol_cat),
-        "gluc": int(glucose_cat),
-        "smoke": int(bool(smoke)),
-        "alco": int(bool(alco)),
-        "active": int(bool(active)),
-        "bmi": float(bmi_val),
-    }
+    matrix, bmi = build_heart_feature_matrix(
+        age=age,
+        gender=gender,
+        height_cm=height_cm,
+        weight_kg=weight_kg,
+        systolic_bp=systolic_bp,
+        diastolic_bp=diastolic_bp,
+        cholesterol=cholesterol,
+        glucose=glucose,
+        smoke=smoke,
+        alco=alco,
+        active=active,
+    )
+    return pd.DataFrame(matrix, columns=HEART_FEATURE_COLUMNS), float(bmi[0])
+
+
+def diabetes_features_from_records(records: pd.DataFrame) -> pd.DataFrame:
+    """Encode rows in the raw ``data/diabetes.csv`` schema into model features."""
+    import pandas as pd
+
+    matrix = get_diabetes_encoder().encode_records(records)
+    return pd.DataFrame(matrix, columns=DIABETES_FEATURE_COLUMNS, index=records.index)
+
+
+def heart_matrix_from_records(records: pd.DataFrame) -> np.ndarray:
+    """Encode rows in the raw ``data/heart.csv`` schema into a feature matrix.
+
+    The raw file stores age in days and cholesterol/glucose as 1-3 categories,
+    so only the age conversion and BMI are derived before one-hot encoding.
+    """
+    ids = records["id"].to_numpy() if "id" in records else 0
+    matrix, _ = _heart_matrix(
+        ids=ids,
+        age=np.round(records["age"].to_numpy(dtype=np.float64) / 365.25, 1),
+        gender_2=records["gender"].to_numpy() == 2,
+        height_cm=records["height"].to_numpy(),
+        weight_kg=records["weight"].to_numpy(),
+        systolic_bp=records["ap_hi"].to_numpy(),
+        diastolic_bp=records["ap_lo"].to_numpy(),
+        cholesterol_cat=records["cholesterol"].to_numpy(),
+        gluc_cat=records["gluc"].to_numpy(),
+        smoke=records["smoke"].to_numpy(),
+        alco=records["alco"].to_numpy(),
+        active=records["active"].to_numpy(),
+    )
+    return matrix
+
+
+def heart_features_from_records(records: pd.DataFrame) -> pd.DataFrame:
+    """Encode rows in the raw ``data/heart.csv`` schema into a feature frame."""
+    import pandas as pd
+
+    return pd.DataFrame(heart_matrix_from_records(records), columns=HEART_FEATURE_COLUMNS, index=records.index)
+
+
+FeatureBatch = Union["pd.DataFrame", np.ndarray]
+
+
+def _scale_features(scaler: Any, features: FeatureBatch) -> np.ndarray:
+    """Scale a feature frame or matrix.
+
+    Bare arrays are assumed to follow the scaler's column order. For a fitted
+    ``StandardScaler`` they are standardized directly with the same in-place
+    subtract/divide sklearn performs, which gives identical results without
+    its DataFrame validation and feature-name checks. ``scaler=None`` is
+    used with compiled models that already fold the scaling into their weights.
+    """
+    if scaler is None:
+        return np.asarray(features, dtype=np.float64)
+    if not isinstance(features, np.ndarray):
+        return scaler.transform(features)
+    matrix = features.reshape(1, -1) if features.ndim == 1 else features
+    mean = getattr(scaler, "mean_", None)
+    scale = getattr(scaler, "scale_", None)
+    if mean is not None and scale is not None and getattr(scaler, "with_mean", False):
+        scaled = np.array(matrix, dtype=np.float64)
+        scaled -= mean
+        scaled /= scale
+        return scaled
+    feature_names = getattr(scaler, "feature_names_in_", None)
+    if feature_names is not None:
+        import pandas as pd
+
+        return scaler.transform(pd.DataFrame(matrix, columns=feature_names))
+    return scaler.transform(matrix)
+
+
+def _predict_batch(
+    model: Any, scaler: Any, features: FeatureBatch, threshold: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Run one ``predict_proba`` pass and derive labels from the positive-class probability."""
+    if scaler is None and hasattr(model, "predict_batch"):
+        return model.predict_batch(features, threshold)
+    probabilities = model.predict_proba(_scale_features(scaler, features))[:, 1]
+    # Strict ">" matches sklearn's argmax, which breaks a 0.5 tie towards class 0.
+    labels = (probabilities > threshold).astype(np.int64)
+    return labels, probabilities
 
-    df = pd.DataFrame([feature_row])
-    
-    # One-hot encode categorical features to match training format
-    df = pd.get_dummies(df, columns=["gender", "cholesterol", "gluc"], drop_first=True)
-    
-    # Ensure all expected columns exist (even if zero)
-    expected_columns = [
-        "id", "age", "height", "weight", "systolic_bp", "diastolic_bp",
-        "smoke", "alco", "active", "bmi",
-        "gender_2", "cholesterol_2", "cholesterol_3", "gluc_2", "gluc_3"
-    ]
-    
-    for col in expected_columns:
-        if col not in df.columns:
-            df[col] = 0
-    
-    # Reorder columns to match expected order
-    df = df[expected_columns]
-    
-    return df, bmi_val
-
-
-def predict_diabetes(model: Any, scaler: Any, features: pd.DataFrame) -> Tuple[int, float]:
+
+def predict_diabetes_batch(
+    model: Any, scaler: Any, features: FeatureBatch, threshold: float = 0.5
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return diabetes labels and probabilities for every row of ``features``."""
+    return _predict_batch(model, scaler, features, threshold)
+
+
+def predict_heart_batch(
+    model: Any, scaler: Any, features: FeatureBatch, threshold: float = 0.5
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return heart disease labels and probabilities for every row of ``features``."""
+    return _predict_batch(model, scaler, features, threshold)
+
+
+def predict_diabetes(model: Any, scaler: Any, features: FeatureBatch) -> Tuple[int, float]:
     """Return the diabetes prediction label and probability."""
-    user_scaled = scaler.transform(features)
-    prediction = model.predict(user_scaled)[0]
-    probability = model.predict_proba(user_scaled)[0][1]
-    return int(prediction), float(probability)
+    labels, probabilities = predict_diabetes_batch(model, scaler, features)
+    return int(labels[0]), float(probabilities[0])
 
 
-def predict_heart(model: Any, scaler: Any, features: pd.DataFrame) -> Tuple[int, float]:
+def predict_heart(model: Any, scaler: Any, features: FeatureBatch) -> Tuple[int, float]:
     """Return the heart disease prediction label and probability."""
-    user_scaled = scaler.transform(features)
-    prediction = model.predict(user_scaled)[0]
-    probability = model.predict_proba(user_scaled)[0][1]
-    return int(prediction), float(probability)
+    labels, probabilities = predict_heart_batch(model, scaler, features)
+    return int(labels[0]), float(probabilities[0])
+
+
+_BATCHERS: Dict[str, Tuple[Any, Any, MicroBatcher]] = {}
+_BATCHERS_LOCK = threading.Lock()
+
+
+def get_batcher(disease: str, model: Any, scaler: Any = None, **options: Any) -> MicroBatcher:
+    """Return the process-wide micro-batcher serving ``model`` for ``disease``.
+
+    Concurrent single-row predictions through it share one vectorized call.
+    A new model or scaler object (e.g. after a hot reload) replaces the
+    batcher and retires the old one: its queued rows finish in a batch and
+    callers still holding it are scored directly. ``options``
+    (``max_batch_size``, ``max_wait``) apply when a batcher is created.
+    """
+    with _BATCHERS_LOCK:
+        current = _BATCHERS.get(disease)
+        if current is not None and current[0] is model and current[1] is scaler:
+            return current[2]
+        batcher = MicroBatcher(
+            lambda matrix: _predict_batch(model, scaler, matrix, 0.5), name=f"{disease}-batcher", **options
+        )
+        _BATCHERS[disease] = (model, scaler, batcher)
+    if current is not None:
+        current[2].retire()
+    return batcher
+
+
+PREDICTION_CACHE = PredictionCache()
+
+
+def predict_diabetes_cached(
+    model: Any,
+    scaler: Any,
+    features: FeatureBatch,
+    version: Optional[str] = None,
+    batcher: Optional[MicroBatcher] = None,
+) -> Tuple[int, float]:
+    """``predict_diabetes`` behind the shared ``PREDICTION_CACHE``.
+
+    ``version`` defaults to the registry's artifact hashes; pass your own when
+    scoring a model that was not loaded through ``ARTIFACT_REGISTRY``. With
+    ``batcher`` (see ``get_batcher``) cache misses are coalesced with other
+    concurrent requests; ``features`` must then be a row in model column order.
+    """
+    key = feature_key("diabetes", version or artifact_version("diabetes"), features)
+    if batcher is not None:
+        return PREDICTION_CACHE.get_or_compute(key, lambda: batcher.predict(features))
+    return PREDICTION_CACHE.get_or_compute(key, lambda: predict_diabetes(model, scaler, features))
+
+
+def predict_heart_cached(
+    model: Any,
+    scaler: Any,
+    features: FeatureBatch,
+    version: Optional[str] = None,
+    batcher: Optional[MicroBatcher] = None,
+) -> Tuple[int, float]:
+    """``predict_heart`` behind the shared ``PREDICTION_CACHE``; see ``predict_diabetes_cached``."""
+    key = feature_key("heart", version or artifact_version("heart"), features)
+    if batcher is not None:
+        return PREDICTION_CACHE.get_or_compute(key, lambda: batcher.predict(features))
+    return PREDICTION_CACHE.get_or_compute(key, lambda: predict_heart(model, scaler, features))